@@ -0,0 +1,86 @@
+import argparse
+import json
+import logging
+import os
+import sys
+
+from benchmarks import runner
+from sql_service import utils
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog = "python -m benchmarks", description = "Benchmark sql_service against a simulated pyodbc driver")
+
+    parser.add_argument("--scenarios", default = ",".join(runner.scenarios), help = "comma separated scenarios to run (default: all)")
+    parser.add_argument("--iterations", type = int, default = 200)
+    parser.add_argument("--warmup", type = int, default = 10)
+    parser.add_argument("--rows", type = int, default = 1000, help = "rows returned per SELECT and sent per bulk insert")
+    parser.add_argument("--width", type = int, default = 8, help = "columns per row")
+    parser.add_argument("--types", default = "int,str,decimal,datetime", help = f"column types cycled across the row: {', '.join(runner.fake_pyodbc.column_types)}")
+    parser.add_argument("--string-length", type = int, default = 32)
+    parser.add_argument("--connect-latency", type = float, default = 0.0, help = "milliseconds per connect")
+    parser.add_argument("--execute-latency", type = float, default = 0.0, help = "milliseconds per execute")
+    parser.add_argument("--fetch-latency", type = float, default = 0.0, help = "milliseconds per fetch call")
+    parser.add_argument("--row-latency", type = float, default = 0.0, help = "milliseconds per row fetched or sent")
+    parser.add_argument("--batch-size", type = int, default = 1000)
+    parser.add_argument("--prefetch", type = int, default = 2, help = "batches read ahead by the stream_prefetch scenario")
+    parser.add_argument("--partitions", type = int, default = 4, help = "partitions read concurrently by the select_partitioned scenario")
+    parser.add_argument("--process-latency", type = float, default = 0.0, help = "milliseconds the streaming consumer spends on each batch")
+    parser.add_argument("--row-format", default = "dict")
+    parser.add_argument("--log-level", default = "INFO")
+    parser.add_argument("--no-memory", action = "store_true", help = "skip the tracemalloc peak memory run")
+    parser.add_argument("--output", help = "write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help = "JSON results of an earlier run to compare against")
+
+    return parser.parse_args(argv)
+
+def main(argv = None):
+    args = parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in runner.scenarios]
+
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(unknown)}. Use any of: {', '.join(runner.scenarios)}")
+
+    utils.configure_logging(log_file = os.devnull)
+
+    options = {
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'rows': args.rows,
+        'width': args.width,
+        'batch_size': args.batch_size,
+        'prefetch': args.prefetch,
+        'partitions': args.partitions,
+        'process_latency': args.process_latency / 1000,
+        'row_format': args.row_format,
+        'log_level': logging.getLevelName(args.log_level.upper()),
+        'memory': not args.no_memory,
+        'driver': {
+            'rows': args.rows,
+            'width': args.width,
+            'types': tuple(args.types.split(',')),
+            'string_length': args.string_length,
+            'connect_latency': args.connect_latency / 1000,
+            'execute_latency': args.execute_latency / 1000,
+            'fetch_latency': args.fetch_latency / 1000,
+            'row_latency': args.row_latency / 1000
+        }
+    }
+
+    results = runner.run(names, options)
+    output = json.dumps(results, indent = 2, default = str)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            print(runner.compare(json.load(file), results), file = sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import csv
+import datetime
+import decimal
+import itertools
+import re
+import sys
+import threading
+import time
+
+EPOCH = datetime.datetime(2000, 1, 1)
+
+column_types = {
+    'int': (int, lambda row, length: row),
+    'bool': (bool, lambda row, length: row % 2 == 0),
+    'float': (float, lambda row, length: row * 0.5),
+    'decimal': (decimal.Decimal, lambda row, length: decimal.Decimal(row).scaleb(-2)),
+    'str': (str, lambda row, length: f"{row:0{length}d}"),
+    'datetime': (datetime.datetime, lambda row, length: EPOCH + datetime.timedelta(seconds = row)),
+    'date': (datetime.date, lambda row, length: (EPOCH + datetime.timedelta(days = row % 3650)).date())
+}
+
+default_settings = {
+    'rows': 1000,
+    'width': 8,
+    'types': ('int', 'str', 'decimal', 'datetime'),
+    'string_length': 32,
+    'rowcount': 1,
+    'connect_latency': 0.0,
+    'execute_latency': 0.0,
+    'fetch_latency': 0.0,
+    'row_latency': 0.0,
+    'record': False
+}
+
+settings = dict(default_settings)
+counters = {}
+statements = []
+loaded = []
+
+bulk_source = re.compile(r"FROM '((?:[^']|'')*)'", re.IGNORECASE)
+modulo_predicate = re.compile(r"ABS\(\w+ % \?\) = \?", re.IGNORECASE)
+
+_lock = threading.Lock()
+
+
+class Error(Exception):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+class Cursor():
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self.fast_executemany = False
+        self.closed = False
+        self.rows = iter(())
+
+    def execute(self, sql, *params):
+        self.check()
+        count('executes')
+        record(sql, params)
+        wait(settings['execute_latency'])
+
+        if sql.lstrip()[:6].upper() == "SELECT":
+            self.description = describe()
+            self.rows = generate_rows(self.description, selected_rows(sql, params))
+            self.rowcount = -1
+
+        elif sql.lstrip()[:11].upper() == "BULK INSERT":
+            self.description = None
+            self.rows = iter(())
+            self.rowcount = bulk_load(sql)
+
+        else:
+            self.description = None
+            self.rows = iter(())
+            self.rowcount = settings['rowcount']
+
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self.check()
+        seq_of_params = list(seq_of_params)
+
+        count('executes')
+        count('rows_written', len(seq_of_params))
+        record(sql, seq_of_params)
+        wait(settings['execute_latency'] + settings['row_latency'] * len(seq_of_params))
+
+        self.description = None
+        self.rowcount = -1 if self.fast_executemany else len(seq_of_params)
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+
+        return rows[0] if rows else None
+
+    def fetchmany(self, size = 1):
+        self.check()
+        wait(settings['fetch_latency'])
+
+        rows = list(itertools.islice(self.rows, size))
+        count('rows_fetched', len(rows))
+        wait(settings['row_latency'] * len(rows))
+
+        return rows
+
+    def fetchall(self):
+        self.check()
+        wait(settings['fetch_latency'])
+
+        rows = list(self.rows)
+        count('rows_fetched', len(rows))
+        wait(settings['row_latency'] * len(rows))
+
+        return rows
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def cancel(self):
+        count('cancels')
+        self.rows = iter(())
+
+    def close(self):
+        self.closed = True
+        self.rows = iter(())
+
+    def check(self):
+        if self.closed or self.connection.closed:
+            raise ProgrammingError("Attempt to use a closed cursor.")
+
+
+class Connection():
+
+    def __init__(self, conn_string):
+        self.conn_string = conn_string
+        self.autocommit = False
+        self.closed = False
+
+    def cursor(self):
+        if self.closed:
+            raise ProgrammingError("Attempt to use a closed connection.")
+
+        return Cursor(self)
+
+    def commit(self):
+        count('commits')
+
+    def rollback(self):
+        count('rollbacks')
+
+    def close(self):
+        self.closed = True
+
+
+def connect(conn_string, **kwargs):
+    count('connects')
+    wait(settings['connect_latency'])
+
+    return Connection(conn_string)
+
+def configure(**options):
+    unknown = set(options) - set(default_settings)
+
+    if unknown:
+        raise ValueError(f"Unknown fake driver settings: {', '.join(sorted(unknown))}")
+
+    for name in options.get('types', ()):
+        if name not in column_types:
+            raise ValueError(f"Unknown column type '{name}'. Use one of: {', '.join(column_types)}")
+
+    settings.update(options)
+
+    return dict(settings)
+
+def reset():
+    settings.clear()
+    settings.update(default_settings)
+
+    with _lock:
+        counters.clear()
+        statements.clear()
+        loaded.clear()
+
+def stats():
+    with _lock:
+        return dict(counters)
+
+def install():
+    module = sys.modules[__name__]
+    sys.modules['pyodbc'] = module
+
+    imported = sys.modules.get('sql_service.sql_service')
+    if imported is not None:
+        imported.pyodbc = module
+
+    return module
+
+def describe():
+    types = settings['types']
+    length = settings['string_length']
+
+    description = []
+
+    for position in range(settings['width']):
+        type_code = column_types[types[position % len(types)]][0]
+        size = length if type_code is str else None
+
+        description.append((f"col{position}", type_code, None, size, size, 0, True))
+
+    return tuple(description)
+
+def selected_rows(sql, params):
+    rows = range(settings['rows'])
+    match = modulo_predicate.search(sql)
+
+    if match is None:
+        return rows
+
+    # Honour the predicate of a modulo partition, treating the row number as the key
+    values = params[0] if len(params) == 1 and isinstance(params[0], (list, tuple)) else params
+    position = sql.count("?", 0, match.start())
+    partitions, remainder = values[position], values[position + 1]
+
+    return (row for row in rows if row % partitions == remainder)
+
+def generate_rows(description, rows = None):
+    types = settings['types']
+    length = settings['string_length']
+    values = [column_types[types[position % len(types)]][1] for position in range(len(description))]
+
+    if rows is None:
+        rows = range(settings['rows'])
+
+    return (tuple(value(row, length) for value in values) for row in rows)
+
+def count(name, amount = 1):
+    with _lock:
+        counters[name] = counters.get(name, 0) + amount
+
+def record(sql, params):
+    if settings['record']:
+        with _lock:
+            statements.append((sql, params))
+
+def bulk_load(sql):
+    path = bulk_source.search(sql).group(1).replace("''", "'")
+
+    with open(path, encoding = 'utf-8', newline = '') as file:
+        rows = list(csv.reader(file))
+
+    count('rows_loaded', len(rows))
+
+    if settings['record']:
+        with _lock:
+            loaded.append((path, rows))
+
+    return len(rows)
+
+def wait(seconds):
+    if seconds > 0:
+        time.sleep(seconds)
@@ -0,0 +1,64 @@
+import argparse
+import ast
+import json
+import timeit
+
+from sql_service import utils
+
+SIZES = (1, 10, 100, 1000)
+
+
+def legacy_get_params(params):
+    if params:
+        params = params.replace('params', '')
+        params = params.replace('[', '')
+        params = params.replace(']', '')
+        params = "{'" + params + "'}"
+        params = params.replace('=', "':'")
+        params = params.replace('&', "'},{'")
+        params = params.split(",")
+
+        params_list = []
+
+        for param in params:
+            params_list.append(ast.literal_eval(param))
+
+        return params_list
+
+def query_string(size):
+    return "&".join(f"params[column{position}]=value{position}" for position in range(size))
+
+def measure(func, params, repeat, number):
+    return min(timeit.repeat(lambda: func(params), repeat = repeat, number = number)) / number
+
+def run(sizes = SIZES, repeat = 5, budget = 20000):
+    results = {}
+
+    for size in sizes:
+        params = query_string(size)
+        number = max(1, budget // size)
+
+        if legacy_get_params(params) != utils.get_params(params):
+            raise AssertionError(f"get_params and legacy_get_params disagree for {size} params")
+
+        legacy = measure(legacy_get_params, params, repeat, number)
+        current = measure(utils.get_params, params, repeat, number)
+
+        results[str(size)] = {
+            'legacy_us': round(legacy * 1e6, 3),
+            'current_us': round(current * 1e6, 3),
+            'speedup': round(legacy / current, 2)
+        }
+
+    return results
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m benchmarks.params", description = "Compare utils.get_params with the legacy literal_eval parser")
+    parser.add_argument("--sizes", default = ",".join(str(size) for size in SIZES))
+    parser.add_argument("--repeat", type = int, default = 5)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run([int(size) for size in args.sizes.split(',')], args.repeat), indent = 2))
+
+if __name__ == "__main__":
+    main()
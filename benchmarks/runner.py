@@ -0,0 +1,203 @@
+import datetime
+import gc
+import platform
+import time
+import tracemalloc
+
+from benchmarks import fake_pyodbc
+
+fake_pyodbc.install()
+
+from sql_service import sql_handler
+from sql_service import sql_pool
+from sql_service import sql_stats
+
+CREDENTIALS = ('FAKE', 'bench', 'benchdb', 'bench', 'bench')
+TABLE = 'tbl_bench'
+
+
+def select_args(options):
+    return {'table': TABLE, 'columns': columns(options), 'values': None, 'params': None, 'where': "col0 > 0"}
+
+def columns(options):
+    return ",".join(f"col{position}" for position in range(options['width']))
+
+def service(statement_type, args, options, pooled = True):
+    return sql_handler.SqlService(statement_type, args, *CREDENTIALS, pooled = pooled, row_format = options['row_format'], log_level = options['log_level'])
+
+def run_select(options, pooled = True):
+    return len(service('select', select_args(options), options, pooled).sql_handler())
+
+def run_select_unpooled(options):
+    return run_select(options, pooled = False)
+
+def run_stream(options, prefetch = 0):
+    rows = 0
+
+    for batch in service('select', select_args(options), options).stream(batch_size = options['batch_size'], batches = True, prefetch = prefetch):
+        rows += len(batch)
+        fake_pyodbc.wait(options['process_latency'])
+
+    return rows
+
+def run_stream_prefetch(options):
+    return run_stream(options, prefetch = options['prefetch'])
+
+def run_select_partitioned(options):
+    return len(service('select', select_args(options), options).select_partitioned("col0", partitions = options['partitions'], mode = "modulo"))
+
+def run_insert(options):
+    values = ",".join(str(position) for position in range(options['width']))
+    service('insert', {'table': TABLE, 'columns': columns(options), 'values': values, 'params': None, 'where': None}, options).sql_handler()
+
+    return 1
+
+def run_bulk_insert(options):
+    rows = [tuple(range(options['width']))] * options['rows']
+    args = {'table': TABLE, 'columns': columns(options), 'values': None, 'params': None, 'where': None, 'rows': rows, 'batch_size': options['batch_size']}
+    service('insert', args, options).sql_handler()
+
+    return len(rows)
+
+def run_bulk_upsert(options):
+    rows = [tuple(range(options['width']))] * options['rows']
+    args = {'table': TABLE, 'columns': columns(options), 'values': None, 'params': None, 'where': None, 'rows': rows, 'key': "col0", 'batch_size': options['batch_size']}
+    service('insert', args, options).sql_handler()
+
+    return len(rows)
+
+def run_update(options):
+    service('update', {'table': TABLE, 'columns': None, 'values': None, 'params': "params[col1]=updated&params[col2]=1", 'where': "col0 = 1"}, options).sql_handler()
+
+    return 1
+
+def run_delete(options):
+    service('delete', {'table': TABLE, 'columns': None, 'values': None, 'params': None, 'where': "col0 = 1"}, options).sql_handler()
+
+    return 1
+
+scenarios = {
+    'select': run_select,
+    'select_unpooled': run_select_unpooled,
+    'stream': run_stream,
+    'stream_prefetch': run_stream_prefetch,
+    'select_partitioned': run_select_partitioned,
+    'insert': run_insert,
+    'bulk_insert': run_bulk_insert,
+    'bulk_upsert': run_bulk_upsert,
+    'update': run_update,
+    'delete': run_delete
+}
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def peak_memory(scenario, options):
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        scenario(options)
+        return tracemalloc.get_traced_memory()[1]
+
+    finally:
+        tracemalloc.stop()
+
+def measure(name, options):
+    scenario = scenarios[name]
+
+    for _ in range(options['warmup']):
+        scenario(options)
+
+    fake_pyodbc.reset()
+    fake_pyodbc.configure(**options['driver'])
+    sql_stats.reset()
+
+    latencies = []
+    rows = 0
+    started = time.perf_counter()
+
+    for _ in range(options['iterations']):
+        start = time.perf_counter()
+        rows += scenario(options)
+        latencies.append(time.perf_counter() - start)
+
+    elapsed = time.perf_counter() - started
+    driver = fake_pyodbc.stats()
+    stages = {stage: round(stats['sum'] / options['iterations'] * 1000, 4) for stage, stats in sql_stats.stats().items()}
+    latencies.sort()
+
+    return {
+        'iterations': options['iterations'],
+        'rows': rows,
+        'seconds': round(elapsed, 6),
+        'ops_per_second': round(options['iterations'] / elapsed, 2),
+        'rows_per_second': round(rows / elapsed, 2),
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies) * 1000, 4),
+            'min': round(latencies[0] * 1000, 4),
+            'p50': round(percentile(latencies, 0.50) * 1000, 4),
+            'p90': round(percentile(latencies, 0.90) * 1000, 4),
+            'p99': round(percentile(latencies, 0.99) * 1000, 4),
+            'max': round(latencies[-1] * 1000, 4)
+        },
+        'stage_ms': stages,
+        'peak_memory_bytes': peak_memory(scenario, options) if options['memory'] else None,
+        'driver': driver
+    }
+
+def run(names, options):
+    fake_pyodbc.reset()
+    fake_pyodbc.configure(**options['driver'])
+
+    results = {}
+
+    try:
+        for name in names:
+            results[name] = measure(name, options)
+
+    finally:
+        sql_pool.close_all_pools()
+
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec = 'seconds'),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'options': {key: value for key, value in options.items() if key != 'driver'},
+            'driver': dict(fake_pyodbc.settings)
+        },
+        'results': results
+    }
+
+def compare(baseline, current):
+    lines = [f"{'scenario':<16} {'ops/s':>12} {'base ops/s':>12} {'change':>8} {'p50 ms':>10} {'base p50':>10} {'change':>8}"]
+
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+
+        if base is None:
+            lines.append(f"{name:<16} {result['ops_per_second']:>12} {'-':>12} {'new':>8}")
+            continue
+
+        ops_change = change(base['ops_per_second'], result['ops_per_second'])
+        p50_change = change(base['latency_ms']['p50'], result['latency_ms']['p50'])
+
+        lines.append(f"{name:<16} {result['ops_per_second']:>12} {base['ops_per_second']:>12} {ops_change:>8} {result['latency_ms']['p50']:>10} {base['latency_ms']['p50']:>10} {p50_change:>8}")
+
+    return "\n".join(lines)
+
+def change(before, after):
+    if not before:
+        return "-"
+
+    return f"{(after - before) / before * 100:+.1f}%"
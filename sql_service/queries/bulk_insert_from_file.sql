@@ -0,0 +1 @@
+BULK INSERT {} FROM '{}' WITH ({})
\ No newline at end of file
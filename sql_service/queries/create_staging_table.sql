@@ -0,0 +1 @@
+SELECT {} INTO {} FROM {} WHERE 1 = 0 UNION ALL SELECT {} FROM {} WHERE 1 = 0
\ No newline at end of file
@@ -0,0 +1 @@
+DELETE TOP (?) FROM {} WHERE {}
\ No newline at end of file
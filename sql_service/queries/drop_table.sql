@@ -0,0 +1 @@
+DROP TABLE IF EXISTS {}
\ No newline at end of file
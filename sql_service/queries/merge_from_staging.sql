@@ -0,0 +1 @@
+SET NOCOUNT ON; DECLARE @merge_actions TABLE (merge_action NVARCHAR(10)); MERGE {} WITH (HOLDLOCK) AS target USING {} AS source ON {} {} OUTPUT $action INTO @merge_actions; SET NOCOUNT OFF; SELECT COUNT(CASE WHEN merge_action = 'INSERT' THEN 1 END), COUNT(CASE WHEN merge_action = 'UPDATE' THEN 1 END) FROM @merge_actions;
\ No newline at end of file
@@ -0,0 +1 @@
+SELECT {} FROM {} {} ORDER BY {}
\ No newline at end of file
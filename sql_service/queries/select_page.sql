@@ -0,0 +1 @@
+SELECT {} FROM {} {} ORDER BY {} OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY
\ No newline at end of file
@@ -0,0 +1 @@
+UPDATE target SET {} FROM {} AS target INNER JOIN {} AS source ON {}
\ No newline at end of file
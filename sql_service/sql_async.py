@@ -0,0 +1,245 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+from sql_service import sql_handler
+from sql_service import sql_pool
+from sql_service import sql_controller
+from sql_service import utils
+
+DEFAULT_MAX_WORKERS = 32
+
+_executor = None
+_executor_lock = threading.Lock()
+_async_pools = {}
+
+
+def get_executor(max_workers = DEFAULT_MAX_WORKERS):
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = "sql_service")
+
+        return _executor
+
+def shutdown_executor(wait = True):
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait = wait)
+
+async def run_blocking(func, *args, executor = None, cancel = None, cleanup = None, **kwargs):
+    future = (executor or get_executor()).submit(functools.partial(func, *args, **kwargs))
+
+    try:
+        return await asyncio.wrap_future(future)
+
+    except asyncio.CancelledError:
+        if cancel is not None:
+            cancel()
+
+        if cleanup is not None:
+            future.add_done_callback(cleanup)
+
+        raise
+
+
+class AsyncConnectionPool():
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.loop = asyncio.get_running_loop()
+        self.slots = asyncio.Semaphore(pool.max_size)
+
+    async def acquire(self):
+        try:
+            await asyncio.wait_for(self.slots.acquire(), self.pool.borrow_timeout)
+
+        except asyncio.TimeoutError:
+            raise sql_pool.PoolExhaustedError(f"Timed out after {self.pool.borrow_timeout}s waiting for a connection to {self.pool.server}/{self.pool.database}")
+
+    def release(self):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self.loop:
+            self.slots.release()
+        else:
+            self.loop.call_soon_threadsafe(self.slots.release)
+
+
+async def get_async_pool(driver, server, database, username, password, logger, executor = None):
+    pool = await run_blocking(sql_pool.get_pool, driver, server, database, username, password, logger, executor = executor)
+    key = sql_pool.pool_key(driver, server, database, username)
+
+    async_pool = _async_pools.get(key)
+
+    if async_pool is None or async_pool.pool is not pool or async_pool.loop is not asyncio.get_running_loop():
+        async_pool = AsyncConnectionPool(pool)
+        _async_pools[key] = async_pool
+
+    return async_pool
+
+
+class AsyncSqlService():
+
+    def __init__(self, service, executor = None, async_pool = None):
+        self.service = service
+        self.executor = executor
+        self.async_pool = async_pool
+
+    @classmethod
+    async def create(cls, statement_type, args, driver, server, database, username, password, executor = None, **options):
+        async_pool = None
+
+        if options.get('pooled', True):
+            async_pool = await get_async_pool(driver, server, database, username, password, utils.create_logger(), executor = executor)
+            await async_pool.acquire()
+
+        def close_created(future):
+            try:
+                if not future.cancelled() and future.exception() is None:
+                    future.result().controller.close()
+            finally:
+                if async_pool is not None:
+                    async_pool.release()
+
+        try:
+            service = await run_blocking(sql_handler.SqlService, statement_type, args, driver, server, database, username, password, executor = executor, cleanup = close_created, **options)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception:
+            if async_pool is not None:
+                async_pool.release()
+            raise
+
+        return cls(service, executor, async_pool)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def cancel(self):
+        cursor = self.service.controller.active_cursor
+
+        if cursor is not None:
+            try:
+                cursor.cancel()
+            except Exception as e:
+                self.service.logger.error("SQL_ASC_CNL: Cancelling running statement failed, %s", e)
+
+    async def sql_handler(self):
+        try:
+            result = await run_blocking(self.service.sql_handler, executor = self.executor, cancel = self.cancel, cleanup = self._close_if_cancelled)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception:
+            self._release_slot()
+            raise
+
+        self._release_slot()
+
+        return result
+
+    async def select(self, **kwargs):
+        return await self._call(self.service.controller.select, **kwargs)
+
+    async def select_columnar(self, **kwargs):
+        return await self._call(self.service.controller.select_columnar, **kwargs)
+
+    async def insert(self):
+        return await self._call(self.service.controller.insert)
+
+    async def bulk_insert(self, rows, **kwargs):
+        return await self._call(self.service.controller.bulk_insert, rows, **kwargs)
+
+    async def update(self):
+        return await self._call(self.service.controller.update)
+
+    async def delete(self):
+        return await self._call(self.service.controller.delete)
+
+    async def stream(self, batch_size = sql_controller.DEFAULT_BATCH_SIZE, batches = False, prefetch = 0):
+        rows = self.service.stream(batch_size = batch_size, batches = True, prefetch = prefetch)
+        closed_by_worker = False
+
+        try:
+            while True:
+                try:
+                    batch = await run_blocking(next, rows, None, executor = self.executor, cancel = self.cancel, cleanup = lambda future: self._on_worker(self._close_stream, rows))
+
+                except asyncio.CancelledError:
+                    closed_by_worker = True
+                    raise
+
+                if batch is None:
+                    return
+
+                if batches:
+                    yield batch
+                else:
+                    for row in batch:
+                        yield row
+
+        finally:
+            if not closed_by_worker:
+                await run_blocking(self._close_stream, rows, executor = self.executor)
+
+    async def close(self):
+        if self.service.controller.connection is None:
+            self._release_slot()
+            return None
+
+        try:
+            return await run_blocking(self.service.controller.close, executor = self.executor)
+
+        finally:
+            self._release_slot()
+
+    async def _call(self, method, *args, **kwargs):
+        return await run_blocking(method, *args, executor = self.executor, cancel = self.cancel, **kwargs)
+
+    def _close_if_cancelled(self, future):
+        if future.cancelled():
+            self._on_worker(self._close_controller)
+        else:
+            self._release_slot()
+
+    def _close_controller(self):
+        try:
+            self.service.controller.close()
+        except Exception as e:
+            self.service.logger.error("SQL_ASC_CLS: Closing cancelled statement failed, %s", e)
+        finally:
+            self._release_slot()
+
+    def _on_worker(self, func, *args):
+        try:
+            (self.executor or get_executor()).submit(func, *args)
+        except RuntimeError:
+            func(*args)
+
+    def _close_stream(self, rows):
+        try:
+            rows.close()
+        finally:
+            self._release_slot()
+
+    def _release_slot(self, future = None):
+        async_pool, self.async_pool = self.async_pool, None
+
+        if async_pool is not None:
+            async_pool.release()
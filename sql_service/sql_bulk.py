@@ -0,0 +1,214 @@
+import concurrent.futures
+import csv
+import datetime
+import decimal
+import itertools
+import logging
+import math
+import os
+import time
+from pathlib import Path
+
+from sql_service import sql_controller
+from sql_service import utils
+
+DEFAULT_ROWS_PER_FILE = 100000
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_STREAMS = 4
+
+staged_values = {
+    bool: int,
+    bytes: bytes.hex,
+    bytearray: bytearray.hex
+}
+
+
+def stage_temporal(value):
+    # DATETIME only takes milliseconds, so keep microseconds only when the value has them
+    timespec = "milliseconds" if value.microsecond % 1000 == 0 else "microseconds"
+
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep = " ", timespec = timespec)
+
+    return value.isoformat(timespec = timespec)
+
+def stage_value(value):
+    if value is None:
+        return ""
+
+    if type(value) in staged_values:
+        value = staged_values[type(value)](value)
+
+    if isinstance(value, (float, decimal.Decimal)) and not math.isfinite(value):
+        raise ValueError(f"Trying to stage rows for BULK INSERT. {value} has no SQL Server representation")
+
+    if isinstance(value, (int, float)):
+        return repr(value)
+
+    if isinstance(value, decimal.Decimal):
+        return format(value, "f")
+
+    if isinstance(value, (datetime.datetime, datetime.time)):
+        return '"' + stage_temporal(value) + '"'
+
+    if isinstance(value, datetime.date):
+        return '"' + value.isoformat() + '"'
+
+    return '"' + str(value).replace('"', '""') + '"'
+
+def stage_row(row):
+    return ",".join(stage_value(value) for value in row) + "\n"
+
+def bulk_options(batch_size = DEFAULT_BATCH_SIZE, tablock = True):
+    options = [
+        "FORMAT = 'CSV'",
+        "FIELDQUOTE = '\"'",
+        "FIELDTERMINATOR = ','",
+        "ROWTERMINATOR = '0x0a'",
+        "CODEPAGE = '65001'",
+        "KEEPNULLS",
+        f"BATCHSIZE = {int(batch_size)}"
+    ]
+
+    if tablock:
+        options.append("TABLOCK")
+
+    return ", ".join(options)
+
+
+class BulkLoader():
+
+    def __init__(self, driver, server, database, username, password, staging_dir, server_staging_dir = None, rows_per_file = DEFAULT_ROWS_PER_FILE, batch_size = DEFAULT_BATCH_SIZE, tablock = True, streams = DEFAULT_STREAMS, pooled = True, keep_files = False, log_level = logging.INFO, sql_log_length = None, log_file = None):
+        if rows_per_file < 1 or batch_size < 1 or streams < 1:
+            raise ValueError("rows_per_file, batch_size and streams must all be at least 1")
+
+        self.logger = utils.create_logger(log_level, sql_log_length, log_file = log_file)
+
+        self.driver = driver
+        self.server = server
+        self.database = database
+        self.username = username
+        self.password = password
+        self.pooled = pooled
+
+        self.staging_dir = Path(staging_dir)
+        self.server_staging_dir = str(server_staging_dir) if server_staging_dir is not None else None
+        self.rows_per_file = rows_per_file
+        self.options = bulk_options(batch_size, tablock)
+        self.streams = streams
+        self.keep_files = keep_files
+
+    def load(self, table, rows, progress = None):
+        self.staging_dir.mkdir(parents = True, exist_ok = True)
+
+        load_id = utils.generate_uuid().hex
+        iterator = iter(rows)
+        started = time.perf_counter()
+
+        pending = set()
+        staged = []
+        rows_loaded = 0
+        files = 0
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers = self.streams, thread_name_prefix = "sql_service-bulk") as executor:
+            try:
+                for part in itertools.count():
+                    path, count = self.stage(iterator, load_id, part)
+
+                    if count == 0:
+                        os.remove(path)
+                        break
+
+                    staged.append(path)
+                    pending.add(executor.submit(self.load_file, table, path, count))
+
+                    while len(pending) >= self.streams * 2:
+                        done, pending = concurrent.futures.wait(pending, return_when = concurrent.futures.FIRST_COMPLETED)
+                        rows_loaded, files = self.collect(done, rows_loaded, files, started, progress)
+
+                    if count < self.rows_per_file:
+                        break
+
+                done, pending = concurrent.futures.wait(pending)
+                rows_loaded, files = self.collect(done, rows_loaded, files, started, progress)
+
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+
+                concurrent.futures.wait(pending)
+                raise
+
+            finally:
+                if not self.keep_files:
+                    for path in staged:
+                        if path.exists():
+                            os.remove(path)
+
+        seconds = time.perf_counter() - started
+        rows_per_second = rows_loaded / seconds if seconds else 0.0
+
+        self.logger.info("SQL_BLK_LOD: Loaded %d rows into %s from %d files in %.3fs (%.0f rows/s)", rows_loaded, table, files, seconds, rows_per_second)
+
+        return {
+            'table': table,
+            'rows': rows_loaded,
+            'files': files,
+            'seconds': seconds,
+            'rows_per_second': rows_per_second
+        }
+
+    def load_csv(self, table, path, header = True, delimiter = ",", encoding = "utf-8", progress = None):
+        with open(path, newline = "", encoding = encoding) as file:
+            reader = csv.reader(file, delimiter = delimiter)
+
+            if header:
+                next(reader, None)
+
+            return self.load(table, ([value or None for value in row] for row in reader), progress = progress)
+
+    def stage(self, iterator, load_id, part):
+        path = self.staging_dir / f"{load_id}_{part:05d}.csv"
+        count = 0
+
+        with open(path, 'w', newline = "", encoding = "utf-8") as file:
+            for row in itertools.islice(iterator, self.rows_per_file):
+                file.write(stage_row(row))
+                count += 1
+
+        self.logger.debug("SQL_BLK_STG: Staged %d rows in %s", count, path)
+
+        return path, count
+
+    def server_path(self, path):
+        if self.server_staging_dir is None:
+            return str(path.resolve())
+
+        separator = "\\" if "\\" in self.server_staging_dir else "/"
+
+        return self.server_staging_dir.rstrip("\\/") + separator + path.name
+
+    def load_file(self, table, path, rows):
+        controller = sql_controller.SqlController({'table': table}, utils.generate_uuid(), self.logger, self.driver, self.server, self.database, self.username, self.password, pooled = self.pooled)
+
+        try:
+            controller.bulk_load(self.server_path(path), rows, self.options)
+
+        finally:
+            controller.close()
+
+        if not self.keep_files:
+            os.remove(path)
+
+        return rows
+
+    def collect(self, done, rows_loaded, files, started, progress):
+        for future in done:
+            rows_loaded += future.result()
+            files += 1
+
+            if progress is not None:
+                seconds = time.perf_counter() - started
+                progress(rows_loaded, rows_loaded / seconds if seconds else 0.0)
+
+        return rows_loaded, files
@@ -0,0 +1,301 @@
+import collections
+import collections.abc
+import re
+import sys
+import threading
+import time
+
+from sql_service import sql_rows
+
+DEFAULT_TTL = 30
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+SIZE_SAMPLE = 8
+
+MISS = object()
+
+whitespace_pattern = re.compile(r"\s+")
+
+_shared_cache = None
+_shared_single_flight = None
+_shared_cache_lock = threading.Lock()
+
+
+class CacheEntry():
+    __slots__ = ('value', 'table', 'size', 'expires_at')
+
+    def __init__(self, value, table, size, expires_at):
+        self.value = value
+        self.table = table
+        self.size = size
+        self.expires_at = expires_at
+
+
+class FrozenResult():
+    __slots__ = ('columns', 'rows', 'row_format', 'table')
+
+    def __init__(self, columns, rows, row_format, table = False):
+        self.columns = columns
+        self.rows = rows
+        self.row_format = row_format
+        self.table = table
+
+
+class ResultCache():
+
+    def __init__(self, ttl = DEFAULT_TTL, max_bytes = DEFAULT_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.entries = collections.OrderedDict()
+        self.tables = collections.defaultdict(set)
+        self.generations = collections.defaultdict(int)
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return MISS
+
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return thaw_result(entry.value)
+
+    def generation(self, table):
+        with self.lock:
+            return self.generations[table_key(table)]
+
+    def put(self, key, table, value, generation = None):
+        table = table_key(table)
+        size = estimate_size(value)
+
+        if size > self.max_bytes:
+            return False
+
+        with self.lock:
+            if generation is not None and generation != self.generations[table]:
+                return False
+
+            if key in self.entries:
+                self._remove(key)
+
+            self.entries[key] = CacheEntry(freeze_result(value), table, size, time.monotonic() + self.ttl)
+            self.tables[table].add(key)
+            self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+        return True
+
+    def invalidate(self, table):
+        table = table_key(table)
+
+        with self.lock:
+            self.generations[table] += 1
+
+            keys = self.tables.pop(table, ())
+
+            for key in list(keys):
+                self._remove(key)
+
+            self.invalidations += len(keys)
+
+            return len(keys)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.tables.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.bytes -= entry.size
+
+        keys = self.tables.get(entry.table)
+
+        if keys is not None:
+            keys.discard(key)
+
+            if not keys:
+                del self.tables[entry.table]
+
+
+class Flight():
+    __slots__ = ('done', 'result', 'exception', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+        self.waiters = 0
+
+
+class SingleFlight():
+
+    def __init__(self):
+        self.flights = {}
+        self.lock = threading.Lock()
+
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key, func, *args, **kwargs):
+        with self.lock:
+            flight = self.flights.get(key)
+
+            if flight is None:
+                flight = self.flights[key] = Flight()
+                self.executions += 1
+                leader = True
+
+            else:
+                flight.waiters += 1
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+
+            if flight.exception is not None:
+                raise flight.exception
+
+            return copy_result(flight.result)
+
+        try:
+            flight.result = func(*args, **kwargs)
+
+        except BaseException as e:
+            flight.exception = e
+            raise
+
+        finally:
+            with self.lock:
+                del self.flights[key]
+
+            flight.done.set()
+
+        return flight.result
+
+    def stats(self):
+        with self.lock:
+            return {
+                'in_flight': len(self.flights),
+                'executions': self.executions,
+                'shared': self.shared
+            }
+
+
+def get_cache(ttl = DEFAULT_TTL, max_bytes = DEFAULT_MAX_BYTES):
+    global _shared_cache
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResultCache(ttl, max_bytes)
+
+        return _shared_cache
+
+def get_single_flight():
+    global _shared_single_flight
+
+    with _shared_cache_lock:
+        if _shared_single_flight is None:
+            _shared_single_flight = SingleFlight()
+
+        return _shared_single_flight
+
+def table_key(table):
+    return table.replace('[', '').replace(']', '').strip().lower()
+
+def cache_key(server, database, username, table, columns, where, row_format = "dict"):
+    columns = ",".join(column.strip() for column in columns.split(','))
+    where = whitespace_pattern.sub(" ", where).strip() if where else None
+
+    return (server.lower(), database.lower(), username, table_key(table), columns, where, row_format)
+
+def row_shape(row):
+    if isinstance(row, dict):
+        return tuple(row), "dict"
+
+    if isinstance(row, sql_rows.LazyRow):
+        return tuple(row), "lazy"
+
+    if isinstance(row, sql_rows.SlotsRow):
+        return row._columns, "slots"
+
+    return None, None
+
+def freeze_result(value):
+    if isinstance(value, dict) and 'rows' in value:
+        return FrozenResult(tuple(value['columns']), tuple(tuple(row) for row in value['rows']), None, table = True)
+
+    if not isinstance(value, list):
+        return value
+
+    columns, row_format = row_shape(value[0]) if value else (None, None)
+
+    if row_format is None:
+        return FrozenResult(columns, tuple(value), None)
+
+    return FrozenResult(columns, tuple(tuple(row.values()) if isinstance(row, collections.abc.Mapping) else tuple(row) for row in value), row_format)
+
+def thaw_result(value):
+    if not isinstance(value, FrozenResult):
+        return value
+
+    rows = list(value.rows) if value.row_format is None else sql_rows.format_rows(value.rows, value.columns, value.row_format)
+
+    if value.table:
+        return {'columns': list(value.columns), 'rows': rows}
+
+    return rows
+
+def copy_result(value):
+    return thaw_result(freeze_result(value))
+
+def estimate_size(value):
+    rows = value['rows'] if isinstance(value, dict) and 'rows' in value else value
+
+    if not isinstance(rows, list) or not rows:
+        return sys.getsizeof(rows)
+
+    sample = rows[:SIZE_SAMPLE]
+    sample_size = sum(row_size(row) for row in sample)
+
+    return sys.getsizeof(rows) + sample_size * len(rows) // len(sample)
+
+def row_size(row):
+    values = row.values() if isinstance(row, collections.abc.Mapping) else row
+
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in values)
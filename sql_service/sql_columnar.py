@@ -0,0 +1,85 @@
+import datetime
+import decimal
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+column_dtypes = {
+    bool: ('bool', False),
+    int: ('int64', 0),
+    float: ('float64', None),
+    decimal.Decimal: ('float64', None),
+    datetime.datetime: ('datetime64[us]', None),
+    datetime.date: ('datetime64[D]', None)
+}
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError("numpy is required for columnar SELECT results. Install it with 'pip install numpy'")
+
+def column_dtype(type_code):
+    return column_dtypes.get(type_code, (object, None))
+
+def column_array(values, dtype, fill):
+    mask = [value is None for value in values]
+
+    if fill is not None and any(mask):
+        values = [fill if value is None else value for value in values]
+
+    return numpy.array(values, dtype = dtype), numpy.array(mask, dtype = bool)
+
+def get_columnar_results(cursor, batch_size, logger):
+    logger.debug("SQL_SVC_GT_CLR: Attempting to get columnar results from cursor")
+    try:
+        require_numpy()
+
+        description = cursor.description
+        columns = [column[0] for column in description]
+        dtypes = [column_dtype(column[1]) for column in description]
+
+        chunks = [[] for _ in columns]
+        masks = [[] for _ in columns]
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+
+            if not rows:
+                break
+
+            for position, values in enumerate(zip(*rows)):
+                dtype, fill = dtypes[position]
+                data, mask = column_array(values, dtype, fill)
+
+                chunks[position].append(data)
+                masks[position].append(mask)
+
+        results = {}
+
+        for position, column in enumerate(columns):
+            dtype = dtypes[position][0]
+            data = numpy.concatenate(chunks[position]) if chunks[position] else numpy.empty(0, dtype = dtype)
+            mask = numpy.concatenate(masks[position]) if masks[position] else numpy.empty(0, dtype = bool)
+
+            results[column] = numpy.ma.MaskedArray(data, mask = mask)
+
+        msg = 'Successfully got columnar results from cursor'
+        logger.info("SQL_SVC_GT_CLR: %s (%d columns)", msg, len(columns))
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': results
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to get columnar results from cursor, {e}'
+        logger.error("SQL_SVC_GT_CLR_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
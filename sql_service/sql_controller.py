@@ -1,32 +1,79 @@
+import concurrent.futures
+import contextlib
+import time
+import weakref
+
 from sql_service import utils
+from sql_service import sql_pool
 from sql_service import sql_service
+from sql_service import sql_columnar
+from sql_service import sql_cache
+from sql_service import sql_stats
+from sql_service import sql_export
+from sql_service import sql_partition
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_DELETE_CHUNK_SIZE = 4000
+
+
+def release_dropped(connection, logger):
+    try:
+        logger.warning("SQL_CLR_DRP: Releasing a connection whose controller was dropped without being closed")
+        connection.release(logger, discard = True)
+
+    except Exception:
+        pass
+
 
 class SqlController():
 
-    def __init__(self, params, transaction_id, logger, driver, server, database, username, password):
+    def __init__(self, params, transaction_id, logger, driver, server, database, username, password, pooled = True, cache = None, coalesce = None):
         self.driver = driver
         self.server = server
         self.database = database
         self.username = username
         self.password = password
         self.logger = logger
-        
-        self.cursor = self.connect()
+        self.pooled = pooled
+        self.cache = cache
+        self.coalesce = coalesce
+
+        self.connection = None
+        self.finalizer = None
+        self.in_transaction = False
+        self.pending_rows = 0
+        self.pending_tables = set()
+        self.last_timings = {}
+        self.last_columns = None
+        self.first_operation = True
+        self.active_cursor = None
+        self.cursor = self.timed("connect", self.connect)
         
         self.transaction_id = transaction_id
         self.params = params
 
     def connect(self):
-        conn_string = sql_service.form_conn_string(self.driver, self.server, self.database, self.username, self.password, self.logger)
-        if conn_string['error']:
-            raise RuntimeError("Error when forming connection string")
+        if self.pooled:
+            pool = sql_pool.get_pool(self.driver, self.server, self.database, self.username, self.password, self.logger)
+            self.connection = pool.borrow(self.logger)
+
+        else:
+            conn_string = sql_service.form_conn_string(self.driver, self.server, self.database, self.username, self.password, self.logger)
+            if conn_string['error']:
+                raise RuntimeError("Error when forming connection string")
+
+            conn =  sql_service.connect(conn_string['data'], self.logger)       
+            if conn['error']:
+                raise ConnectionError(conn['exception'])
 
-        conn =  sql_service.connect(conn_string['data'], self.logger)       
-        if conn['error']:
-            raise ConnectionError(conn['exception'])
+            self.connection = sql_pool.PooledConnection(conn['data'])
+
+        self.finalizer = weakref.finalize(self, release_dropped, self.connection, self.logger)
         
-        cursor = sql_service.create_cursor(conn['data'], self.logger)
+        cursor = sql_service.create_cursor(self.connection.conn, self.logger)
         if cursor['error']:
+            self.release(discard = True)
             raise ConnectionError(cursor['exception'])
 
         self.cursor = cursor['data']
@@ -34,109 +81,806 @@ class SqlController():
         return cursor['data']
 
     def close(self):
-        close_cursor = sql_service.close_cursor(self.cursor, self.logger)
+        close_cursor = self.timed("close", sql_service.close_cursor, self.cursor, self.logger)
         
         if close_cursor['error']:
-            self.logger.error(f"SQL_CLR_CLS: Closing cursor failed. Retrying")
+            self.logger.error("SQL_CLR_CLS: Closing cursor failed. Retrying")
             
-            close_cursor = sql_service.close_cursor(self.cursor, self.logger)
+            close_cursor = self.timed("close", sql_service.close_cursor, self.cursor, self.logger)
 
             if close_cursor['error']:
+                self.release(discard = True)
                 raise Exception(close_cursor['exception'])
+
+        self.timed("close", self.release)
             
         return close_cursor['data']
 
-    def delete(self):
-        statement = sql_service.form_delete_statement(table = self.params['table'], where = self.params['where'], logger = self.logger)
+    def release(self, discard = False):
+        connection, self.connection = self.connection, None
+        self.active_cursor = None
+
+        if self.finalizer is not None:
+            self.finalizer.detach()
+
+        if connection is None:
+            return None
+
+        return connection.release(self.logger, discard = discard)
+
+    def statement_cursor(self, statement, params):
+        if not params or self.connection is None:
+            return self.cursor
+
+        return self.connection.statements.cursor_for(statement, self.logger)
+
+    def delete(self, request = None):
+        request = request or self.params
+
+        where, params = self.timed("form", utils.parameterize, request['where'])
+
+        statement = self.timed("form", sql_service.form_delete_statement, table = request['table'], where = where, logger = self.logger)
         if statement['error']:
             raise OSError(statement['exception'])
 
-        result = sql_service.execute_formed_statement(self.cursor, statement['data'], self.logger)
+        result = self.execute(sql_service.execute_formed_statement, self.statement_cursor(statement['data'], params), statement['data'], self.logger, params)
         if result['error']:
             self.rollback()
             raise Exception(result['exception'])
         
-        commit = sql_service.commit(result['data'], result['data'].rowcount, self.logger)
+        commit = self.commit(result['data'], result['data'].rowcount, request['table'])
         if commit['error']:
             self.rollback()
             raise Exception(commit['exception'])
 
         return commit
 
-    def insert(self):
-        params = utils.listify_string(self.params['values'])
+    def delete_chunked(self, chunk_size = DEFAULT_DELETE_CHUNK_SIZE, sleep = 0, max_seconds = None, progress = None, request = None):
+        request = request or self.params
 
-        statement = sql_service.form_insert_statement(self.params['table'], self.params['columns'], params, self.logger)
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be at least 1, got {chunk_size}")
+
+        if self.in_transaction:
+            raise RuntimeError("Chunked DELETE commits every chunk and cannot run inside a transaction")
+
+        where, params = self.timed("form", utils.parameterize, utils.strip_where(request['where']))
+
+        statement = self.timed("form", sql_service.form_delete_top_statement, request['table'], where, self.logger)
         if statement['error']:
             raise OSError(statement['exception'])
 
-        result = sql_service.execute_formed_statement(self.cursor, statement['data'], self.logger)
+        params = [chunk_size] + params
+        started = time.perf_counter()
+        deleted = 0
+        chunks = 0
+
+        while True:
+            result = self.execute(sql_service.execute_formed_statement, self.statement_cursor(statement['data'], params), statement['data'], self.logger, params)
+            if result['error']:
+                self.rollback()
+                raise Exception(result['exception'])
+
+            rows = result['data'].rowcount
+            if rows < 0:
+                self.rollback()
+                raise Exception("Chunked DELETE needs the row count of every chunk to know when to stop, but the driver reported none. Check the connection does not SET NOCOUNT ON")
+
+            commit = self.commit(result['data'], rows, request['table'])
+            if commit['error']:
+                self.rollback()
+                raise Exception(commit['exception'])
+
+            deleted += rows
+            chunks += 1
+            complete = rows < chunk_size
+
+            if progress is not None:
+                progress(deleted, chunks)
+
+            if complete or (max_seconds is not None and time.perf_counter() - started >= max_seconds):
+                break
+
+            if sleep:
+                time.sleep(sleep)
+
+        self.logger.info("SQL_CLR_DLT_CHK: Deleted %d rows from %s in %d chunks (%s)", deleted, request['table'], chunks, "complete" if complete else "stopped at time budget")
+
+        return dict(commit, data = f"{deleted} row(s) affected", deleted = deleted, chunks = chunks, complete = complete)
+
+    def insert(self, request = None):
+        request = request or self.params
+
+        params = utils.split_values(request['values'])
+
+        statement = self.timed("form", sql_service.form_insert_statement, request['table'], request['columns'], utils.placeholders(len(params)), self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        result = self.execute(sql_service.execute_formed_statement, self.statement_cursor(statement['data'], params), statement['data'], self.logger, params)
         if result['error']:
             self.rollback()
 
             raise Exception(result['exception'])
 
-        commit = sql_service.commit(result['data'], result['data'].rowcount, self.logger)
+        commit = self.commit(result['data'], result['data'].rowcount, request['table'])
         if commit['error']:
             self.rollback()
             raise Exception(commit['exception'])
 
         return commit
 
-    def select(self):
-        query = sql_service.form_select_query(self.params['table'], attributes = self.params['columns'], where = self.params['where'], logger = self.logger)
+    def bulk_insert(self, rows, batch_size = DEFAULT_BATCH_SIZE, commit_per_batch = True, request = None):
+        request = request or self.params
+
+        columns = utils.split_columns(request['columns'])
+
+        statement = self.timed("form", sql_service.form_insert_statement, request['table'], ",".join(columns), utils.placeholders(len(columns)), self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        rows_affected = 0
+        commit = None
+
+        for chunk in utils.chunked(rows, batch_size):
+            result = self.execute(sql_service.execute_many, self.cursor, statement['data'], [utils.row_values(row, columns) for row in chunk], self.logger)
+            if result['error']:
+                self.rollback()
+                raise Exception(result['exception'])
+
+            rows_affected += len(chunk)
+
+            if commit_per_batch and not self.in_transaction:
+                commit = self.commit(result['data'], rows_affected, request['table'])
+                if commit['error']:
+                    self.rollback()
+                    raise Exception(commit['exception'])
+
+        if commit is None or not commit_per_batch:
+            commit = self.commit(self.cursor, rows_affected, request['table'])
+            if commit['error']:
+                self.rollback()
+                raise Exception(commit['exception'])
+
+        return commit
+
+    def bulk_upsert(self, rows, key, batch_size = DEFAULT_BATCH_SIZE, insert = True, request = None):
+        request = request or self.params
+
+        columns = utils.split_columns(request['columns'])
+        keys = utils.split_columns(key)
+
+        missing = [column for column in keys if column not in columns]
+        if missing:
+            raise ValueError(f"Key column(s) {', '.join(missing)} must be included in the columns")
+
+        values = [column for column in columns if column not in keys]
+        if not insert and not values:
+            raise ValueError("A bulk update needs at least one column besides the key")
+
+        staging_table = "#staging_" + utils.generate_uuid().hex
+        on = " AND ".join(f"target.{column} = source.{column}" for column in keys)
+        assignments = ", ".join(f"{column} = source.{column}" for column in values)
+
+        statement = self.timed("form", sql_service.form_staging_table_statement, staging_table, request['table'], ",".join(columns), self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        result = self.execute(sql_service.execute_formed_statement, self.cursor, statement['data'], self.logger)
+        if result['error']:
+            self.rollback()
+            raise Exception(result['exception'])
+
+        statement = self.timed("form", sql_service.form_insert_statement, staging_table, ",".join(columns), utils.placeholders(len(columns)), self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        for chunk in utils.chunked(rows, batch_size):
+            result = self.execute(sql_service.execute_many, self.cursor, statement['data'], [utils.row_values(row, columns) for row in chunk], self.logger)
+            if result['error']:
+                self.rollback()
+                raise Exception(result['exception'])
+
+        if insert:
+            clauses = f"WHEN MATCHED THEN UPDATE SET {assignments} " if values else ""
+            clauses += f"WHEN NOT MATCHED BY TARGET THEN INSERT ({','.join(columns)}) VALUES ({','.join(f'source.{column}' for column in columns)})"
+
+            statement = self.timed("form", sql_service.form_merge_statement, request['table'], staging_table, on, clauses, self.logger)
+            if statement['error']:
+                raise OSError(statement['exception'])
+
+            result = self.execute(sql_service.execute_formed_query, self.cursor, statement['data'], self.logger)
+            if result['error']:
+                self.rollback()
+                raise Exception(result['exception'])
+
+            counts = self.timed("fetch", sql_service.get_results, result['data'], self.logger)
+            if counts['error']:
+                self.rollback()
+                raise Exception(counts['exception'])
+
+            inserted, updated = counts['data'][0] if counts['data'] else (0, 0)
+
+        else:
+            statement = self.timed("form", sql_service.form_update_from_statement, request['table'], staging_table, assignments, on, self.logger)
+            if statement['error']:
+                raise OSError(statement['exception'])
+
+            result = self.execute(sql_service.execute_formed_statement, self.cursor, statement['data'], self.logger)
+            if result['error']:
+                self.rollback()
+                raise Exception(result['exception'])
+
+            inserted = 0
+            updated = max(result['data'].rowcount, 0)
+
+        statement = self.timed("form", sql_service.form_drop_table_statement, staging_table, self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        result = self.execute(sql_service.execute_formed_statement, self.cursor, statement['data'], self.logger)
+        if result['error']:
+            self.rollback()
+            raise Exception(result['exception'])
+
+        commit = self.commit(self.cursor, inserted + updated, request['table'])
+        if commit['error']:
+            self.rollback()
+            raise Exception(commit['exception'])
+
+        return dict(commit, inserted = inserted, updated = updated)
+
+    def bulk_load(self, path, rows, options, request = None):
+        request = request or self.params
+
+        statement = self.timed("form", sql_service.form_bulk_insert_statement, request['table'], path, options, self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        result = self.execute(sql_service.execute_formed_statement, self.cursor, statement['data'], self.logger)
+        if result['error']:
+            self.rollback()
+            raise Exception(result['exception'])
+
+        commit = self.commit(result['data'], rows, request['table'])
+        if commit['error']:
+            self.rollback()
+            raise Exception(commit['exception'])
+
+        return commit
+
+    def select(self, row_format = "dict", request = None):
+        request = request or self.params
+
+        if (self.cache is None and self.coalesce is None) or sql_cache.table_key(request['table']) in self.pending_tables:
+            return self.query(row_format, request)
+
+        key = sql_cache.cache_key(self.server, self.database, self.username, request['table'], request['columns'], request['where'], row_format)
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not sql_cache.MISS:
+                self.logger.debug("SQL_CLR_CHE: Returning cached results for table %s", request['table'])
+                return cached
+
+            generation = self.cache.generation(request['table'])
+
+        if self.coalesce is not None:
+            results = self.coalesce.do(key, self.query, row_format, request)
+        else:
+            results = self.query(row_format, request)
+
+        if self.cache is not None:
+            self.cache.put(key, request['table'], results, generation)
+
+        return results
+
+    def query(self, row_format, request):
+        where, params = self.timed("form", utils.parameterize, request['where'])
+
+        query = self.timed("form", sql_service.form_select_query, request['table'], attributes = request['columns'], where = where, logger = self.logger)
         if query['error']:
             raise OSError(query['exception'])
 
-        query_results = sql_service.execute_formed_query(self.cursor, query['data'], self.logger)
+        query_results = self.execute(sql_service.execute_formed_query, self.statement_cursor(query['data'], params), query['data'], self.logger, params)
         if query_results['error']:
             self.rollback()
             raise Exception(query_results['exception'])
 
-        columns = sql_service.get_columns(self.cursor.description, self.logger)
+        columns = self.timed("fetch", sql_service.get_columns, query_results['data'].description, self.logger)
         if columns['error']:
             raise Exception(columns['exception'])
 
-        results = sql_service.get_results(self.cursor, self.logger)
+        results = self.timed("fetch", sql_service.get_results, query_results['data'], self.logger)
         if results['error']:
             raise Exception(results['exception'])
 
-        results_cols = sql_service.zip_columns_results(results['data'], columns['data'], self.logger)
+        results_cols = self.timed("transform", sql_service.zip_columns_results, results['data'], columns['data'], self.logger, row_format)
         if results_cols['error']:
             raise Exception(results_cols['exception'])
 
+        if row_format == "tuples":
+            return {
+                'columns': columns['data'],
+                'rows': results_cols['data']
+            }
+
         return results_cols['data']
 
-    def update(self):
-        if not self.params['where']:
-            self.params['where'] = ""
+    def select_page(self, key, page_size = DEFAULT_PAGE_SIZE, token = None, row_format = "dict", descending = False, request = None):
+        request = request or self.params
+
+        if page_size < 1:
+            raise ValueError(f"Page size must be at least 1, got {page_size}")
+
+        keys = utils.split_columns(key)
+        columns = utils.split_columns(request['columns'])
+
+        if "*" not in columns:
+            columns += [column for column in keys if column not in columns]
+
+        where, params = self.timed("form", utils.parameterize, utils.strip_where(request['where']))
+        conditions = [f"({where})"] if where else []
+
+        if token is not None:
+            seek, seek_params = utils.keyset_condition(keys, utils.decode_page_token(token, keys), descending)
+            conditions.append(seek)
+            params = params + seek_params
+
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        order_by = ", ".join(f"{key} {'DESC' if descending else 'ASC'}" for key in keys)
+        params = params + [page_size + 1]
+
+        query = self.timed("form", sql_service.form_select_page_query, request['table'], ",".join(columns), where, order_by, self.logger)
+        if query['error']:
+            raise OSError(query['exception'])
+
+        query_results = self.execute(sql_service.execute_formed_query, self.statement_cursor(query['data'], params), query['data'], self.logger, params)
+        if query_results['error']:
+            self.rollback()
+            raise Exception(query_results['exception'])
+
+        columns = self.timed("fetch", sql_service.get_columns, query_results['data'].description, self.logger)
+        if columns['error']:
+            raise Exception(columns['exception'])
+
+        results = self.timed("fetch", sql_service.get_results, query_results['data'], self.logger)
+        if results['error']:
+            raise Exception(results['exception'])
+
+        rows = results['data']
+        next_token = None
+
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            positions = [columns['data'].index(utils.column_name(key)) for key in keys]
+            next_token = utils.encode_page_token(keys, [rows[-1][position] for position in positions])
+
+        results_cols = self.timed("transform", sql_service.zip_columns_results, rows, columns['data'], self.logger, row_format)
+        if results_cols['error']:
+            raise Exception(results_cols['exception'])
+
+        page = {
+            'rows': results_cols['data'],
+            'next_token': next_token
+        }
+
+        if row_format == "tuples":
+            page['columns'] = columns['data']
+
+        return page
+
+    def select_partitioned(self, key, partitions = sql_partition.DEFAULT_PARTITIONS, mode = "range", ordered = False, order_by = None, descending = False, bounds = None, workers = None, row_format = "dict", request = None):
+        request = request or self.params
+
+        if partitions < 1:
+            raise ValueError(f"Partitions must be at least 1, got {partitions}")
+
+        if mode not in sql_partition.PARTITION_MODES:
+            raise ValueError(f"Invalid partition mode '{mode}'. Use one of: {', '.join(sql_partition.PARTITION_MODES)}")
+
+        if self.in_transaction:
+            raise RuntimeError("Partitioned SELECT runs on separate connections and cannot see changes pending in a transaction")
+
+        if mode == "range":
+            low, high = bounds if bounds is not None else self.key_bounds(key, request)
+            conditions = sql_partition.range_conditions(key, sql_partition.range_boundaries(low, high, partitions))
         else:
-            self.params['where'] = "WHERE " + self.params['where']
+            conditions = sql_partition.modulo_conditions(key, partitions)
+
+        keys = utils.split_columns(order_by or key)
+        columns = utils.split_columns(request['columns'])
+
+        if ordered and "*" not in columns:
+            columns += [column for column in keys if column not in columns]
 
-        params = utils.unpack_dict_list(self.params['params'])
+        order_by = ", ".join(f"{key} {'DESC' if descending else 'ASC'}" for key in keys) if ordered else None
+        where, params = self.timed("form", utils.parameterize, utils.strip_where(request['where']))
 
-        statement = sql_service.form_update_statement(self.params['table'], params, self.params['where'], self.logger)
+        with concurrent.futures.ThreadPoolExecutor(max_workers = min(workers or len(conditions), len(conditions)), thread_name_prefix = "sql_service-partition") as executor:
+            futures = [executor.submit(self.partition, request, ",".join(columns), where, params + condition_params, condition, order_by) for condition, condition_params in conditions]
+
+            try:
+                results = [future.result() for future in (futures if ordered else concurrent.futures.as_completed(futures))]
+
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        columns = results[0]['columns']
+
+        if ordered:
+            positions = [columns.index(utils.column_name(key)) for key in keys]
+            rows = self.timed("transform", sql_partition.merge, [result['rows'] for result in results], positions, descending)
+        else:
+            rows = [row for result in results for row in result['rows']]
+
+        self.logger.info("SQL_CLR_PRT: Read %d rows from %d %s partitions of %s", len(rows), len(conditions), mode, request['table'])
+
+        results_cols = self.timed("transform", sql_service.zip_columns_results, rows, columns, self.logger, row_format)
+        if results_cols['error']:
+            raise Exception(results_cols['exception'])
+
+        if row_format == "tuples":
+            return {
+                'columns': columns,
+                'rows': results_cols['data']
+            }
+
+        return results_cols['data']
+
+    def key_bounds(self, key, request):
+        where, params = self.timed("form", utils.parameterize, request['where'])
+
+        query = self.timed("form", sql_service.form_select_query, request['table'], attributes = f"MIN({key}),MAX({key})", where = where, logger = self.logger)
+        if query['error']:
+            raise OSError(query['exception'])
+
+        query_results = self.execute(sql_service.execute_formed_query, self.statement_cursor(query['data'], params), query['data'], self.logger, params)
+        if query_results['error']:
+            self.rollback()
+            raise Exception(query_results['exception'])
+
+        results = self.timed("fetch", sql_service.get_results, query_results['data'], self.logger)
+        if results['error']:
+            raise Exception(results['exception'])
+
+        return results['data'][0][0], results['data'][0][1]
+
+    def partition(self, request, columns, where, params, condition, order_by):
+        conditions = [f"({where})"] if where else []
+
+        if condition:
+            conditions.append(condition)
+
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        controller = SqlController(request, self.transaction_id, self.logger, self.driver, self.server, self.database, self.username, self.password, pooled = self.pooled)
+
+        try:
+            if order_by:
+                query = controller.timed("form", sql_service.form_select_ordered_query, request['table'], columns, where, order_by, self.logger)
+            else:
+                query = controller.timed("form", sql_service.form_select_query, request['table'], attributes = columns, where = where, logger = self.logger)
+
+            if query['error']:
+                raise OSError(query['exception'])
+
+            query_results = controller.execute(sql_service.execute_formed_query, controller.statement_cursor(query['data'], params), query['data'], self.logger, params)
+            if query_results['error']:
+                controller.rollback()
+                raise Exception(query_results['exception'])
+
+            columns = controller.timed("fetch", sql_service.get_columns, query_results['data'].description, self.logger)
+            if columns['error']:
+                raise Exception(columns['exception'])
+
+            results = controller.timed("fetch", sql_service.get_results, query_results['data'], self.logger)
+            if results['error']:
+                raise Exception(results['exception'])
+
+        finally:
+            controller.close()
+
+        return {
+            'columns': columns['data'],
+            'rows': results['data']
+        }
+
+    def select_by_keys(self, key_column, keys, chunk_size = sql_partition.DEFAULT_KEY_CHUNK_SIZE, workers = None, preserve_order = False, table_threshold = sql_partition.DEFAULT_KEY_TABLE_THRESHOLD, row_format = "dict", request = None):
+        request = request or self.params
+
+        keys = sql_partition.unique_keys(keys)
+        columns = utils.split_columns(request['columns'])
+
+        if "*" not in columns and key_column not in columns:
+            columns.append(key_column)
+
+        where, params = self.timed("form", utils.parameterize, utils.strip_where(request['where']))
+
+        if chunk_size < 1 or chunk_size + len(params) > sql_partition.MAX_PARAMETERS:
+            raise ValueError(f"Chunk size must be between 1 and {sql_partition.MAX_PARAMETERS - len(params)}, got {chunk_size}")
+
+        if not keys:
+            results = []
+
+        elif len(keys) > table_threshold or self.in_transaction:
+            # Inside a transaction the chunks would run on other connections and block on its uncommitted locks
+            results = [self.select_by_key_table(request, key_column, keys, ",".join(columns), where, params)]
+
+        else:
+            chunks = list(sql_partition.key_chunks(keys, chunk_size))
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers = min(workers or len(chunks), len(chunks)), thread_name_prefix = "sql_service-keys") as executor:
+                futures = [executor.submit(self.partition, request, ",".join(columns), where, params + chunk, f"{key_column} IN ({utils.placeholders(len(chunk))})", None) for chunk in chunks]
+
+                try:
+                    results = [future.result() for future in futures]
+
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        columns = results[0]['columns'] if results else [utils.column_name(column) for column in columns]
+        rows = [row for result in results for row in result['rows']]
+
+        if preserve_order:
+            rows = self.timed("transform", sql_partition.order_by_keys, rows, columns.index(utils.column_name(key_column)), keys)
+
+        self.logger.info("SQL_CLR_KEY: Read %d rows of %s for %d keys", len(rows), request['table'], len(keys))
+
+        results_cols = self.timed("transform", sql_service.zip_columns_results, rows, columns, self.logger, row_format)
+        if results_cols['error']:
+            raise Exception(results_cols['exception'])
+
+        if row_format == "tuples":
+            return {
+                'columns': columns,
+                'rows': results_cols['data']
+            }
+
+        return results_cols['data']
+
+    def select_by_key_table(self, request, key_column, keys, columns, where, params):
+        key_table = "#keys_" + utils.generate_uuid().hex
+
+        statement = self.timed("form", sql_service.form_staging_table_statement, key_table, request['table'], key_column, self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        result = self.execute(sql_service.execute_formed_statement, self.cursor, statement['data'], self.logger)
+        if result['error']:
+            raise Exception(result['exception'])
+
+        statement = self.timed("form", sql_service.form_insert_statement, key_table, key_column, utils.placeholders(1), self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        result = self.execute(sql_service.execute_many, self.cursor, statement['data'], [(key,) for key in keys], self.logger)
+        if result['error']:
+            raise Exception(result['exception'])
+
+        conditions = [f"({where})"] if where else []
+        conditions.append(f"{key_column} IN (SELECT {key_column} FROM {key_table})")
+
+        query = self.timed("form", sql_service.form_select_query, request['table'], attributes = columns, where = "WHERE " + " AND ".join(conditions), logger = self.logger)
+        if query['error']:
+            raise OSError(query['exception'])
+
+        query_results = self.execute(sql_service.execute_formed_query, self.cursor, query['data'], self.logger, params)
+        if query_results['error']:
+            raise Exception(query_results['exception'])
+
+        columns = self.timed("fetch", sql_service.get_columns, query_results['data'].description, self.logger)
+        if columns['error']:
+            raise Exception(columns['exception'])
+
+        results = self.timed("fetch", sql_service.get_results, query_results['data'], self.logger)
+        if results['error']:
+            raise Exception(results['exception'])
+
+        statement = self.timed("form", sql_service.form_drop_table_statement, key_table, self.logger)
+        if statement['error']:
+            raise OSError(statement['exception'])
+
+        result = self.execute(sql_service.execute_formed_statement, self.cursor, statement['data'], self.logger)
+        if result['error']:
+            raise Exception(result['exception'])
+
+        return {
+            'columns': columns['data'],
+            'rows': results['data']
+        }
+
+    def iter_select(self, batch_size = DEFAULT_BATCH_SIZE, batches = False, row_format = "dict", request = None):
+        request = request or self.params
+
+        where, params = self.timed("form", utils.parameterize, request['where'])
+
+        query = self.timed("form", sql_service.form_select_query, request['table'], attributes = request['columns'], where = where, logger = self.logger)
+        if query['error']:
+            raise OSError(query['exception'])
+
+        query_results = self.execute(sql_service.execute_formed_query, self.cursor, query['data'], self.logger, params)
+        if query_results['error']:
+            self.rollback()
+            raise Exception(query_results['exception'])
+
+        columns = self.timed("fetch", sql_service.get_columns, self.cursor.description, self.logger)
+        if columns['error']:
+            raise Exception(columns['exception'])
+
+        self.last_columns = columns['data']
+
+        while True:
+            results = self.timed("fetch", sql_service.get_results_batch, self.cursor, batch_size, self.logger)
+            if results['error']:
+                raise Exception(results['exception'])
+
+            if not results['data']:
+                return
+
+            results_cols = self.timed("transform", sql_service.zip_columns_results, results['data'], columns['data'], self.logger, row_format)
+            if results_cols['error']:
+                raise Exception(results_cols['exception'])
+
+            if batches:
+                yield results_cols['data']
+            else:
+                yield from results_cols['data']
+
+    def export(self, destination, export_format = "csv", batch_size = DEFAULT_BATCH_SIZE, compress = None, header = True, progress = None, request = None):
+        request = request or self.params
+
+        where, params = self.timed("form", utils.parameterize, request['where'])
+
+        query = self.timed("form", sql_service.form_select_query, request['table'], attributes = request['columns'], where = where, logger = self.logger)
+        if query['error']:
+            raise OSError(query['exception'])
+
+        query_results = self.execute(sql_service.execute_formed_query, self.cursor, query['data'], self.logger, params)
+        if query_results['error']:
+            self.rollback()
+            raise Exception(query_results['exception'])
+
+        results = self.timed("fetch", sql_export.export_results, query_results['data'], destination, export_format, batch_size, self.logger, compress = compress, header = header, progress = progress)
+        if results['error']:
+            raise Exception(results['exception'])
+
+        return results['data']
+
+    def select_columnar(self, batch_size = DEFAULT_BATCH_SIZE, request = None):
+        request = request or self.params
+
+        sql_columnar.require_numpy()
+
+        where, params = self.timed("form", utils.parameterize, request['where'])
+
+        query = self.timed("form", sql_service.form_select_query, request['table'], attributes = request['columns'], where = where, logger = self.logger)
+        if query['error']:
+            raise OSError(query['exception'])
+
+        query_results = self.execute(sql_service.execute_formed_query, self.cursor, query['data'], self.logger, params)
+        if query_results['error']:
+            self.rollback()
+            raise Exception(query_results['exception'])
+
+        results = self.timed("fetch", sql_columnar.get_columnar_results, query_results['data'], batch_size, self.logger)
+        if results['error']:
+            raise Exception(results['exception'])
+
+        return results['data']
+
+    def update(self, request = None):
+        request = request or self.params
+
+        where, where_params = self.timed("form", utils.parameterize, request['where'])
+
+        if not where:
+            where = ""
+        else:
+            where = "WHERE " + where
+
+        assignments, params = self.timed("form", utils.parameterize_dict_list, request['params'])
+        params = params + where_params
+
+        statement = self.timed("form", sql_service.form_update_statement, request['table'], assignments, where, self.logger)
         if statement['error']:
             raise OSError(statement['exception'])
 
-        result = sql_service.execute_formed_statement(self.cursor, statement['data'], self.logger)
+        result = self.execute(sql_service.execute_formed_statement, self.statement_cursor(statement['data'], params), statement['data'], self.logger, params)
         if result['error']:
             self.rollback()
             raise Exception(result['exception'])
 
-        commit = sql_service.commit(result['data'], result['data'].rowcount, self.logger)
+        commit = self.commit(result['data'], result['data'].rowcount, request['table'])
         if commit['error']:
             self.rollback()
             raise Exception(commit['exception'])
 
         return commit
 
+    def commit(self, cursor, rows_affected, table = None):
+        if self.in_transaction:
+            self.pending_rows += max(rows_affected, 0)
+
+            if table is not None:
+                self.pending_tables.add(sql_cache.table_key(table))
+
+            return {
+                'error': False,
+                'msg': 'Changes will be committed when the transaction ends',
+                'data': f"{rows_affected} row(s) affected",
+                'timings': dict(self.last_timings)
+            }
+
+        commit = self.timed("commit", sql_service.commit, cursor, rows_affected, self.logger)
+
+        if not commit['error'] and table is not None:
+            self.invalidate(table)
+
+        return dict(commit, timings = dict(self.last_timings))
+
+    def reset_timings(self):
+        # The connection is opened in __init__, so its time belongs to the first operation
+        self.last_timings = {stage: seconds for stage, seconds in self.last_timings.items() if stage == "connect" and self.first_operation}
+        self.first_operation = False
+
+    def timed(self, stage, func, *args, **kwargs):
+        return sql_stats.timed(self.last_timings, stage, func, *args, **kwargs)
+
+    def execute(self, func, cursor, *args):
+        self.active_cursor = cursor
+
+        return self.timed("execute", func, cursor, *args)
+
+    def invalidate(self, *tables):
+        if self.cache is None:
+            return
+
+        for table in tables:
+            invalidated = self.cache.invalidate(table)
+            self.logger.debug("SQL_CLR_INV: Invalidated %d cached result(s) for table %s", invalidated, table)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        if self.in_transaction:
+            raise RuntimeError("A transaction is already open on this controller")
+
+        self.in_transaction = True
+        self.pending_rows = 0
+        self.pending_tables = set()
+
+        try:
+            yield self
+
+        except BaseException:
+            self.in_transaction = False
+            self.pending_tables = set()
+            self.rollback()
+            raise
+
+        self.in_transaction = False
+        tables, self.pending_tables = self.pending_tables, set()
+
+        commit = self.timed("commit", sql_service.commit, self.cursor, self.pending_rows, self.logger)
+        if commit['error']:
+            self.rollback()
+            raise Exception(commit['exception'])
+
+        self.invalidate(*tables)
+
     def rollback(self):
         response = sql_service.rollback(self.cursor, self.logger)
         
         if response['error']:
-            self.logger.error(f"SQL_CLR_RBK: Rollback failed. Retrying")
+            self.logger.error("SQL_CLR_RBK: Rollback failed. Retrying")
 
             response = sql_service.rollback(self.cursor, self.logger)
 
+            if response['error'] and self.connection is not None:
+                self.connection.broken = True
+
         return response['msg']
\ No newline at end of file
@@ -0,0 +1,191 @@
+import base64
+import contextlib
+import csv
+import datetime
+import decimal
+import gzip
+import io
+import json
+import uuid
+from pathlib import Path
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+format_suffixes = {
+    '.csv': "csv",
+    '.jsonl': "jsonl",
+    '.ndjson': "jsonl"
+}
+
+
+class CountingWriter(io.RawIOBase):
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.raw.write(data)
+        self.bytes += len(data)
+
+        return len(data)
+
+    def flush(self):
+        self.raw.flush()
+
+
+class CountingTextWriter():
+
+    def __init__(self, text):
+        self.text = text
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data.encode())
+
+        return self.text.write(data)
+
+    def flush(self):
+        self.text.flush()
+
+
+def infer_format(destination):
+    if isinstance(destination, (str, Path)):
+        suffixes = [suffix for suffix in Path(destination).suffixes if suffix != '.gz']
+
+        if suffixes and suffixes[-1].lower() == '.json':
+            raise ValueError(f"Trying to export results. '{destination}' names a JSON document but exports are written as JSON lines. Use a .jsonl or .ndjson suffix or pass export_format")
+
+        if suffixes and suffixes[-1].lower() in format_suffixes:
+            return format_suffixes[suffixes[-1].lower()]
+
+    return "csv"
+
+def json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+@contextlib.contextmanager
+def open_sink(destination, compress = None):
+    if compress is None:
+        compress = isinstance(destination, (str, Path)) and str(destination).endswith('.gz')
+
+    with contextlib.ExitStack() as stack:
+        if isinstance(destination, (str, Path)):
+            destination = stack.enter_context(open(destination, 'wb'))
+
+        elif isinstance(destination, io.TextIOBase):
+            if compress:
+                raise ValueError("Cannot gzip into a text stream. Pass a path or a binary file object")
+
+            sink = CountingTextWriter(destination)
+            yield sink, sink
+            sink.flush()
+
+            return
+
+        counter = CountingWriter(destination)
+        binary = stack.enter_context(gzip.GzipFile(fileobj = counter, mode = 'wb')) if compress else counter
+        text = io.TextIOWrapper(binary, encoding = 'utf-8', newline = '', write_through = True)
+
+        try:
+            yield text, counter
+
+        finally:
+            text.flush()
+            text.detach()
+
+def row_writer(text, columns, description, export_format, header = True):
+    if export_format == "csv":
+        writer = csv.writer(text)
+        binary_positions = [position for position, column in enumerate(description) if column[1] in (bytes, bytearray)]
+
+        if header:
+            writer.writerow(columns)
+
+        if not binary_positions:
+            return writer.writerows
+
+        def write_rows(rows):
+            for row in rows:
+                row = list(row)
+
+                for position in binary_positions:
+                    if row[position] is not None:
+                        row[position] = "0x" + row[position].hex()
+
+                writer.writerow(row)
+
+        return write_rows
+
+    if export_format == "jsonl":
+        encoder = json.JSONEncoder(default = json_default, ensure_ascii = False, separators = (',', ':'))
+
+        def write_rows(rows):
+            text.write("".join(encoder.encode(dict(zip(columns, row))) + "\n" for row in rows))
+
+        return write_rows
+
+    raise ValueError(f"Invalid export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+def export_results(cursor, destination, export_format, batch_size, logger, compress = None, header = True, progress = None):
+    logger.debug("SQL_SVC_EXP: Attempting to export results from cursor")
+    try:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+        description = cursor.description
+        columns = [column[0] for column in description]
+        rows_written = 0
+
+        with open_sink(destination, compress) as (text, counter):
+            write_rows = row_writer(text, columns, description, export_format, header)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+
+                if not rows:
+                    break
+
+                write_rows(rows)
+                rows_written += len(rows)
+
+                if progress is not None:
+                    text.flush()
+                    progress(rows_written, counter.bytes)
+
+        msg = f'Successfully exported results from cursor as {export_format}'
+        logger.info("SQL_SVC_EXP: %s (%d rows, %d bytes)", msg, rows_written, counter.bytes)
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': {
+                'format': export_format,
+                'columns': columns,
+                'rows': rows_written,
+                'bytes': counter.bytes
+            }
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to export results from cursor, {e}'
+        logger.error("SQL_SVC_EXP_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
@@ -1,10 +1,109 @@
+import contextlib
+import logging
+
 from sql_service import sql_controller
 from sql_service import utils
+from sql_service import sql_rows
+from sql_service import sql_cache
+from sql_service import sql_export
+from sql_service import sql_partition
+from sql_service import sql_stats
+
+def validate(statement_type, params, row_format = "dict"):
+    if not (statement_type == "DELETE" or statement_type == "INSERT" or statement_type == "SELECT" or statement_type == "UPDATE"):
+        return f"Trying to handle request. An invalid endpoint '{statement_type.lower()}' was called. Use a valid option: select/, insert/, update/ or delete/"
+
+    if row_format not in sql_rows.ROW_FORMATS:
+        return f"Trying to handle request. An invalid row format '{row_format}' was requested. Use a valid option: {', '.join(sql_rows.ROW_FORMATS)}"
+
+    if statement_type == "DELETE" and (params['table'] is None or params['where'] is None):
+        return f"Trying to execute DELETE statement. One or more parameters is missing. Provide values for'statement_type', 'table' and 'where' parameters in request body."
+    
+    elif statement_type == "INSERT" and (params['table'] is None or params['columns'] is None or (params['values'] is None and params['rows'] is None)):
+        return f"Trying to execute INSERT statement. One or more parameters is missing. Provide values for'statement_type', 'table', 'columns' and 'values' parameters in request body."
+
+    elif statement_type == "SELECT" and (params['table'] is None or params['columns'] is None):
+        return f"Trying to execute SELECT statement. One or more parameters is missing. Provide values for'statement_type', 'table' and 'columns' parameters in request body."
+
+    elif statement_type == "UPDATE" and (params['table'] is None or (params['params'] is None and (params['rows'] is None or params['key'] is None or params['columns'] is None))):
+        return f"Trying to execute UPDATE statement. One or more parameters is missing. Provide values for'statement_type', 'table', 'columns' and 'params' parameters in request body."
+
+    return True
+
+
+class ResultStream():
+
+    def __init__(self, rows, controller):
+        self.rows = rows
+        self.controller = controller
+        self.closed = False
+        self.started = False
+        self.pending = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.pending:
+            return self.pending.pop()
+
+        if self.closed:
+            raise StopIteration
+
+        try:
+            row = next(self.rows)
+
+        except StopIteration:
+            self.close()
+            raise
+
+        except (OSError, Exception) as e:
+            self.close()
+            raise Exception(e)
+
+        self.started = True
+
+        return row
+
+    @property
+    def columns(self):
+        # The query only runs on the first fetch, so read ahead one row to learn the header
+        if not self.started and not self.closed:
+            try:
+                self.pending.append(next(self))
+
+            except StopIteration:
+                pass
+
+        return self.controller.last_columns
+
+    @property
+    def timings(self):
+        return dict(self.controller.last_timings)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+
+        try:
+            self.rows.close()
+
+        finally:
+            self.controller.close()
+
 
 class SqlService():
 
-    def __init__(self, statement_type, args, driver, server, database, username, password):
-        self.logger = utils.create_logger()
+    def __init__(self, statement_type, args, driver, server, database, username, password, pooled = True, row_format = "dict", log_level = logging.INFO, sql_log_length = None, cache = None, coalesce = None, log_file = None):
+        self.logger = utils.create_logger(log_level, sql_log_length, log_file = log_file)
 
         self.statement_type = statement_type.upper()
         self.transaction_id = utils.generate_uuid()
@@ -14,15 +113,12 @@ class SqlService():
         self.database = database
         self.username = username
         self.password = password
+        self.pooled = pooled
+        self.row_format = row_format
+        self.cache = sql_cache.get_cache() if cache is True else cache or None
+        self.coalesce = sql_cache.get_single_flight() if coalesce is True else coalesce or None
 
-        self.params = {
-            'table': args['table']
-        }
-
-        self.params['columns'] = utils.comma_split(args['columns'])
-        self.params['values'] = utils.comma_split(args['values'])
-        self.params['params'] = utils.get_params(args['params'])
-        self.params['where'] = utils.is_key(args['where'])
+        self.params = self.parse_args(args)
 
         self.valid_request = self.is_valid()
 
@@ -30,47 +126,313 @@ class SqlService():
             raise ValueError(self.valid_request)
 
         try:
-            self.controller = sql_controller.SqlController(self.params, self.transaction_id, self.logger, self.driver, self.server, self.database, self.username, self.password)
+            self.controller = sql_controller.SqlController(self.params, self.transaction_id, self.logger, self.driver, self.server, self.database, self.username, self.password, pooled = self.pooled, cache = self.cache, coalesce = self.coalesce)
         
         except ConnectionError as ce:
             raise ConnectionError(ce)
 
-    def is_valid(self):
-        if not (self.statement_type == "DELETE" or self.statement_type == "INSERT" or self.statement_type == "SELECT" or self.statement_type == "UPDATE"):
-            return f"Trying to handle request. An invalid endpoint '{self.statement_type.lower()}' was called. Use a valid option: select/, insert/, update/ or delete/"
+    @staticmethod
+    def parse_args(args):
+        params = {
+            'table': args['table']
+        }
 
-        if self.statement_type == "DELETE" and (self.params['table'] is None or self.params['where'] is None):
-            return f"Trying to execute DELETE statement. One or more parameters is missing. Provide values for'statement_type', 'table' and 'where' parameters in request body."
-        
-        elif self.statement_type == "INSERT" and (self.params['table'] is None or self.params['columns'] is None or self.params['values'] is None):
-            return f"Trying to execute INSERT statement. One or more parameters is missing. Provide values for'statement_type', 'table', 'columns' and 'values' parameters in request body."
+        params['columns'] = utils.comma_split(args['columns'])
+        params['values'] = utils.comma_split(args['values'])
+        params['params'] = utils.get_params(args['params'])
+        params['where'] = utils.is_key(args['where'])
+        params['rows'] = args.get('rows')
+        params['key'] = args.get('key')
+        params['batch_size'] = args.get('batch_size') or sql_controller.DEFAULT_BATCH_SIZE
+        params['commit_per_batch'] = args.get('commit_per_batch', True)
 
-        elif self.statement_type == "SELECT" and (self.params['table'] is None or self.params['columns'] is None):
-            return f"Trying to execute SELECT statement. One or more parameters is missing. Provide values for'statement_type', 'table' and 'columns' parameters in request body."
+        return params
 
-        elif self.statement_type == "UPDATE" and (self.params['table'] is None or self.params['params'] is None):
-            return f"Trying to execute UPDATE statement. One or more parameters is missing. Provide values for'statement_type', 'table', 'columns' and 'params' parameters in request body."
+    def is_valid(self, statement_type = None, params = None):
+        return validate(statement_type or self.statement_type, params or self.params, self.row_format)
 
-        return True
-    
     def sql_handler(self):
         try:
-            if self.statement_type == "DELETE":
-                result = self.controller.delete()
+            result = self.dispatch(self.statement_type, self.params)
+           
+        except (OSError, Exception) as e:
+            self.controller.close()
+            raise Exception(e)
+        
+        self.controller.close()
 
-            elif self.statement_type == "INSERT":
-                result = self.controller.insert()
+        return sql_stats.attach_timings(result, self.controller.last_timings)
 
-            elif self.statement_type == "SELECT":
-                result = self.controller.select()
+    def dispatch(self, statement_type, params):
+        self.controller.reset_timings()
+
+        if statement_type == "DELETE":
+            return self.controller.delete(request = params)
+
+        elif statement_type == "INSERT" and params['rows'] is not None and params['key'] is not None:
+            return self.controller.bulk_upsert(params['rows'], params['key'], batch_size = params['batch_size'], request = params)
+
+        elif statement_type == "INSERT" and params['rows'] is not None:
+            return self.controller.bulk_insert(params['rows'], batch_size = params['batch_size'], commit_per_batch = params['commit_per_batch'], request = params)
+
+        elif statement_type == "INSERT":
+            return self.controller.insert(request = params)
+
+        elif statement_type == "SELECT":
+            return self.controller.select(row_format = self.row_format, request = params)
+
+        elif statement_type == "UPDATE" and params['rows'] is not None:
+            return self.controller.bulk_upsert(params['rows'], params['key'], batch_size = params['batch_size'], insert = False, request = params)
+
+        elif statement_type == "UPDATE":
+            return self.controller.update(request = params)
+
+    def execute(self, statement_type, args):
+        statement_type = statement_type.upper()
+        params = self.parse_args(args)
+
+        valid_request = self.is_valid(statement_type, params)
+
+        if not valid_request is True:
+            raise ValueError(valid_request)
+
+        return self.dispatch(statement_type, params)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        try:
+            with self.controller.transaction():
+                yield self
+
+        finally:
+            self.controller.close()
+
+    @classmethod
+    def batch(cls, requests, driver, server, database, username, password, atomic = False, **options):
+        requests = list(requests)
+
+        if not requests:
+            return []
+
+        parsed = []
+
+        for position, request in enumerate(requests):
+            try:
+                statement_type = request['statement_type'].upper()
+                params = cls.parse_args(request['args'])
+
+            except (KeyError, TypeError, AttributeError) as e:
+                raise ValueError(f"Trying to handle batch request {position}. Each request needs a 'statement_type' and 'args' with 'table', 'columns', 'values', 'params' and 'where', {e}")
+
+            valid_request = validate(statement_type, params, options.get('row_format', "dict"))
+
+            if not valid_request is True:
+                raise ValueError(f"Trying to handle batch request {position}. {valid_request}")
+
+            parsed.append((statement_type, params))
+
+        service = cls(requests[0]['statement_type'], requests[0]['args'], driver, server, database, username, password, **options)
+
+        if atomic:
+            with service.transaction():
+                return [service.batch_result(statement_type, service.dispatch(statement_type, params)) for statement_type, params in parsed]
+
+        results = []
+
+        try:
+            for statement_type, params in parsed:
+                try:
+                    results.append(service.batch_result(statement_type, service.dispatch(statement_type, params)))
+
+                except (OSError, Exception) as e:
+                    results.append({
+                        'statement_type': statement_type,
+                        'error': True,
+                        'msg': str(e),
+                        'data': None,
+                        'timings': dict(service.last_timings)
+                    })
+
+        finally:
+            service.controller.close()
+
+        return results
+
+    def batch_result(self, statement_type, result):
+        return {
+            'statement_type': statement_type,
+            'error': False,
+            'msg': f'Successfully executed {statement_type} request',
+            'data': result,
+            'timings': dict(self.last_timings)
+        }
+
+    @property
+    def last_timings(self):
+        return self.controller.last_timings
+
+    def stream(self, batch_size = sql_controller.DEFAULT_BATCH_SIZE, batches = False, prefetch = 0):
+        if self.statement_type != "SELECT":
+            raise self._invalid_request(f"Trying to stream results. Streaming is only supported for the select/ endpoint, not '{self.statement_type.lower()}'")
+
+        if prefetch < 0:
+            raise self._invalid_request(f"Trying to stream results. Prefetch depth must be 0 or more, got {prefetch}")
+
+        return self._stream(batch_size, batches, prefetch)
+
+    def select_columnar(self, batch_size = sql_controller.DEFAULT_BATCH_SIZE):
+        if self.statement_type != "SELECT":
+            raise self._invalid_request(f"Trying to get columnar results. Columnar results are only supported for the select/ endpoint, not '{self.statement_type.lower()}'")
+
+        self.controller.reset_timings()
+
+        try:
+            result = self.controller.select_columnar(batch_size = batch_size)
+
+        except ImportError:
+            self.controller.close()
+            raise
 
-            elif self.statement_type == "UPDATE":
-                result = self.controller.update()
-           
         except (OSError, Exception) as e:
             self.controller.close()
             raise Exception(e)
-        
+
         self.controller.close()
 
-        return result
\ No newline at end of file
+        return result
+
+    def export(self, destination, export_format = None, batch_size = sql_controller.DEFAULT_BATCH_SIZE, compress = None, header = True, progress = None):
+        if self.statement_type != "SELECT":
+            raise self._invalid_request(f"Trying to export results. Exporting is only supported for the select/ endpoint, not '{self.statement_type.lower()}'")
+
+        try:
+            export_format = export_format or sql_export.infer_format(destination)
+
+        except ValueError as e:
+            raise self._invalid_request(str(e))
+
+        if export_format not in sql_export.EXPORT_FORMATS:
+            raise self._invalid_request(f"Trying to export results. An invalid export format '{export_format}' was requested. Use a valid option: {', '.join(sql_export.EXPORT_FORMATS)}")
+
+        self.controller.reset_timings()
+
+        try:
+            result = self.controller.export(destination, export_format = export_format, batch_size = batch_size, compress = compress, header = header, progress = progress)
+
+        except (OSError, Exception) as e:
+            self.controller.close()
+            raise Exception(e)
+
+        self.controller.close()
+
+        return sql_stats.attach_timings(result, self.controller.last_timings)
+
+    def delete_chunked(self, chunk_size = sql_controller.DEFAULT_DELETE_CHUNK_SIZE, sleep = 0, max_seconds = None, progress = None):
+        if self.statement_type != "DELETE":
+            raise self._invalid_request(f"Trying to delete in chunks. Chunked deletes are only supported for the delete/ endpoint, not '{self.statement_type.lower()}'")
+
+        self.controller.reset_timings()
+
+        try:
+            result = self.controller.delete_chunked(chunk_size = chunk_size, sleep = sleep, max_seconds = max_seconds, progress = progress)
+
+        except ValueError:
+            self.controller.close()
+            raise
+
+        except (OSError, Exception) as e:
+            self.controller.close()
+            raise Exception(e)
+
+        self.controller.close()
+
+        return sql_stats.attach_timings(result, self.controller.last_timings)
+
+    def select_page(self, key, page_size = sql_controller.DEFAULT_PAGE_SIZE, token = None, descending = False):
+        if self.statement_type != "SELECT":
+            raise self._invalid_request(f"Trying to get a page of results. Pagination is only supported for the select/ endpoint, not '{self.statement_type.lower()}'")
+
+        self.controller.reset_timings()
+
+        try:
+            result = self.controller.select_page(key, page_size = page_size, token = token, row_format = self.row_format, descending = descending)
+
+        except ValueError:
+            self.controller.close()
+            raise
+
+        except (OSError, Exception) as e:
+            self.controller.close()
+            raise Exception(e)
+
+        self.controller.close()
+
+        return sql_stats.attach_timings(result, self.controller.last_timings)
+
+    def select_partitioned(self, key, partitions = sql_partition.DEFAULT_PARTITIONS, mode = "range", ordered = False, order_by = None, descending = False, bounds = None, workers = None):
+        if self.statement_type != "SELECT":
+            raise self._invalid_request(f"Trying to read partitions. Partitioned reads are only supported for the select/ endpoint, not '{self.statement_type.lower()}'")
+
+        self.controller.reset_timings()
+
+        try:
+            result = self.controller.select_partitioned(key, partitions = partitions, mode = mode, ordered = ordered, order_by = order_by, descending = descending, bounds = bounds, workers = workers, row_format = self.row_format)
+
+        except ValueError:
+            self.controller.close()
+            raise
+
+        except (OSError, Exception) as e:
+            self.controller.close()
+            raise Exception(e)
+
+        self.controller.close()
+
+        return sql_stats.attach_timings(result, self.controller.last_timings)
+
+    def select_by_keys(self, key_column, keys, chunk_size = sql_partition.DEFAULT_KEY_CHUNK_SIZE, workers = None, preserve_order = False, table_threshold = sql_partition.DEFAULT_KEY_TABLE_THRESHOLD):
+        if self.statement_type != "SELECT":
+            raise self._invalid_request(f"Trying to look up keys. Key lookups are only supported for the select/ endpoint, not '{self.statement_type.lower()}'")
+
+        self.controller.reset_timings()
+
+        try:
+            result = self.controller.select_by_keys(key_column, keys, chunk_size = chunk_size, workers = workers, preserve_order = preserve_order, table_threshold = table_threshold, row_format = self.row_format)
+
+        except ValueError:
+            self.controller.close()
+            raise
+
+        except (OSError, Exception) as e:
+            self.controller.close()
+            raise Exception(e)
+
+        self.controller.close()
+
+        return sql_stats.attach_timings(result, self.controller.last_timings)
+
+    def _invalid_request(self, message):
+        self.controller.close()
+
+        return ValueError(message)
+
+    def _stream(self, batch_size, batches, prefetch = 0):
+        self.controller.reset_timings()
+        rows = self.controller.iter_select(batch_size = batch_size, batches = batches or prefetch > 0, row_format = self.row_format)
+
+        if prefetch:
+            rows = utils.prefetch(rows, prefetch)
+
+        return ResultStream(self._rows(rows, prefetch and not batches), self.controller)
+
+    @staticmethod
+    def _rows(rows, flatten):
+        try:
+            if flatten:
+                for batch in rows:
+                    yield from batch
+            else:
+                yield from rows
+
+        finally:
+            rows.close()
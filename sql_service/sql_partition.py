@@ -0,0 +1,84 @@
+import datetime
+import heapq
+
+PARTITION_MODES = ("range", "modulo")
+DEFAULT_PARTITIONS = 4
+DEFAULT_KEY_CHUNK_SIZE = 1000
+DEFAULT_KEY_TABLE_THRESHOLD = 20000
+MAX_PARAMETERS = 2100
+
+
+def range_boundaries(low, high, partitions):
+    if low is None or high is None or partitions < 2 or not high > low:
+        return []
+
+    span = high - low
+
+    if isinstance(low, datetime.datetime):
+        boundaries = [low + span * position / partitions for position in range(1, partitions)]
+
+    elif isinstance(low, datetime.date):
+        boundaries = [low + datetime.timedelta(days = span.days * position // partitions) for position in range(1, partitions)]
+
+    elif isinstance(low, int):
+        boundaries = [low - (-span * position // partitions) for position in range(1, partitions)]
+
+    else:
+        boundaries = [low + span * position / partitions for position in range(1, partitions)]
+
+    return sorted(set(boundary for boundary in boundaries if low < boundary <= high))
+
+def range_conditions(key, boundaries):
+    if not boundaries:
+        return [("", [])]
+
+    conditions = [(f"({key} < ? OR {key} IS NULL)", [boundaries[0]])]
+
+    for lower, upper in zip(boundaries, boundaries[1:]):
+        conditions.append((f"({key} >= ? AND {key} < ?)", [lower, upper]))
+
+    conditions.append((f"({key} >= ?)", [boundaries[-1]]))
+
+    return conditions
+
+def modulo_conditions(key, partitions):
+    if partitions < 2:
+        return [("", [])]
+
+    conditions = [(f"(ABS({key} % ?) = ? OR {key} IS NULL)", [partitions, 0])]
+    conditions += [(f"(ABS({key} % ?) = ?)", [partitions, remainder]) for remainder in range(1, partitions)]
+
+    return conditions
+
+def sort_key(positions):
+    return lambda row: tuple((row[position] is not None, row[position]) for position in positions)
+
+def merge(partitions, positions, descending = False):
+    return list(heapq.merge(*partitions, key = sort_key(positions), reverse = descending))
+
+def unique_keys(keys):
+    return list(dict.fromkeys(keys))
+
+def padded_size(count, chunk_size):
+    size = 8
+
+    while size < count:
+        size *= 2
+
+    return min(size, chunk_size)
+
+def key_chunks(keys, chunk_size):
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start:start + chunk_size]
+
+        yield chunk + [chunk[-1]] * (padded_size(len(chunk), chunk_size) - len(chunk))
+
+def order_by_keys(rows, position, keys):
+    found = {}
+
+    for row in rows:
+        found.setdefault(row[position], []).append(row)
+
+    ordered = [row for key in keys for row in found.pop(key, ())]
+
+    return ordered + [row for rows in found.values() for row in rows]
@@ -0,0 +1,320 @@
+import collections
+import threading
+import time
+
+from sql_service import sql_service
+
+DEFAULT_MIN_SIZE = 0
+DEFAULT_MAX_SIZE = 10
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_MAX_LIFETIME = 1800
+DEFAULT_BORROW_TIMEOUT = 30
+DEFAULT_VALIDATION_INTERVAL = 5
+DEFAULT_STATEMENT_CACHE_SIZE = 32
+
+VALIDATION_QUERY = "SELECT 1"
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolExhaustedError(ConnectionError):
+    pass
+
+
+class StatementCache():
+
+    def __init__(self, conn, max_size = DEFAULT_STATEMENT_CACHE_SIZE):
+        self.conn = conn
+        self.max_size = max_size
+        self.cursors = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cursor_for(self, statement, logger):
+        cursor = self.cursors.get(statement)
+
+        if cursor is not None:
+            self.cursors.move_to_end(statement)
+            self.hits += 1
+
+            return cursor
+
+        self.misses += 1
+
+        cursor = sql_service.create_cursor(self.conn, logger)
+        if cursor['error']:
+            raise ConnectionError(cursor['exception'])
+
+        self.cursors[statement] = cursor['data']
+
+        if len(self.cursors) > self.max_size:
+            evicted = self.cursors.popitem(last = False)[1]
+            sql_service.close_cursor(evicted, logger)
+
+        return cursor['data']
+
+    def clear(self, logger):
+        while self.cursors:
+            sql_service.close_cursor(self.cursors.popitem()[1], logger)
+
+
+class PooledConnection():
+
+    def __init__(self, conn, pool = None):
+        self.conn = conn
+        self.pool = pool
+        self.statements = StatementCache(conn)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.broken = False
+
+    def release(self, logger, discard = False):
+        if self.pool is None:
+            self.statements.clear(logger)
+
+            close_conn = sql_service.close_connection(self.conn, logger)
+            if close_conn['error']:
+                raise ConnectionError(close_conn['exception'])
+
+            return close_conn['data']
+
+        return self.pool.release(self, logger, discard = discard or self.broken)
+
+
+class ConnectionPool():
+
+    def __init__(self, driver, server, database, username, password, logger, min_size = DEFAULT_MIN_SIZE, max_size = DEFAULT_MAX_SIZE, idle_timeout = DEFAULT_IDLE_TIMEOUT, max_lifetime = DEFAULT_MAX_LIFETIME, borrow_timeout = DEFAULT_BORROW_TIMEOUT, validate = True, validation_interval = DEFAULT_VALIDATION_INTERVAL):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid pool size, min_size={min_size} and max_size={max_size}. Use 0 <= min_size <= max_size and max_size >= 1")
+
+        self.driver = driver
+        self.server = server
+        self.database = database
+        self.username = username
+        self.password = password
+        self.logger = logger
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.borrow_timeout = borrow_timeout
+        self.validate = validate
+        self.validation_interval = validation_interval
+
+        self.idle = collections.deque()
+        self.size = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def fill(self, logger = None):
+        logger = logger or self.logger
+
+        while True:
+            with self.condition:
+                if self.closed or self.size >= self.min_size:
+                    return self.size
+
+                self.size += 1
+
+            try:
+                pooled = self._open(logger)
+            except (RuntimeError, ConnectionError) as e:
+                logger.error("SQL_POOL_FILL_ERR: Could not pre-fill connection pool, %s", e)
+                self._forget()
+
+                return self.size
+
+            with self.condition:
+                self.idle.append(pooled)
+                self.condition.notify()
+
+    def borrow(self, logger = None):
+        logger = logger or self.logger
+        deadline = time.monotonic() + self.borrow_timeout
+
+        while True:
+            pooled = self._checkout(deadline, logger)
+
+            if pooled is None:
+                try:
+                    return self._open(logger)
+                except Exception:
+                    self._forget()
+                    raise
+
+            if self._is_usable(pooled, logger):
+                pooled.last_used = time.monotonic()
+
+                return pooled
+
+            self._close(pooled, logger)
+            self._forget()
+
+    def release(self, pooled, logger = None, discard = False):
+        logger = logger or self.logger
+
+        if not discard:
+            reset = sql_service.rollback(pooled.conn, logger)
+            discard = reset['error']
+
+        with self.condition:
+            if not (discard or self.closed or self._is_expired(pooled, time.monotonic())):
+                pooled.last_used = time.monotonic()
+                self.idle.append(pooled)
+                self.condition.notify()
+
+                return True
+
+        self._close(pooled, logger)
+        self._forget()
+
+        return False
+
+    def close(self, logger = None):
+        logger = logger or self.logger
+
+        with self.condition:
+            self.closed = True
+            idle = list(self.idle)
+            self.idle.clear()
+            self.size -= len(idle)
+            self.condition.notify_all()
+
+        for pooled in idle:
+            self._close(pooled, logger)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'size': self.size,
+                'idle': len(self.idle),
+                'in_use': self.size - len(self.idle),
+                'max_size': self.max_size
+            }
+
+    def _checkout(self, deadline, logger):
+        stale = []
+
+        try:
+            with self.condition:
+                while True:
+                    if self.closed:
+                        raise ConnectionError("Connection pool has been closed")
+
+                    stale.extend(self._prune_idle(time.monotonic()))
+
+                    if self.idle:
+                        return self.idle.pop()
+
+                    if self.size < self.max_size:
+                        self.size += 1
+                        return None
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(f"Timed out after {self.borrow_timeout}s waiting for a connection to {self.server}/{self.database}")
+
+                    self.condition.wait(remaining)
+
+        finally:
+            for conn in stale:
+                self._close(conn, logger)
+
+    def _prune_idle(self, now):
+        stale = []
+
+        while self.idle and self.size > self.min_size and self._is_expired(self.idle[0], now):
+            stale.append(self.idle.popleft())
+            self.size -= 1
+
+        if stale:
+            self.condition.notify_all()
+
+        return stale
+
+    def _is_expired(self, pooled, now):
+        if self.max_lifetime is not None and now - pooled.created_at > self.max_lifetime:
+            return True
+
+        return self.idle_timeout is not None and now - pooled.last_used > self.idle_timeout
+
+    def _is_usable(self, pooled, logger):
+        now = time.monotonic()
+
+        if pooled.broken or self._is_expired(pooled, now):
+            return False
+
+        if not self.validate or now - pooled.last_used < self.validation_interval:
+            return True
+
+        try:
+            cursor = pooled.conn.cursor()
+            cursor.execute(VALIDATION_QUERY).fetchone()
+            cursor.close()
+
+            return True
+
+        except Exception as e:
+            logger.info("SQL_POOL_VLD: Discarding connection which failed validation, %s", e)
+
+            return False
+
+    def _open(self, logger):
+        conn_string = sql_service.form_conn_string(self.driver, self.server, self.database, self.username, self.password, logger)
+        if conn_string['error']:
+            raise RuntimeError("Error when forming connection string")
+
+        conn = sql_service.connect(conn_string['data'], logger)
+        if conn['error']:
+            raise ConnectionError(conn['exception'])
+
+        return PooledConnection(conn['data'], self)
+
+    def _close(self, pooled, logger):
+        pooled.statements.clear(logger)
+
+        close_conn = sql_service.close_connection(pooled.conn, logger)
+        if close_conn['error']:
+            logger.error("SQL_POOL_CLS: Closing pooled connection failed, %s", close_conn['msg'])
+
+    def _forget(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+
+def pool_key(driver, server, database, username):
+    return (driver, server, database, username)
+
+def get_pool(driver, server, database, username, password, logger, **options):
+    key = pool_key(driver, server, database, username)
+
+    with _pools_lock:
+        pool = stale = _pools.get(key)
+
+        if pool is None or pool.closed or pool.password != password:
+            pool = ConnectionPool(driver, server, database, username, password, logger, **options)
+            _pools[key] = pool
+            created = True
+        else:
+            stale = None
+            created = False
+
+    if stale is not None and not stale.closed:
+        logger.info("SQL_POOL_PWD: Rebuilding connection pool for %s/%s as %s after a password change", server, database, username)
+        stale.close(logger)
+
+    if created and pool.min_size:
+        pool.fill(logger)
+
+    return pool
+
+def close_all_pools(logger = None):
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close(logger)
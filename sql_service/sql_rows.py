@@ -0,0 +1,117 @@
+import collections
+import collections.abc
+import functools
+import keyword
+
+ROW_FORMATS = ("dict", "tuples", "namedtuple", "slots", "lazy")
+
+
+class LazyRow(collections.abc.Mapping):
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, column):
+        return self._values[self._index[column]]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return f"LazyRow({dict(self)})"
+
+    def as_dict(self):
+        return dict(zip(self._index, self._values))
+
+
+class SlotsRow():
+    __slots__ = ()
+    _columns = ()
+    _positions = {}
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return getattr(self, self.__slots__[key])
+
+        return getattr(self, self.__slots__[self._positions[key]])
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, SlotsRow):
+            return self._columns == other._columns and tuple(self) == tuple(other)
+
+        return NotImplemented
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={value!r}" for name, value in zip(self.__slots__, self))
+
+        return f"{type(self).__name__}({values})"
+
+    def keys(self):
+        return list(self._columns)
+
+    def as_dict(self):
+        return dict(zip(self._columns, self))
+
+
+def attribute_names(columns):
+    names = []
+
+    for position, column in enumerate(columns):
+        name = column if column.isidentifier() and not keyword.iskeyword(column) and not column.startswith("_") else f"_{position}"
+
+        if name in names:
+            name = f"_{position}"
+
+        names.append(name)
+
+    return tuple(names)
+
+@functools.lru_cache(maxsize = 256)
+def namedtuple_class(columns):
+    return collections.namedtuple("Row", columns, rename = True)
+
+@functools.lru_cache(maxsize = 256)
+def slots_class(columns):
+    return type("Row", (SlotsRow,), {'__slots__': attribute_names(columns), '_columns': columns, '_positions': {column: position for position, column in enumerate(columns)}})
+
+def row_formatter(columns, row_format = "dict"):
+    columns = tuple(columns)
+
+    if row_format == "dict":
+        return lambda row: dict(zip(columns, row))
+
+    if row_format == "tuples":
+        return tuple
+
+    if row_format == "namedtuple":
+        return namedtuple_class(columns)._make
+
+    if row_format == "slots":
+        return slots_class(columns)
+
+    if row_format == "lazy":
+        index = {column: position for position, column in enumerate(columns)}
+
+        return lambda row: LazyRow(index, row)
+
+    raise ValueError(f"Invalid row format '{row_format}'. Use one of: {', '.join(ROW_FORMATS)}")
+
+def format_rows(results, columns, row_format = "dict"):
+    formatter = row_formatter(columns, row_format)
+
+    return [formatter(row) for row in results]
@@ -6,22 +6,32 @@ import inspect
 import sys
 
 from sql_service import utils
+from sql_service import sql_templates
+from sql_service import sql_rows
 sys.path.insert(0, 'C:/Users/caola/Documents/Github/headcase-consult/src')
 
 
-select_query_file = "sql_service\\queries\\select_from_table.sql"
-insert_statement_file = "sql_service\\queries\\select_from_table.sql"
-update_statement_file = "sql_service\\queries\\update_table.sql"
-delete_statement_file = "sql_service\\queries\\delete_statement.sql"
+select_query_file = "select_from_table.sql"
+select_page_query_file = "select_page.sql"
+select_ordered_query_file = "select_ordered.sql"
+insert_statement_file = "insert_into_table.sql"
+update_statement_file = "update_table.sql"
+delete_statement_file = "delete_statement.sql"
+delete_top_statement_file = "delete_top_statement.sql"
+bulk_insert_statement_file = "bulk_insert_from_file.sql"
+staging_table_statement_file = "create_staging_table.sql"
+merge_statement_file = "merge_from_staging.sql"
+update_from_statement_file = "update_from_staging.sql"
+drop_table_statement_file = "drop_table.sql"
 
 def form_conn_string(driver, server, database, username, password, logger):
     try:
-        logger.info(f"SQL_SVC_FRM_CONN: Attempting to form connection string")
+        logger.debug("SQL_SVC_FRM_CONN: Attempting to form connection string")
 
         conn_string = 'DRIVER={'+driver+'};SERVER='+server+';DATABASE='+database+';UID='+username+';PWD='+ password
        
         msg = f'Successfully formed connection string'
-        logger.info(f"SQL_SVC_FRM_CONN: {msg}")
+        logger.info("SQL_SVC_FRM_CONN: %s", msg)
 
         return {
             'error': False,
@@ -31,7 +41,7 @@ def form_conn_string(driver, server, database, username, password, logger):
 
     except Exception as e:
         msg =f'An error occured when trying to form connection string, {e}'
-        logger.error(f"SQL_SVC_FRM_CONN_ERR: {msg}")
+        logger.error("SQL_SVC_FRM_CONN_ERR: %s", msg)
 
         return {
             'error': True,
@@ -41,12 +51,12 @@ def form_conn_string(driver, server, database, username, password, logger):
         }
 
 def connect(conn_string, logger):
-    logger.info(f"SQL_SVC_CONN: Attempting to connect to database using pyodbc")
+    logger.debug("SQL_SVC_CONN: Attempting to connect to database using pyodbc")
     try:
         conn = pyodbc.connect(conn_string)
 
         msg = f'Successfully connected to database using pyodbc'
-        logger.info(f"SQL_SVC_CONN: {msg}")
+        logger.info("SQL_SVC_CONN: %s", msg)
 
         return {
             'error': False,
@@ -56,7 +66,7 @@ def connect(conn_string, logger):
 
     except Exception as e:
         msg =f'An error occured when trying to connect to database, {e}'
-        logger.error(f"SQL_SVC_CONN_ERR: {msg}")
+        logger.error("SQL_SVC_CONN_ERR: %s", msg)
 
         return {
             'error': True,
@@ -66,12 +76,12 @@ def connect(conn_string, logger):
         }
 
 def create_cursor(conn, logger):
-    logger.info("SQL_SVC_CRT_CSR: Attempting to create pyodbc cursor")
+    logger.debug("SQL_SVC_CRT_CSR: Attempting to create pyodbc cursor")
     try:
         cursor = conn.cursor()
 
         msg = 'Successfully created pyodbc cursor object'
-        logger.info(f"SQL_SVC_CRT_CSR: {msg}")
+        logger.info("SQL_SVC_CRT_CSR: %s", msg)
 
         return {
             'error': False,
@@ -81,7 +91,7 @@ def create_cursor(conn, logger):
     
     except Exception as e:
         msg =f'An error occured when trying to create cursor object, {e}'
-        logger.error(f"SQL_SVC_CRT_CSR_ERR: {msg}")
+        logger.error("SQL_SVC_CRT_CSR_ERR: %s", msg)
         
         return {
             'error': True,
@@ -91,12 +101,12 @@ def create_cursor(conn, logger):
         }
 
 def close_cursor(cursor, logger):
-    logger.info("SQL_SVC_CLS_CSR: Attempting to close pyodbc cursor")
+    logger.debug("SQL_SVC_CLS_CSR: Attempting to close pyodbc cursor")
     try:
         cursor2 = cursor.close()
 
         msg = 'Successfully closed cursor object'
-        logger.info(f"SQL_SVC_CLS_CSR: {msg}")
+        logger.info("SQL_SVC_CLS_CSR: %s", msg)
 
         return {
             'error': False,
@@ -106,7 +116,32 @@ def close_cursor(cursor, logger):
        
     except Exception as e:
         msg =f'An error occured when trying to close cursor object, {e}'
-        logger.error(f"SQL_SVC_CLS_CSR_ERR: {msg}")
+        logger.error("SQL_SVC_CLS_CSR_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def close_connection(conn, logger):
+    logger.debug("SQL_SVC_CLS_CONN: Attempting to close pyodbc connection")
+    try:
+        conn2 = conn.close()
+
+        msg = 'Successfully closed connection object'
+        logger.info("SQL_SVC_CLS_CONN: %s", msg)
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': conn2
+        }
+       
+    except Exception as e:
+        msg =f'An error occured when trying to close connection object, {e}'
+        logger.error("SQL_SVC_CLS_CONN_ERR: %s", msg)
 
         return {
             'error': True,
@@ -116,12 +151,12 @@ def close_cursor(cursor, logger):
         }
 
 def form_select_query(table, logger, file = select_query_file, attributes="*", where = ""):
-    logger.info("SQL_SVC_FRM_SLT: Attempting to form SELECT query")
+    logger.debug("SQL_SVC_FRM_SLT: Attempting to form SELECT query")
     try:
-        query = open(file).read().format(attributes, table, where)
+        query = sql_templates.registry.get(file).render(attributes, table, where)
         
-        msg = f'Successfully formed SELECT query {query}'
-        logger.info(f"SQL_SVC_FRM_QRY: {msg}")
+        msg = 'Successfully formed SELECT query'
+        logger.info("SQL_SVC_FRM_QRY: %s %s", msg, utils.loggable_sql(query, logger))
         
         return {
             'error': False,
@@ -131,7 +166,57 @@ def form_select_query(table, logger, file = select_query_file, attributes="*", w
     
     except Exception as e:
         msg =f'An error occured when trying to form SELECT query, {e}'
-        logger.error(f"SQL_SVC_FRM_QRY_ERR: {msg}")
+        logger.error("SQL_SVC_FRM_QRY_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def form_select_page_query(table, attributes, where, order_by, logger, file = select_page_query_file):
+    logger.debug("SQL_SVC_FRM_PGE: Attempting to form paginated SELECT query")
+    try:
+        query = sql_templates.registry.get(file).render(attributes, table, where, order_by)
+        
+        msg = 'Successfully formed paginated SELECT query'
+        logger.info("SQL_SVC_FRM_PGE: %s %s", msg, utils.loggable_sql(query, logger))
+        
+        return {
+            'error': False,
+            'msg': msg,
+            'data': query
+        }
+    
+    except Exception as e:
+        msg =f'An error occured when trying to form paginated SELECT query, {e}'
+        logger.error("SQL_SVC_FRM_PGE_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def form_select_ordered_query(table, attributes, where, order_by, logger, file = select_ordered_query_file):
+    logger.debug("SQL_SVC_FRM_ORD: Attempting to form ordered SELECT query")
+    try:
+        query = sql_templates.registry.get(file).render(attributes, table, where, order_by)
+        
+        msg = 'Successfully formed ordered SELECT query'
+        logger.info("SQL_SVC_FRM_ORD: %s %s", msg, utils.loggable_sql(query, logger))
+        
+        return {
+            'error': False,
+            'msg': msg,
+            'data': query
+        }
+    
+    except Exception as e:
+        msg =f'An error occured when trying to form ordered SELECT query, {e}'
+        logger.error("SQL_SVC_FRM_ORD_ERR: %s", msg)
 
         return {
             'error': True,
@@ -140,13 +225,13 @@ def form_select_query(table, logger, file = select_query_file, attributes="*", w
             'data': None
         }
 
-def execute_formed_query(cursor, query, logger):
-    logger.info("SQL_SVC_ECT_QRY: Attempting to execute formed query")
+def execute_formed_query(cursor, query, logger, params = None):
+    logger.debug("SQL_SVC_ECT_QRY: Attempting to execute formed query")
     try:
-        cursor = cursor.execute(query)
+        cursor = cursor.execute(query, params) if params else cursor.execute(query)
         
-        msg = f'Successfully executed formed query {query}'
-        logger.info(f"SQL_SVC_ECT_QRY: {msg}")
+        msg = 'Successfully executed formed query'
+        logger.info("SQL_SVC_ECT_QRY: %s %s", msg, utils.loggable_sql(query, logger))
 
         return {
             'error': False,
@@ -156,7 +241,7 @@ def execute_formed_query(cursor, query, logger):
 
     except Exception as e:
         msg =f'An error occured when trying to execute formed query, {e}'
-        logger.error(f"SQL_SVC_ECT_QRY_ERR: {msg}")
+        logger.error("SQL_SVC_ECT_QRY_ERR: %s", msg)
 
         return {
             'error': True,
@@ -166,12 +251,12 @@ def execute_formed_query(cursor, query, logger):
         }
 
 def get_columns(cursor_description, logger):
-    logger.info("SQL_SVC_GT_CLS: Attempting to get columns from cursor description")
+    logger.debug("SQL_SVC_GT_CLS: Attempting to get columns from cursor description")
     try:
         columns = [column[0] for column in cursor_description]
 
         msg = f'Successfully got columns from cursor description'
-        logger.info(f"SQL_SVC_GT_CLS: {msg}")
+        logger.info("SQL_SVC_GT_CLS: %s", msg)
 
         return {
             'error': False,
@@ -181,7 +266,7 @@ def get_columns(cursor_description, logger):
 
     except IndexError as e:
         msg =f'An error occured when trying to get columns from cursor description, {e}'
-        logger.error(f"SQL_SVC_GT_CLS_ERR: {msg}")
+        logger.error("SQL_SVC_GT_CLS_ERR: %s", msg)
 
         return {
             'error': True,
@@ -191,12 +276,12 @@ def get_columns(cursor_description, logger):
         }
 
 def get_results(cursor, logger):
-    logger.info("SQL_SVC_GT_RLS: Attempting to get results from cursor")
+    logger.debug("SQL_SVC_GT_RLS: Attempting to get results from cursor")
     try:
         results = cursor.fetchall()
 
         msg = f'Successfully got results from cursor'
-        logger.info(f"SQL_SVC_GT_RLS: {msg}")
+        logger.info("SQL_SVC_GT_RLS: %s", msg)
 
         return {
             'error': False,
@@ -206,7 +291,7 @@ def get_results(cursor, logger):
 
     except Exception as e:
         msg =f'An error occured when trying to get results from cursor, {e}'
-        logger.error(f"SQL_SVC_GT_RLS_ERR: {msg}")
+        logger.error("SQL_SVC_GT_RLS_ERR: %s", msg)
         return {
             'error': True,
             'msg': msg,
@@ -214,16 +299,43 @@ def get_results(cursor, logger):
             'data': None
         }
 
-def zip_columns_results(results, columns, logger):
-    logger.info("SQL_SVC_ZP_CLM: Attempting to zip columns with results")
+def get_results_batch(cursor, batch_size, logger):
+    logger.debug("SQL_SVC_GT_BTH: Attempting to get batch of results from cursor")
+    try:
+        results = cursor.fetchmany(batch_size)
+
+        msg = 'Successfully got batch of results from cursor'
+        logger.info("SQL_SVC_GT_BTH: %s (%d rows)", msg, len(results))
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': results
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to get batch of results from cursor, {e}'
+        logger.error("SQL_SVC_GT_BTH_ERR: %s", msg)
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def zip_columns_results(results, columns, logger, row_format = "dict"):
+    logger.debug("SQL_SVC_ZP_CLM: Attempting to zip columns with results")
     
     try: 
-        zipped_results = []
-        for row in results:
-            zipped_results.append(dict(zip(columns, row)))
+        if row_format == "dict":
+            zipped_results = []
+            for row in results:
+                zipped_results.append(dict(zip(columns, row)))
+        else:
+            zipped_results = sql_rows.format_rows(results, columns, row_format)
         
         msg = f'Successfully zipped columns with results'
-        logger.info(f"SQL_SVC_ZP_CLM: {msg}")
+        logger.info("SQL_SVC_ZP_CLM: %s", msg)
 
         return {
             'error': False,
@@ -233,7 +345,7 @@ def zip_columns_results(results, columns, logger):
     
     except Exception as e:
         msg =f'An error occured when trying to zip columns with results, {e}'
-        logger.error(f"SQL_SVC_ZP_CLM_ERR: {msg}")
+        logger.error("SQL_SVC_ZP_CLM_ERR: %s", msg)
 
         return {
             'error': True,
@@ -243,12 +355,12 @@ def zip_columns_results(results, columns, logger):
         }
 
 def form_insert_statement(table, columns, values, logger, file = insert_statement_file):
-    logger.info("SQL_SVC_FRM_IST: Attempting to form INSERT statement")
+    logger.debug("SQL_SVC_FRM_IST: Attempting to form INSERT statement")
     try:
-        statement = open(file).read().format(table, columns, values)
+        statement = sql_templates.registry.get(file).render(table, columns, values)
         
-        msg = f'Successfully formed INSERT statement {statement}'
-        logger.info(f"SQL_SVC_FRM_SMT: {msg}")
+        msg = 'Successfully formed INSERT statement'
+        logger.info("SQL_SVC_FRM_SMT: %s %s", msg, utils.loggable_sql(statement, logger))
 
         return {
             'error': False,
@@ -258,7 +370,7 @@ def form_insert_statement(table, columns, values, logger, file = insert_statemen
     
     except Exception as e:        
         msg =f'An error occured when trying to form INSERT statement, {e}'
-        logger.error(f"SQL_SVC_FRM_SMT_ERR: {msg}")
+        logger.error("SQL_SVC_FRM_SMT_ERR: %s", msg)
 
         return {
             'error': True,
@@ -267,13 +379,13 @@ def form_insert_statement(table, columns, values, logger, file = insert_statemen
             'data': None
         }
 
-def execute_formed_statement(cursor, statement, logger):
-    logger.info("SQL_SVC_ECT_SMT: Attempting to execute formed statement")
+def execute_formed_statement(cursor, statement, logger, params = None):
+    logger.debug("SQL_SVC_ECT_SMT: Attempting to execute formed statement")
     try:
-        cursor = cursor.execute(statement)
+        cursor = cursor.execute(statement, params) if params else cursor.execute(statement)
 
-        msg = f'Successfully executed formed statement {statement}'
-        logger.info(f"SQL_SVC_ECT_SMT: {msg}")
+        msg = 'Successfully executed formed statement'
+        logger.info("SQL_SVC_ECT_SMT: %s %s", msg, utils.loggable_sql(statement, logger))
         
         return {
             'error': False,
@@ -283,7 +395,33 @@ def execute_formed_statement(cursor, statement, logger):
 
     except Exception as e:
         msg =f'An error occured when trying to execute formed statement, {e}'
-        logger.error(f"SQL_SVC_ECT_SMT_ERR: {msg}")
+        logger.error("SQL_SVC_ECT_SMT_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def execute_many(cursor, statement, rows, logger, fast = True):
+    logger.debug("SQL_SVC_ECT_MNY: Attempting to execute formed statement for many rows")
+    try:
+        cursor.fast_executemany = fast
+        cursor.executemany(statement, rows)
+
+        msg = 'Successfully executed formed statement for many rows'
+        logger.info("SQL_SVC_ECT_MNY: %s (%d rows) %s", msg, len(rows), utils.loggable_sql(statement, logger))
+        
+        return {
+            'error': False,
+            'msg': msg,
+            'data': cursor
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to execute formed statement for many rows, {e}'
+        logger.error("SQL_SVC_ECT_MNY_ERR: %s", msg)
 
         return {
             'error': True,
@@ -293,12 +431,12 @@ def execute_formed_statement(cursor, statement, logger):
         }
 
 def commit(cursor, rows_affected, logger):
-    logger.info("SQL_SVC_CMT: Attempting to commit changes")
+    logger.debug("SQL_SVC_CMT: Attempting to commit changes")
     try:
         cursor = cursor.commit()
 
         msg = f'Successfully committed changes'
-        logger.info(f"SQL_SVC_CMT: {msg}")
+        logger.info("SQL_SVC_CMT: %s", msg)
 
         return {
             'error': False,
@@ -308,7 +446,7 @@ def commit(cursor, rows_affected, logger):
     
     except Exception as e:
         msg =f'An error occured when trying to commit changes, {e}'
-        logger.error(f"SQL_SVC_CMT_ERR: {msg}")
+        logger.error("SQL_SVC_CMT_ERR: %s", msg)
 
         return {
             'error': True,
@@ -318,12 +456,12 @@ def commit(cursor, rows_affected, logger):
         }
 
 def form_update_statement(table, params, where, logger, file = update_statement_file):
-    logger.info("SQL_SVC_FRM_UDT: Attempting to form UPDATE statement")
+    logger.debug("SQL_SVC_FRM_UDT: Attempting to form UPDATE statement")
     try:
-        statement = open(file).read().format(table, params, where)
+        statement = sql_templates.registry.get(file).render(table, params, where)
        
-        msg = f'Successfully formed UPDATE statement {statement}'
-        logger.info(f"SQL_SVC_FRM_UDT: {msg}")
+        msg = 'Successfully formed UPDATE statement'
+        logger.info("SQL_SVC_FRM_UDT: %s %s", msg, utils.loggable_sql(statement, logger))
 
         return {
             'error': False,
@@ -333,7 +471,7 @@ def form_update_statement(table, params, where, logger, file = update_statement_
     
     except Exception as e:
         msg =f'An error occured when trying to form UPDATE statement, {e}'
-        logger.error(f"SQL_SVC_FRM_UDT_ERR: {msg}")
+        logger.error("SQL_SVC_FRM_UDT_ERR: %s", msg)
         
         return {
             'error': True,
@@ -343,12 +481,12 @@ def form_update_statement(table, params, where, logger, file = update_statement_
         }
 
 def form_delete_statement(table, where, logger, file = delete_statement_file):
-    logger.info("SQL_SVC_FRM_DLT: Attempting to form DELETE statement")    
+    logger.debug("SQL_SVC_FRM_DLT: Attempting to form DELETE statement")    
     try:
-        statement = open(file).read().format(table, where)
+        statement = sql_templates.registry.get(file).render(table, where)
 
-        msg = f'Successfully formed DELETE statement {statement}'
-        logger.info(f"SQL_SVC_FRM_DLT: {msg}")
+        msg = 'Successfully formed DELETE statement'
+        logger.info("SQL_SVC_FRM_DLT: %s %s", msg, utils.loggable_sql(statement, logger))
 
         return {
             'error': False,
@@ -358,7 +496,57 @@ def form_delete_statement(table, where, logger, file = delete_statement_file):
     
     except Exception as e:
         msg =f'An error occured when trying to form DELETE statement, {e}'
-        logger.error(f"SQL_SVC_FRM_DLT_ERR: {msg}")
+        logger.error("SQL_SVC_FRM_DLT_ERR: %s", msg)
+        
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def form_delete_top_statement(table, where, logger, file = delete_top_statement_file):
+    logger.debug("SQL_SVC_FRM_DLT_TOP: Attempting to form chunked DELETE statement")
+    try:
+        statement = sql_templates.registry.get(file).render(table, where)
+
+        msg = 'Successfully formed chunked DELETE statement'
+        logger.info("SQL_SVC_FRM_DLT_TOP: %s %s", msg, utils.loggable_sql(statement, logger))
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': statement
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to form chunked DELETE statement, {e}'
+        logger.error("SQL_SVC_FRM_DLT_TOP_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def form_bulk_insert_statement(table, path, options, logger, file = bulk_insert_statement_file):
+    logger.debug("SQL_SVC_FRM_BLK: Attempting to form BULK INSERT statement")    
+    try:
+        statement = sql_templates.registry.get(file).render(table, str(path).replace("'", "''"), options)
+
+        msg = 'Successfully formed BULK INSERT statement'
+        logger.info("SQL_SVC_FRM_BLK: %s %s", msg, utils.loggable_sql(statement, logger))
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': statement
+        }
+    
+    except Exception as e:
+        msg =f'An error occured when trying to form BULK INSERT statement, {e}'
+        logger.error("SQL_SVC_FRM_BLK_ERR: %s", msg)
         
         return {
             'error': True,
@@ -367,13 +555,113 @@ def form_delete_statement(table, where, logger, file = delete_statement_file):
             'data': None
         }
 
+def form_staging_table_statement(staging_table, table, columns, logger, file = staging_table_statement_file):
+    logger.debug("SQL_SVC_FRM_STG: Attempting to form staging table statement")
+    try:
+        statement = sql_templates.registry.get(file).render(columns, staging_table, table, columns, table)
+
+        msg = 'Successfully formed staging table statement'
+        logger.info("SQL_SVC_FRM_STG: %s %s", msg, utils.loggable_sql(statement, logger))
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': statement
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to form staging table statement, {e}'
+        logger.error("SQL_SVC_FRM_STG_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def form_merge_statement(table, staging_table, on, clauses, logger, file = merge_statement_file):
+    logger.debug("SQL_SVC_FRM_MRG: Attempting to form MERGE statement")
+    try:
+        statement = sql_templates.registry.get(file).render(table, staging_table, on, clauses)
+
+        msg = 'Successfully formed MERGE statement'
+        logger.info("SQL_SVC_FRM_MRG: %s %s", msg, utils.loggable_sql(statement, logger))
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': statement
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to form MERGE statement, {e}'
+        logger.error("SQL_SVC_FRM_MRG_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def form_update_from_statement(table, staging_table, assignments, on, logger, file = update_from_statement_file):
+    logger.debug("SQL_SVC_FRM_UPF: Attempting to form UPDATE FROM statement")
+    try:
+        statement = sql_templates.registry.get(file).render(assignments, table, staging_table, on)
+
+        msg = 'Successfully formed UPDATE FROM statement'
+        logger.info("SQL_SVC_FRM_UPF: %s %s", msg, utils.loggable_sql(statement, logger))
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': statement
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to form UPDATE FROM statement, {e}'
+        logger.error("SQL_SVC_FRM_UPF_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
+def form_drop_table_statement(table, logger, file = drop_table_statement_file):
+    logger.debug("SQL_SVC_FRM_DRP: Attempting to form DROP TABLE statement")
+    try:
+        statement = sql_templates.registry.get(file).render(table)
+
+        msg = 'Successfully formed DROP TABLE statement'
+        logger.info("SQL_SVC_FRM_DRP: %s %s", msg, utils.loggable_sql(statement, logger))
+
+        return {
+            'error': False,
+            'msg': msg,
+            'data': statement
+        }
+
+    except Exception as e:
+        msg =f'An error occured when trying to form DROP TABLE statement, {e}'
+        logger.error("SQL_SVC_FRM_DRP_ERR: %s", msg)
+
+        return {
+            'error': True,
+            'msg': msg,
+            'exception': e,
+            'data': None
+        }
+
 def rollback(cursor, logger):
-    logger.info("SQL_SVC_RBK: Attempting to rollback cursor changes")    
+    logger.debug("SQL_SVC_RBK: Attempting to rollback cursor changes")    
     try:
         cursor = cursor.rollback()
 
         msg = f'Successfully rolled back cursor changes'
-        logger.info(f"SQL_SVC_RBK: {msg}")
+        logger.info("SQL_SVC_RBK: %s", msg)
 
         return {
             'error': False,
@@ -383,7 +671,7 @@ def rollback(cursor, logger):
     
     except Exception as e:
         msg =f'An error occured when trying to rollback cursor changes, {e}'
-        logger.error(f"SQL_SVC_RBK_ERR: {msg}")
+        logger.error("SQL_SVC_RBK_ERR: %s", msg)
 
         return {
             'error': True,
@@ -0,0 +1,104 @@
+import bisect
+import threading
+import time
+
+STAGES = ("connect", "form", "execute", "fetch", "transform", "commit", "close")
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class TimedRows(list):
+    __slots__ = ('timings',)
+
+
+class StageStats():
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def as_dict(self):
+        buckets = {f"<={bound}": count for bound, count in zip(BUCKETS, self.buckets)}
+        buckets["+Inf"] = self.buckets[-1]
+
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else None,
+            'buckets': buckets
+        }
+
+
+class StatsRegistry():
+
+    def __init__(self):
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self.lock:
+            stats = self.stages.get(stage)
+
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+
+            stats.record(seconds)
+
+    def snapshot(self, stage = None):
+        with self.lock:
+            if stage is not None:
+                stats = self.stages.get(stage)
+                return stats.as_dict() if stats is not None else StageStats().as_dict()
+
+            return {name: stats.as_dict() for name, stats in self.stages.items()}
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+
+
+registry = StatsRegistry()
+
+
+def timed(timings, stage, func, *args, **kwargs):
+    start = time.perf_counter()
+
+    try:
+        return func(*args, **kwargs)
+
+    finally:
+        elapsed = time.perf_counter() - start
+        timings[stage] = timings.get(stage, 0.0) + elapsed
+        registry.record(stage, elapsed)
+
+def attach_timings(result, timings):
+    timings = dict(timings)
+
+    if isinstance(result, dict):
+        return dict(result, timings = timings)
+
+    if isinstance(result, list):
+        rows = TimedRows(result)
+        rows.timings = timings
+
+        return rows
+
+    return result
+
+def stats(stage = None):
+    return registry.snapshot(stage)
+
+def reset():
+    registry.reset()
@@ -0,0 +1,88 @@
+import os
+import string
+import threading
+from pathlib import Path
+
+QUERIES_DIR = Path(__file__).parent / "queries"
+
+
+class CompiledTemplate():
+
+    def __init__(self, text):
+        self.text = text
+        self.literals = []
+        self.simple = True
+
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            self.literals.append(literal)
+
+            if field is None:
+                continue
+
+            if field != "" or spec or conversion:
+                self.simple = False
+
+            self.literals.append(None)
+
+        self.fields = self.literals.count(None)
+
+    def render(self, *args):
+        if not self.simple:
+            return self.text.format(*args)
+
+        if len(args) < self.fields:
+            raise IndexError(f"Template expects {self.fields} values but {len(args)} were given")
+
+        values = iter(args)
+
+        return "".join(str(next(values)) if literal is None else literal for literal in self.literals)
+
+
+class TemplateRegistry():
+
+    def __init__(self, directory = QUERIES_DIR, auto_reload = False):
+        self.directory = Path(directory)
+        self.auto_reload = auto_reload
+        self.templates = {}
+        self.lock = threading.Lock()
+
+    def get(self, file):
+        entry = self.templates.get(file)
+
+        if entry is not None and not self.auto_reload:
+            return entry[2]
+
+        path = entry[0] if entry is not None else self.resolve(file)
+        mtime = os.stat(path).st_mtime_ns
+
+        if entry is not None and entry[1] == mtime:
+            return entry[2]
+
+        with open(path) as f:
+            compiled = CompiledTemplate(f.read())
+
+        with self.lock:
+            self.templates[file] = (path, mtime, compiled)
+
+        return compiled
+
+    def resolve(self, file):
+        path = Path(str(file).replace("\\", "/"))
+
+        if path.is_absolute() or path.exists():
+            return path
+
+        return self.directory / path.name
+
+    def preload(self):
+        for path in sorted(self.directory.glob("*.sql")):
+            self.get(path.name)
+
+        return list(self.templates)
+
+    def clear(self):
+        with self.lock:
+            self.templates.clear()
+
+
+registry = TemplateRegistry()
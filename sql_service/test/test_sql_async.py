@@ -0,0 +1,160 @@
+import asyncio
+import concurrent.futures
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from sql_service import sql_async
+from sql_service import sql_pool
+
+class TestSqlAsync(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.fake_args = {'table': 'tbl', 'columns': 'attr1,attr2', 'values': None, 'params': None, 'where': None}
+        self.fake_results = [{'attr1': 'value1', 'attr2': 'value2'}]
+        self.fake_pool = sql_pool.ConnectionPool('driver', 'server', 'db', 'user', 'pwd', Mock(), max_size = 1)
+
+    async def test_run_blocking(self):
+        started = threading.Event()
+        release = threading.Event()
+        cancel = Mock(side_effect = lambda: release.set())
+        cleanup = Mock()
+
+        def blocking_call():
+            started.set()
+            release.wait(5)
+
+            return "finished"
+
+        task = asyncio.create_task(sql_async.run_blocking(blocking_call, cancel = cancel, cleanup = cleanup))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        task.cancel()
+
+        with self.subTest("""
+        GIVEN a blocking call is running on the executor
+        WHEN the awaiting task is cancelled
+        THEN the cancel callback is invoked and CancelledError is raised
+        """):
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(cancel.call_count, 1)
+
+        await asyncio.sleep(0.05)
+
+        with self.subTest("""
+        GIVEN a cancelled call still finishing on the worker thread
+        WHEN the worker completes
+        THEN the cleanup callback receives the finished future
+        """):
+            self.assertEqual(cleanup.call_count, 1)
+            self.assertEqual("finished", cleanup.call_args[0][0].result())
+
+    @patch.object(sql_pool, 'get_pool')
+    @patch('sql_service.sql_async.sql_handler.SqlService')
+    async def test_sql_handler(self, mock_service, mock_get_pool):
+        mock_get_pool.return_value = self.fake_pool
+        mock_service.return_value.sql_handler.return_value = self.fake_results
+
+        service = await sql_async.AsyncSqlService.create('select', self.fake_args, 'driver', 'server', 'db', 'user', 'pwd')
+
+        with self.subTest("""
+        GIVEN a pool with one connection
+        WHEN an AsyncSqlService is created
+        THEN the service is constructed on the executor and holds the only async pool slot
+        """):
+            self.assertEqual(mock_service.call_count, 1)
+            self.assertTrue(service.async_pool.slots.locked())
+
+        actual_result = await service.sql_handler()
+        await asyncio.sleep(0)
+
+        with self.subTest("""
+        GIVEN an AsyncSqlService
+        WHEN the sql_handler() coroutine is awaited
+        THEN the blocking handler result is returned and the pool slot is released
+        """):
+            self.assertEqual(self.fake_results, actual_result)
+            self.assertFalse(sql_async._async_pools[sql_pool.pool_key('driver', 'server', 'db', 'user')].slots.locked())
+
+    @patch.object(sql_pool, 'get_pool')
+    @patch('sql_service.sql_async.sql_handler.SqlService')
+    async def test_sql_handler_cancelled(self, mock_service, mock_get_pool):
+        mock_get_pool.return_value = self.fake_pool
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers = 1)
+        self.addCleanup(executor.shutdown)
+        closed_on = []
+        mock_service.return_value.controller.close.side_effect = lambda: closed_on.append(threading.current_thread())
+
+        service = await sql_async.AsyncSqlService.create('select', self.fake_args, 'driver', 'server', 'db', 'user', 'pwd', executor = executor)
+        release = threading.Event()
+        busy = executor.submit(release.wait, 5)
+
+        task = asyncio.create_task(service.sql_handler())
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        release.set()
+        await asyncio.wrap_future(busy)
+        await asyncio.wrap_future(executor.submit(lambda: None))
+        await asyncio.sleep(0)
+
+        with self.subTest("""
+        GIVEN a sql_handler() call still queued behind a busy executor
+        WHEN the awaiting task is cancelled
+        THEN the handler never runs, the controller is closed on a worker thread and the pool slot is released
+        """):
+            self.assertEqual(mock_service.return_value.sql_handler.call_count, 0)
+            self.assertEqual(len(closed_on), 1)
+            self.assertIsNot(threading.main_thread(), closed_on[0])
+            self.assertFalse(sql_async._async_pools[sql_pool.pool_key('driver', 'server', 'db', 'user')].slots.locked())
+
+    async def test_acquire_timeout(self):
+        self.fake_pool.borrow_timeout = 0.05
+        async_pool = sql_async.AsyncConnectionPool(self.fake_pool)
+        await async_pool.acquire()
+
+        with self.subTest("""
+        GIVEN an async pool whose only slot is held
+        WHEN acquire() is awaited again
+        THEN PoolExhaustedError is raised after the pool's borrow timeout and no slot is taken
+        """):
+            with self.assertRaises(sql_pool.PoolExhaustedError):
+                await async_pool.acquire()
+            async_pool.release()
+            self.assertFalse(async_pool.slots.locked())
+
+    def test_cancel(self):
+        service = sql_async.AsyncSqlService(Mock())
+        service.cancel()
+
+        with self.subTest("""
+        GIVEN a controller running a statement on a per-statement cursor
+        WHEN the cancel() method is called
+        THEN the cursor currently executing is cancelled
+        """):
+            service.service.controller.active_cursor.cancel.assert_called_once_with()
+            service.service.controller.cursor.cancel.assert_not_called()
+
+    @patch.object(sql_pool, 'get_pool')
+    @patch('sql_service.sql_async.sql_handler.SqlService')
+    async def test_stream(self, mock_service, mock_get_pool):
+        mock_get_pool.return_value = self.fake_pool
+        mock_service.return_value.stream.return_value = (batch for batch in [[{'attr1': 1}, {'attr1': 2}], [{'attr1': 3}]])
+
+        service = await sql_async.AsyncSqlService.create('select', self.fake_args, 'driver', 'server', 'db', 'user', 'pwd')
+        actual_result = [row async for row in service.stream(batch_size = 2)]
+
+        with self.subTest("""
+        GIVEN an AsyncSqlService for a SELECT
+        WHEN the stream() async generator is consumed with async for
+        THEN every row from every fetched batch is yielded in order
+        """):
+            self.assertEqual([{'attr1': 1}, {'attr1': 2}, {'attr1': 3}], actual_result)
+            mock_service.return_value.stream.assert_called_once_with(batch_size = 2, batches = True, prefetch = 0)
+            self.assertIsNone(service.async_pool)
+
+if __name__ == "__main__":
+    unittest.main()
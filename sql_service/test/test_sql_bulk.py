@@ -0,0 +1,177 @@
+import csv
+import datetime
+import decimal
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from benchmarks import fake_pyodbc
+from sql_service import sql_bulk
+from sql_service import sql_pool
+from sql_service import sql_service
+
+class TestSqlBulk(unittest.TestCase):
+
+    def setUp(self):
+        self.staging = tempfile.TemporaryDirectory()
+        self.addCleanup(self.staging.cleanup)
+
+        self.loaded = []
+        self.lock = threading.Lock()
+        self.fake_controller = Mock(side_effect = self.fake_controller_factory)
+
+    def fake_controller_factory(self, *args, **kwargs):
+        controller = Mock()
+        controller.bulk_load = Mock(side_effect = self.fake_bulk_load)
+
+        return controller
+
+    def fake_bulk_load(self, path, rows, options):
+        local_path = os.path.join(self.staging.name, path.replace('\\', '/').rsplit('/', 1)[-1])
+
+        with open(local_path, encoding = 'utf-8', newline = '') as file:
+            staged = list(csv.reader(file))
+
+        with self.lock:
+            self.loaded.append((path, rows, options, staged))
+
+    def fake_loader(self, **kwargs):
+        return sql_bulk.BulkLoader('driver', 'server', 'db', 'user', 'password', self.staging.name, **kwargs)
+
+    def test_load(self):
+        rows = ((position, f"name, {position}", position % 2 == 0, None, b'\x0a') for position in range(25))
+        progress = Mock()
+
+        with patch('sql_service.sql_bulk.sql_controller.SqlController', self.fake_controller):
+            actual_result = self.fake_loader(rows_per_file = 10, batch_size = 500, streams = 2).load('tbl', rows, progress = progress)
+
+        with self.subTest("""
+        GIVEN 25 rows and 10 rows per file
+        WHEN the load() method is called
+        THEN three staged files are bulk loaded on their own controllers and all rows are reported
+        """):
+            self.assertEqual(25, actual_result['rows'])
+            self.assertEqual(3, actual_result['files'])
+            self.assertEqual(3, self.fake_controller.call_count)
+            self.assertEqual([10, 10, 5], sorted((loaded[1] for loaded in self.loaded), reverse = True))
+            self.assertEqual(3, progress.call_count)
+            self.assertEqual(25, progress.call_args_list[-1].args[0])
+
+        with self.subTest("""
+        GIVEN rows with commas, booleans, None and bytes
+        WHEN the rows are staged
+        THEN they are written as quoted CSV with 1/0, empty fields and hex
+        """):
+            staged = sorted(row for loaded in self.loaded for row in loaded[3])
+            self.assertIn(['0', 'name, 0', '1', '', '0a'], staged)
+            self.assertIn(['1', 'name, 1', '0', '', '0a'], staged)
+
+        with self.subTest("""
+        GIVEN a batch size and the default TABLOCK option
+        WHEN the files are bulk loaded
+        THEN the options carry both and the staged files are removed afterwards
+        """):
+            self.assertIn("BATCHSIZE = 500", self.loaded[0][2])
+            self.assertTrue(self.loaded[0][2].endswith("TABLOCK"))
+            self.assertEqual([], os.listdir(self.staging.name))
+
+    def test_stage(self):
+        path, count = self.fake_loader().stage(iter([('', None, 'a', 1)]), 'load', 0)
+
+        with open(path, 'rb') as file:
+            actual_result = file.read()
+
+        with self.subTest("""
+        GIVEN a row with an empty string and a None value
+        WHEN the stage() method is called
+        THEN the empty string is written as a quoted empty field and None as an unquoted empty field
+        """):
+            self.assertEqual(1, count)
+            self.assertEqual(b'"",,"a",1\n', actual_result)
+
+    def test_stage_value(self):
+        cases = [
+            (datetime.datetime(2024, 1, 2, 3, 4, 5), '"2024-01-02 03:04:05.000"'),
+            (datetime.datetime(2024, 1, 2, 3, 4, 5, 120000), '"2024-01-02 03:04:05.120"'),
+            (datetime.datetime(2024, 1, 2, 3, 4, 5, 123456), '"2024-01-02 03:04:05.123456"'),
+            (datetime.date(2024, 1, 2), '"2024-01-02"'),
+            (datetime.time(3, 4, 5, 250000), '"03:04:05.250"'),
+            (decimal.Decimal('1E+2'), '100'),
+            (1.5, '1.5')
+        ]
+
+        with self.subTest("""
+        GIVEN temporal, decimal and float values
+        WHEN stage_value() is called
+        THEN dates are written in ISO form with milliseconds unless the value carries microseconds and decimals in fixed point
+        """):
+            self.assertEqual([expected for value, expected in cases], [sql_bulk.stage_value(value) for value, expected in cases])
+
+        with self.subTest("""
+        GIVEN a non-finite float or decimal
+        WHEN stage_value() is called
+        THEN a ValueError is raised instead of writing text SQL Server cannot convert
+        """):
+            for value in (float('nan'), float('inf'), decimal.Decimal('NaN')):
+                with self.assertRaises(ValueError):
+                    sql_bulk.stage_value(value)
+
+    def test_load_fake_driver(self):
+        fake_pyodbc.reset()
+        fake_pyodbc.configure(record = True)
+        self.addCleanup(fake_pyodbc.reset)
+        self.addCleanup(sql_pool.close_all_pools)
+
+        with patch.object(sql_service, 'pyodbc', fake_pyodbc):
+            actual_result = self.fake_loader(rows_per_file = 2, batch_size = 50, tablock = False).load('tbl', [(1, 'a', None), (2, '', 3.5), (3, 'c"d', True)])
+
+        bulk_inserts = [sql for sql, params in fake_pyodbc.statements if sql.startswith("BULK INSERT")]
+
+        with self.subTest("""
+        GIVEN three rows, two rows per file and the fake pyodbc driver
+        WHEN the load() method is called
+        THEN each staged file is loaded with one BULK INSERT statement and the driver reads back every row
+        """):
+            self.assertEqual(3, actual_result['rows'])
+            self.assertEqual(2, len(bulk_inserts))
+            self.assertTrue(all(sql.startswith("BULK INSERT tbl FROM '") and sql.endswith(f"' WITH ({sql_bulk.bulk_options(50, False)})") for sql in bulk_inserts))
+            self.assertEqual([['1', 'a', ''], ['2', '', '3.5'], ['3', 'c"d', '1']], sorted(row for path, rows in fake_pyodbc.loaded for row in rows))
+            self.assertEqual(3, fake_pyodbc.stats()['rows_loaded'])
+
+    def test_load_failure(self):
+        self.fake_bulk_load = Mock(side_effect = Exception("BULK INSERT failed"))
+
+        with patch('sql_service.sql_bulk.sql_controller.SqlController', self.fake_controller):
+            with self.subTest("""
+            GIVEN a controller failing to bulk load
+            WHEN the load() method is called
+            THEN the exception is raised and no staged files are left behind
+            """):
+                with self.assertRaises(Exception):
+                    self.fake_loader(rows_per_file = 2).load('tbl', [(1,), (2,), (3,)])
+
+                self.assertEqual([], os.listdir(self.staging.name))
+
+    def test_load_csv(self):
+        path = os.path.join(self.staging.name, "source.csv")
+
+        with open(path, 'w', newline = '') as file:
+            file.write("id;name\n1;a\n2;b\n")
+
+        with patch('sql_service.sql_bulk.sql_controller.SqlController', self.fake_controller):
+            actual_result = self.fake_loader(server_staging_dir = "\\\\fileserver\\staging\\", tablock = False).load_csv('tbl', path, delimiter = ";")
+
+        with self.subTest("""
+        GIVEN a CSV file with a header and a server staging directory
+        WHEN the load_csv() method is called
+        THEN the header is skipped and the server path is sent without TABLOCK
+        """):
+            self.assertEqual(2, actual_result['rows'])
+            self.assertEqual([['1', 'a'], ['2', 'b']], self.loaded[0][3])
+            self.assertTrue(self.loaded[0][0].startswith("\\\\fileserver\\staging\\"))
+            self.assertNotIn("TABLOCK", self.loaded[0][2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from sql_service import sql_cache
+from sql_service import sql_rows
+
+class TestSqlCache(unittest.TestCase):
+
+    def setUp(self):
+        self.fake_key = sql_cache.cache_key('server', 'db', 'user', 'tbl', 'attr1,attr2', "id = '1'")
+        self.fake_results = [{'attr1': 'value1', 'attr2': 'value2'}]
+
+    def test_cache_key(self):
+        with self.subTest("""
+        GIVEN two requests differing only in whitespace, case of the table name and brackets
+        WHEN the cache_key() method is called
+        THEN the same key is returned
+        """):
+            self.assertEqual(self.fake_key, sql_cache.cache_key('SERVER', 'db', 'user', '[TBL]', 'attr1, attr2', "id  =  '1'"))
+
+        with self.subTest("""
+        GIVEN two requests with different row formats
+        WHEN the cache_key() method is called
+        THEN different keys are returned
+        """):
+            self.assertNotEqual(self.fake_key, sql_cache.cache_key('server', 'db', 'user', 'tbl', 'attr1,attr2', "id = '1'", "tuples"))
+
+        with self.subTest("""
+        GIVEN the same request made under two logins
+        WHEN the cache_key() method is called
+        THEN different keys are returned so one login's results are never served to another
+        """):
+            self.assertNotEqual(self.fake_key, sql_cache.cache_key('server', 'db', 'other_user', 'tbl', 'attr1,attr2', "id = '1'"))
+
+    def test_get_put(self):
+        cache = sql_cache.ResultCache()
+
+        with self.subTest("""
+        GIVEN an empty cache
+        WHEN the get() method is called
+        THEN MISS is returned and a miss is counted
+        """):
+            self.assertIs(sql_cache.MISS, cache.get(self.fake_key))
+            self.assertEqual(1, cache.stats()['misses'])
+
+        cache.put(self.fake_key, 'tbl', self.fake_results)
+
+        with self.subTest("""
+        GIVEN a cached result
+        WHEN the get() method is called
+        THEN a copy of the result is returned and a hit is counted
+        """):
+            actual_result = cache.get(self.fake_key)
+            self.assertEqual(self.fake_results, actual_result)
+            self.assertIsNot(self.fake_results, actual_result)
+            self.assertEqual(1, cache.stats()['hits'])
+
+        actual_result[0]['attr1'] = 'changed'
+        self.fake_results[0]['attr2'] = 'changed'
+
+        with self.subTest("""
+        GIVEN rows returned by the cache, or the rows it was given, are mutated
+        WHEN the get() method is called again
+        THEN the cached rows are unchanged
+        """):
+            self.assertEqual([{'attr1': 'value1', 'attr2': 'value2'}], cache.get(self.fake_key))
+
+        rows = [sql_rows.slots_class(('attr1',))(('value1',))]
+        cache.put(self.fake_key, 'tbl', rows)
+        cache.get(self.fake_key)[0].attr1 = 'changed'
+
+        with self.subTest("""
+        GIVEN cached rows in a mutable row format
+        WHEN a returned row is mutated
+        THEN the next hit builds fresh rows of the same format
+        """):
+            self.assertEqual(rows, cache.get(self.fake_key))
+            self.assertIsNot(rows[0], cache.get(self.fake_key)[0])
+
+        with self.subTest("""
+        GIVEN a cached result older than the TTL
+        WHEN the get() method is called
+        THEN MISS is returned and the entry is dropped
+        """):
+            with patch.object(sql_cache.time, 'monotonic', return_value = sql_cache.time.monotonic() + cache.ttl + 1):
+                self.assertIs(sql_cache.MISS, cache.get(self.fake_key))
+            self.assertEqual(1, cache.stats()['expirations'])
+            self.assertEqual(0, cache.stats()['bytes'])
+
+    def test_eviction(self):
+        size = sql_cache.estimate_size(self.fake_results)
+        cache = sql_cache.ResultCache(max_bytes = size * 2)
+
+        for position in range(3):
+            cache.put(('key', position), 'tbl', self.fake_results)
+
+        cache.get(('key', 1))
+        cache.put(('key', 3), 'tbl', self.fake_results)
+
+        with self.subTest("""
+        GIVEN a cache bounded to two results
+        WHEN more results are put than fit
+        THEN the least recently used entries are evicted and counted
+        """):
+            self.assertEqual(2, cache.stats()['evictions'])
+            self.assertIs(sql_cache.MISS, cache.get(('key', 2)))
+            self.assertEqual(self.fake_results, cache.get(('key', 1)))
+            self.assertLessEqual(cache.stats()['bytes'], size * 2)
+
+    def test_invalidate(self):
+        cache = sql_cache.ResultCache()
+        cache.put(self.fake_key, 'tbl', self.fake_results)
+        cache.put(('other',), 'other_tbl', self.fake_results)
+
+        generation = cache.generation('tbl')
+
+        with self.subTest("""
+        GIVEN cached results for two tables
+        WHEN the invalidate() method is called for one table
+        THEN only that table's results are dropped
+        """):
+            self.assertEqual(1, cache.invalidate('[TBL]'))
+            self.assertIs(sql_cache.MISS, cache.get(self.fake_key))
+            self.assertEqual(self.fake_results, cache.get(('other',)))
+
+        with self.subTest("""
+        GIVEN a result read before the table was invalidated
+        WHEN the put() method is called with the old generation
+        THEN the stale result is not cached
+        """):
+            self.assertFalse(cache.put(self.fake_key, 'tbl', self.fake_results, generation))
+            self.assertIs(sql_cache.MISS, cache.get(self.fake_key))
+
+    def test_single_flight(self):
+        single_flight = sql_cache.SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def query():
+            calls.append(1)
+            release.wait(5)
+
+            return self.fake_results
+
+        def request():
+            results.append(single_flight.do(self.fake_key, query))
+
+        threads = [threading.Thread(target = request) for _ in range(5)]
+
+        for thread in threads:
+            thread.start()
+
+        while single_flight.stats()['shared'] < 4:
+            threading.Event().wait(0.01)
+
+        release.set()
+
+        for thread in threads:
+            thread.join()
+
+        with self.subTest("""
+        GIVEN five concurrent identical requests
+        WHEN the do() method is called from each thread
+        THEN the query runs once and every caller receives its result
+        """):
+            self.assertEqual(1, len(calls))
+            self.assertEqual([self.fake_results] * 5, results)
+            self.assertEqual({'in_flight': 0, 'executions': 1, 'shared': 4}, single_flight.stats())
+
+        def failing_query():
+            raise ValueError("Generic error occured")
+
+        with self.subTest("""
+        GIVEN the shared query fails
+        WHEN the do() method is called
+        THEN the exception is raised and the key is free for the next request
+        """):
+            with self.assertRaises(ValueError):
+                single_flight.do(self.fake_key, failing_query)
+            self.assertEqual(self.fake_results, single_flight.do(self.fake_key, lambda: self.fake_results))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import datetime
+import decimal
+import unittest
+from unittest.mock import Mock, patch
+
+from sql_service import sql_columnar
+
+@unittest.skipIf(sql_columnar.numpy is None, "numpy is not installed")
+class TestSqlColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.fake_logger = Mock()
+        self.generic_error = "Generic error occured"
+
+        self.fake_cursor = Mock()
+        self.fake_cursor.description = (
+            ('id', int, None, 10, 10, 0, False),
+            ('price', decimal.Decimal, None, 10, 10, 2, True),
+            ('created', datetime.datetime, None, 23, 23, 3, True),
+            ('name', str, None, 50, 50, 0, True)
+        )
+        self.fake_cursor.fetchmany.side_effect = [
+            [(1, decimal.Decimal('1.50'), datetime.datetime(2024, 1, 1), 'a'), (2, None, None, None)],
+            [(None, decimal.Decimal('3'), datetime.datetime(2024, 1, 2), 'c')],
+            []
+        ]
+
+    def test_get_columnar_results(self):
+        actual_result = sql_columnar.get_columnar_results(self.fake_cursor, 2, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN a cursor returning rows over several fetchmany() batches
+        WHEN the get_columnar_results() method is called
+        THEN one masked array per column is returned, typed from the cursor description
+        """):
+            self.assertFalse(actual_result['error'])
+            data = actual_result['data']
+            self.assertEqual(['id', 'price', 'created', 'name'], list(data))
+            self.assertEqual('int64', str(data['id'].dtype))
+            self.assertEqual('float64', str(data['price'].dtype))
+            self.assertEqual('datetime64[us]', str(data['created'].dtype))
+            self.assertEqual(object, data['name'].dtype)
+            self.assertEqual([1, 2, 0], data['id'].data.tolist())
+
+        with self.subTest("""
+        GIVEN NULL values in the results
+        WHEN the get_columnar_results() method is called
+        THEN NULL positions are masked
+        """):
+            self.assertEqual([False, False, True], data['id'].mask.tolist())
+            self.assertEqual([False, True, False], data['price'].mask.tolist())
+            self.assertEqual([False, True, False], data['name'].mask.tolist())
+
+        self.fake_cursor.fetchmany.side_effect = Exception(self.generic_error)
+
+        actual_result = sql_columnar.get_columnar_results(self.fake_cursor, 2, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an exception is raised
+        WHEN the fetchmany() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])
+            self.assertEqual(self.generic_error, str(actual_result['exception']))
+            self.assertIsNone(actual_result['data'])
+
+    def test_require_numpy(self):
+        with patch.object(sql_columnar, 'numpy', None):
+            with self.subTest("""
+            GIVEN numpy is not installed
+            WHEN the require_numpy() method is called
+            THEN an ImportError exception is raised
+            """):
+                with self.assertRaises(ImportError):
+                    sql_columnar.require_numpy()
+
+if __name__ == "__main__":
+    unittest.main()
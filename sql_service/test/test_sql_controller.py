@@ -1,8 +1,10 @@
+import gc
+import threading
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
-import sql_controller
-import sql_service
+from sql_service import sql_controller
+from sql_service import sql_service
 
 class TestSqlController(unittest.TestCase):
     def setUp(self):
@@ -11,8 +13,9 @@ class TestSqlController(unittest.TestCase):
         self.fake_cursor = Mock(rowcount = 3)
         self.fake_logger = Mock()     
 
-        self.sql_controller_w_where = sql_controller.SqlController(params = {'table': 'tbl_client', 'columns': 'first_name,last_name', 'values': None, 'params': [{'attr1': 'value1'}, {'attr2': 'value2'}], 'where': "WHERE id = '8B6E8C04-3137-4EB0-8E68-F6236D47C2E6'"}, transaction_id = '123456', logger = self.fake_logger)
-        self.sql_controller_wo_where = sql_controller.SqlController(params = {'table': 'tbl_client', 'columns': 'first_name,last_name', 'values': None, 'params': [{'attr1': 'value1'}, {'attr2': 'value2'}], 'where': None}, transaction_id = '123456', logger = self.fake_logger)
+        with patch.object(sql_controller.SqlController, 'connect', return_value = self.fake_cursor):
+            self.sql_controller_w_where = sql_controller.SqlController(params = {'table': 'tbl_client', 'columns': 'first_name,last_name', 'values': None, 'params': [{'attr1': 'value1'}, {'attr2': 'value2'}], 'where': "WHERE id = '8B6E8C04-3137-4EB0-8E68-F6236D47C2E6'"}, transaction_id = '123456', logger = self.fake_logger, driver = 'DRIVERNAME', server = 'SERVERNAME', database = 'db_name', username = 'username', password = 'password', pooled = False)
+            self.sql_controller_wo_where = sql_controller.SqlController(params = {'table': 'tbl_client', 'columns': 'first_name,last_name', 'values': None, 'params': [{'attr1': 'value1'}, {'attr2': 'value2'}], 'where': None}, transaction_id = '123456', logger = self.fake_logger, driver = 'DRIVERNAME', server = 'SERVERNAME', database = 'db_name', username = 'username', password = 'password', pooled = False)
 
         self.generic_error = "Generic error occured"
 
@@ -41,11 +44,8 @@ class TestSqlController(unittest.TestCase):
         self.fake_update_statement = f"UPDATE {self.fake_table_name} SET {self.fake_params} {self.fake_where}"
         self.fake_delete_statement = f"DELETE FROM {self.fake_table_name} WHERE {self.fake_where}"
 
-    @patch.object(sql_controller.config, 'db')
     @patch.object(sql_controller.SqlController, 'connect')
-    def test__init__(self, mock_cursor, mock_config):
-
-        mock_config.return_value = self.fake_config
+    def test__init__(self, mock_cursor):
         mock_cursor.return_value = self.fake_cursor
 
         params = {
@@ -59,7 +59,8 @@ class TestSqlController(unittest.TestCase):
         actual_result = sql_controller.SqlController(
             params = params,
             transaction_id = self.fake_transaction_id,
-            logger = self.fake_logger
+            logger = self.fake_logger,
+            **self.fake_config['credentials']
         )
         
         with self.subTest("""
@@ -184,6 +185,57 @@ class TestSqlController(unittest.TestCase):
         """):
             self.assertEqual(self.fake_cursor, actual_result)
 
+    @patch.object(sql_controller.SqlController, 'query')
+    def test_select_coalesced(self, mock_query):
+        single_flight = sql_controller.sql_cache.SingleFlight()
+        release = threading.Event()
+        mock_query.side_effect = lambda row_format, request: release.wait(5) and []
+        results = []
+
+        with patch.object(sql_controller.SqlController, 'connect', return_value = self.fake_cursor):
+            controllers = [sql_controller.SqlController({'table': 'tbl', 'columns': 'attr1', 'where': None}, '123456', self.fake_logger, 'DRIVERNAME', 'SERVERNAME', 'db_name', username, 'password', pooled = False, coalesce = single_flight) for username in ('reader', 'reader', 'other')]
+
+        threads = [threading.Thread(target = lambda controller = controller: results.append(controller.select())) for controller in controllers]
+
+        for thread in threads:
+            thread.start()
+
+        while single_flight.stats()['executions'] + single_flight.stats()['shared'] < 3:
+            threading.Event().wait(0.01)
+
+        release.set()
+
+        for thread in threads:
+            thread.join()
+
+        with self.subTest("""
+        GIVEN identical SELECTs in flight under two logins
+        WHEN the select() method is called with a shared SingleFlight
+        THEN requests are only coalesced within one login
+        """):
+            self.assertEqual({'in_flight': 0, 'executions': 2, 'shared': 1}, single_flight.stats())
+            self.assertEqual(2, mock_query.call_count)
+
+    @patch.object(sql_service, 'connect')
+    def test_dropped(self, mock_conn):
+        mock_conn.side_effect = lambda conn_string, logger: {'error': False, 'data': Mock()}
+        self.addCleanup(sql_controller.sql_pool.close_all_pools)
+
+        controller = sql_controller.SqlController({'table': 'tbl'}, '123456', self.fake_logger, 'DRIVERNAME', 'SERVERNAME', 'db_name', 'dropped', 'password')
+        pool = sql_controller.sql_pool.get_pool('DRIVERNAME', 'SERVERNAME', 'db_name', 'dropped', 'password', self.fake_logger)
+        in_use = pool.stats()['in_use']
+
+        del controller
+        gc.collect()
+
+        with self.subTest("""
+        GIVEN a controller holding a pooled connection
+        WHEN the controller is dropped without close() being called
+        THEN its connection is released and the pool slot is freed
+        """):
+            self.assertEqual(1, in_use)
+            self.assertEqual(0, pool.stats()['in_use'])
+
     @patch.object(sql_service, 'commit')    
     @patch.object(sql_service, 'rollback')    
     @patch.object(sql_service, 'execute_formed_statement')    
@@ -253,29 +305,30 @@ class TestSqlController(unittest.TestCase):
         with self.subTest("""
         GIVEN no exceptions are caught
         WHEN the commit() method is called
-        THEN a message summarising the execution is returned
+        THEN a message summarising the execution is returned with the time spent in each stage
         """):
             self.assertEqual(self.fake_cursor, actual_result['data'])
+            self.assertEqual(['form', 'execute', 'commit'], [stage for stage in actual_result['timings'] if stage != 'connect'])
 
     @patch.object(sql_service, 'commit')    
     @patch.object(sql_service, 'rollback')    
     @patch.object(sql_service, 'execute_formed_statement')    
     @patch.object(sql_service, 'form_insert_statement')    
-    @patch('sql_controller.utils')
+    @patch('sql_service.sql_controller.utils')
     def test_insert(self, mock_util, mock_statement, mock_result, mock_rollback, mock_commit):
-        mock_util.listify_string.side_effect = RuntimeError(self.generic_error)
+        mock_util.split_values.side_effect = RuntimeError(self.generic_error)
 
         with self.subTest("""
         GIVEN an exception is caught
-        WHEN the listify_string() method is called
+        WHEN the split_values() method is called
         THEN a RuntimeError exception is raised
         """):
             with self.assertRaises(RuntimeError) as context:
                 self.sql_controller_w_where.insert()
             self.assertTrue(self.generic_error in str(context.exception))      
 
-        mock_util.listify_string.side_effect = None
-        mock_util.listify_string.return_value = "'value1','value2'"
+        mock_util.split_values.side_effect = None
+        mock_util.split_values.return_value = self.fake_values
 
         mock_statement.side_effect = OSError(self.generic_error)
 
@@ -398,7 +451,7 @@ class TestSqlController(unittest.TestCase):
 
         mock_query_results.return_value = {
             'error': False,
-            'data': self.fake_results
+            'data': self.fake_cursor
         }
         
         mock_columns.return_value = {
@@ -474,25 +527,458 @@ class TestSqlController(unittest.TestCase):
         """):
             self.assertTrue(expected_result, actual_result)
      
+    @patch.object(sql_controller.time, 'sleep')
+    @patch.object(sql_service, 'commit')
+    @patch.object(sql_service, 'rollback')
+    @patch.object(sql_service, 'execute_formed_statement')
+    def test_delete_chunked(self, mock_result, mock_rollback, mock_commit, mock_sleep):
+        mock_result.side_effect = [{'error': False, 'data': Mock(rowcount = rowcount)} for rowcount in (2, 2, 1)]
+        mock_commit.side_effect = lambda cursor, rows_affected, logger: {'error': False, 'data': f"{rows_affected} row(s) affected"}
+        progress = Mock()
+
+        actual_result = self.sql_controller_w_where.delete_chunked(chunk_size = 2, sleep = 0.5, progress = progress)
+
+        with self.subTest("""
+        GIVEN a table holding five matching rows
+        WHEN the delete_chunked() method is called with a chunk size of two
+        THEN DELETE TOP (?) runs until a short chunk, committing and reporting progress per chunk
+        """):
+            self.assertEqual("DELETE TOP (?) FROM tbl_client WHERE id = ?", mock_result.call_args[0][1])
+            self.assertEqual([2, '8B6E8C04-3137-4EB0-8E68-F6236D47C2E6'], mock_result.call_args[0][3])
+            self.assertEqual(3, mock_commit.call_count)
+            self.assertEqual(2, mock_sleep.call_count)
+            self.assertEqual([(2, 1), (4, 2), (5, 3)], [call.args for call in progress.call_args_list])
+            self.assertEqual((5, 3, True), (actual_result['deleted'], actual_result['chunks'], actual_result['complete']))
+            self.assertEqual("5 row(s) affected", actual_result['data'])
+
+        mock_result.side_effect = None
+        mock_result.return_value = {'error': False, 'data': Mock(rowcount = 2)}
+
+        actual_result = self.sql_controller_w_where.delete_chunked(chunk_size = 2, max_seconds = 0)
+
+        with self.subTest("""
+        GIVEN a time budget that has run out
+        WHEN the delete_chunked() method is called
+        THEN it stops after the first chunk and reports the delete as incomplete
+        """):
+            self.assertEqual((2, 1, False), (actual_result['deleted'], actual_result['chunks'], actual_result['complete']))
+
+        mock_result.return_value = {'error': False, 'data': Mock(rowcount = -1)}
+        mock_commit.reset_mock()
+        mock_rollback.reset_mock()
+
+        with self.subTest("""
+        GIVEN a driver that reports an unknown row count of -1
+        WHEN the delete_chunked() method is called
+        THEN a Exception exception is raised and the chunk is rolled back instead of being reported as complete
+        """):
+            with self.assertRaises(Exception) as context:
+                self.sql_controller_w_where.delete_chunked(chunk_size = 2)
+            self.assertTrue("row count" in str(context.exception))
+            self.assertFalse(mock_commit.called)
+            self.assertTrue(mock_rollback.called)
+
+        mock_result.return_value = {
+            'error': True,
+            'exception': Exception(self.generic_error)
+        }
+
+        with self.subTest("""
+        GIVEN an exception is caught
+        WHEN the execute_formed_statement() method is called
+        THEN a Exception exception is raised and the chunk is rolled back
+        """):
+            with self.assertRaises(Exception) as context:
+                self.sql_controller_w_where.delete_chunked()
+            self.assertTrue(self.generic_error in str(context.exception))
+            self.assertTrue(mock_rollback.called)
+
+    @patch.object(sql_service, 'commit')
+    @patch.object(sql_service, 'rollback')
+    @patch.object(sql_service, 'execute_many')
+    @patch.object(sql_service, 'form_insert_statement')
+    def test_bulk_insert(self, mock_statement, mock_result, mock_rollback, mock_commit):
+        fake_rows = [('a1', 'a2'), {'first_name': 'b1', 'last_name': 'b2'}, ('c1', 'c2')]
+
+        mock_statement.return_value = {
+            'error': False,
+            'data': "INSERT INTO tbl_client (first_name,last_name) VALUES (?,?)"
+        }
+
+        mock_result.return_value = {
+            'error': False,
+            'data': self.fake_cursor
+        }
+
+        mock_commit.side_effect = lambda cursor, rows_affected, logger: {'error': False, 'data': f"{rows_affected} row(s) affected"}
+
+        actual_result = self.sql_controller_w_where.bulk_insert(fake_rows, batch_size = 2)
+
+        with self.subTest("""
+        GIVEN rows given as tuples and dictionaries
+        WHEN the bulk_insert() method is called
+        THEN the rows are sent in parameterised chunks of batch_size and committed per chunk
+        """):
+            mock_statement.assert_called_once_with('tbl_client', 'first_name,last_name', '?,?', self.fake_logger)
+            self.assertEqual([('a1', 'a2'), ('b1', 'b2')], mock_result.call_args_list[0][0][2])
+            self.assertEqual([('c1', 'c2')], mock_result.call_args_list[1][0][2])
+            self.assertEqual(mock_commit.call_count, 2)
+            self.assertEqual("3 row(s) affected", actual_result['data'])
+
+        mock_commit.reset_mock()
+
+        actual_result = self.sql_controller_w_where.bulk_insert(fake_rows, batch_size = 2, commit_per_batch = False)
+
+        with self.subTest("""
+        GIVEN commit_per_batch is disabled
+        WHEN the bulk_insert() method is called
+        THEN a single commit is made once every chunk has been sent
+        """):
+            self.assertEqual(mock_commit.call_count, 1)
+            self.assertEqual("3 row(s) affected", actual_result['data'])
+
+        mock_result.return_value = {
+            'error': True,
+            'exception': Exception(self.generic_error)
+        }
+
+        with self.subTest("""
+        GIVEN an exception is caught
+        WHEN the execute_many() method is called
+        THEN a Exception exception is raised and the chunk is rolled back
+        """):
+            with self.assertRaises(Exception) as context:
+                self.sql_controller_w_where.bulk_insert(fake_rows)
+            self.assertTrue(self.generic_error in str(context.exception))
+            self.assertTrue(mock_rollback.called)
+
+    @patch.object(sql_service, 'commit')
+    @patch.object(sql_service, 'rollback')
+    @patch.object(sql_service, 'get_results')
+    @patch.object(sql_service, 'execute_formed_query')
+    @patch.object(sql_service, 'execute_many')
+    @patch.object(sql_service, 'execute_formed_statement')
+    def test_bulk_upsert(self, mock_statement_result, mock_many_result, mock_query_result, mock_results, mock_rollback, mock_commit):
+        fake_rows = [{'id': 1, 'first_name': 'a', 'last_name': 'b'}, (2, 'c', 'd'), (3, 'e', 'f')]
+        request = {'table': 'tbl_client', 'columns': 'id,first_name,last_name', 'where': None}
+
+        mock_statement_result.return_value = {'error': False, 'data': Mock(rowcount = 2)}
+        mock_many_result.return_value = {'error': False, 'data': self.fake_cursor}
+        mock_query_result.return_value = {'error': False, 'data': self.fake_cursor}
+        mock_results.return_value = {'error': False, 'data': [(1, 2)]}
+        mock_commit.side_effect = lambda cursor, rows_affected, logger: {'error': False, 'data': f"{rows_affected} row(s) affected"}
+
+        actual_result = self.sql_controller_wo_where.bulk_upsert(fake_rows, 'id', batch_size = 2, request = request)
+
+        with self.subTest("""
+        GIVEN rows keyed by id
+        WHEN the bulk_upsert() method is called
+        THEN the rows are staged in a temp table in chunks, merged with one statement counting its actions on the server and committed once
+        """):
+            staging, merge = mock_statement_result.call_args_list[0][0][1], mock_query_result.call_args[0][1]
+            staging_table = staging.split(" INTO ")[1].split()[0]
+            self.assertTrue(staging_table.startswith("#staging_"))
+            self.assertEqual(2, mock_many_result.call_count)
+            self.assertEqual([(1, 'a', 'b'), (2, 'c', 'd')], mock_many_result.call_args_list[0][0][2])
+            self.assertEqual(f"SET NOCOUNT ON; DECLARE @merge_actions TABLE (merge_action NVARCHAR(10)); MERGE tbl_client WITH (HOLDLOCK) AS target USING {staging_table} AS source ON target.id = source.id WHEN MATCHED THEN UPDATE SET first_name = source.first_name, last_name = source.last_name WHEN NOT MATCHED BY TARGET THEN INSERT (id,first_name,last_name) VALUES (source.id,source.first_name,source.last_name) OUTPUT $action INTO @merge_actions; SET NOCOUNT OFF; SELECT COUNT(CASE WHEN merge_action = 'INSERT' THEN 1 END), COUNT(CASE WHEN merge_action = 'UPDATE' THEN 1 END) FROM @merge_actions;", merge)
+            self.assertEqual(f"DROP TABLE IF EXISTS {staging_table}", mock_statement_result.call_args_list[-1][0][1])
+            self.assertEqual(mock_commit.call_count, 1)
+            self.assertEqual((1, 2), (actual_result['inserted'], actual_result['updated']))
+
+        mock_statement_result.reset_mock()
+
+        actual_result = self.sql_controller_wo_where.bulk_upsert(fake_rows, 'id', insert = False, request = request)
+
+        with self.subTest("""
+        GIVEN insert is disabled
+        WHEN the bulk_upsert() method is called
+        THEN the target is updated with a single UPDATE FROM join and the row count is returned
+        """):
+            self.assertTrue(mock_statement_result.call_args_list[1][0][1].startswith("UPDATE target SET first_name = source.first_name, last_name = source.last_name FROM tbl_client AS target INNER JOIN #staging_"))
+            self.assertEqual((0, 2), (actual_result['inserted'], actual_result['updated']))
+
+        with self.subTest("""
+        GIVEN a key that is not one of the columns
+        WHEN the bulk_upsert() method is called
+        THEN a ValueError is raised
+        """):
+            with self.assertRaises(ValueError):
+                self.sql_controller_wo_where.bulk_upsert(fake_rows, 'uuid', request = request)
+
+        mock_many_result.return_value = {
+            'error': True,
+            'exception': Exception(self.generic_error)
+        }
+
+        with self.subTest("""
+        GIVEN an exception is caught
+        WHEN the execute_many() method is called
+        THEN a Exception exception is raised and the staged rows are rolled back
+        """):
+            with self.assertRaises(Exception) as context:
+                self.sql_controller_wo_where.bulk_upsert(fake_rows, 'id', request = request)
+            self.assertTrue(self.generic_error in str(context.exception))
+            self.assertTrue(mock_rollback.called)
+
+    @patch.object(sql_service, 'get_results')
+    @patch.object(sql_service, 'get_columns')
+    @patch.object(sql_service, 'execute_formed_query')
+    @patch.object(sql_service, 'form_select_page_query')
+    def test_select_page(self, mock_query, mock_query_results, mock_columns, mock_results):
+        mock_query.return_value = {
+            'error': False,
+            'data': self.fake_select_query
+        }
+
+        mock_query_results.return_value = {
+            'error': False,
+            'data': self.fake_cursor
+        }
+
+        mock_columns.return_value = {
+            'error': False,
+            'data': ['first_name', 'last_name', 'id']
+        }
+
+        mock_results.return_value = {
+            'error': False,
+            'data': [('a', 'b', 1), ('c', 'd', 2), ('e', 'f', 3)]
+        }
+
+        actual_result = self.sql_controller_wo_where.select_page('id', page_size = 2)
+
+        with self.subTest("""
+        GIVEN more rows than the page size are returned
+        WHEN the select_page() method is called without a token
+        THEN the first page is returned with a token holding the last key, ordered by the key
+        """):
+            mock_query.assert_called_once_with('tbl_client', 'first_name,last_name,id', "", "id ASC", self.fake_logger)
+            self.assertEqual([3], mock_query_results.call_args[0][3])
+            self.assertEqual([{'first_name': 'a', 'last_name': 'b', 'id': 1}, {'first_name': 'c', 'last_name': 'd', 'id': 2}], actual_result['rows'])
+            self.assertEqual([2], sql_controller.utils.decode_page_token(actual_result['next_token'], ['id']))
+
+        mock_query.reset_mock()
+        mock_results.return_value = {
+            'error': False,
+            'data': [('e', 'f', 3)]
+        }
+
+        actual_result = self.sql_controller_wo_where.select_page('id', page_size = 2, token = actual_result['next_token'])
+
+        with self.subTest("""
+        GIVEN a continuation token and fewer rows than the page size
+        WHEN the select_page() method is called
+        THEN the query seeks past the last key and no further token is returned
+        """):
+            mock_query.assert_called_once_with('tbl_client', 'first_name,last_name,id', "WHERE ((id > ?))", "id ASC", self.fake_logger)
+            self.assertEqual([2, 3], mock_query_results.call_args[0][3])
+            self.assertEqual([{'first_name': 'e', 'last_name': 'f', 'id': 3}], actual_result['rows'])
+            self.assertIsNone(actual_result['next_token'])
+
+        actual_result = self.sql_controller_wo_where.select_page('id', page_size = 2, row_format = "tuples")
+
+        with self.subTest("""
+        GIVEN the tuples row format
+        WHEN the select_page() method is called
+        THEN the page carries the column header alongside the tuples, as select() does
+        """):
+            self.assertEqual(['first_name', 'last_name', 'id'], actual_result['columns'])
+            self.assertEqual([('e', 'f', 3)], actual_result['rows'])
+
+    @patch.object(sql_controller.SqlController, 'partition')
+    def test_select_partitioned(self, mock_partition):
+        fake_partitions = {
+            "(id < ? OR id IS NULL)": [('a', 'b', None), ('c', 'd', 1)],
+            "(id >= ? AND id < ?)": [('e', 'f', 6)],
+            "(id >= ?)": [('g', 'h', 11), ('i', 'j', 15)]
+        }
+
+        mock_partition.side_effect = lambda request, columns, where, params, condition, order_by: {'columns': ['first_name', 'last_name', 'id'], 'rows': fake_partitions[condition]}
+
+        actual_result = self.sql_controller_wo_where.select_partitioned('id', partitions = 3, ordered = True, bounds = (0, 15))
+
+        with self.subTest("""
+        GIVEN key bounds and three range partitions
+        WHEN the select_partitioned() method is called with ordered results
+        THEN one ordered query per range is run and the rows are merged in key order, NULL keys first
+        """):
+            self.assertEqual(3, mock_partition.call_count)
+            self.assertEqual([[5], [5, 10], [10]], sorted(call.args[3] for call in mock_partition.call_args_list))
+            self.assertEqual({"id ASC"}, {call.args[5] for call in mock_partition.call_args_list})
+            self.assertEqual([None, 1, 6, 11, 15], [row['id'] for row in actual_result])
+
+        mock_partition.reset_mock()
+        mock_partition.side_effect = lambda request, columns, where, params, condition, order_by: {'columns': ['first_name', 'last_name', 'id'], 'rows': [('a', 'b', params[-1])]}
+
+        actual_result = self.sql_controller_wo_where.select_partitioned('id', partitions = 2, mode = "modulo", row_format = "tuples")
+
+        with self.subTest("""
+        GIVEN the modulo mode
+        WHEN the select_partitioned() method is called unordered
+        THEN one unordered query per remainder is run and all rows are returned
+        """):
+            self.assertEqual(2, mock_partition.call_count)
+            self.assertIsNone(mock_partition.call_args[0][5])
+            self.assertEqual([0, 1], sorted(row[2] for row in actual_result['rows']))
+
+        with self.subTest("""
+        GIVEN an unknown partition mode
+        WHEN the select_partitioned() method is called
+        THEN a ValueError is raised
+        """):
+            with self.assertRaises(ValueError):
+                self.sql_controller_wo_where.select_partitioned('id', mode = "hash")
+
+    @patch.object(sql_controller.SqlController, 'partition')
+    def test_select_by_keys(self, mock_partition):
+        mock_partition.side_effect = lambda request, columns, where, params, condition, order_by: {'columns': ['first_name', 'last_name', 'id'], 'rows': [('n', 'n', key) for key in sorted(set(params), reverse = True) if key != 4]}
+
+        actual_result = self.sql_controller_wo_where.select_by_keys('id', [5, 1, 2, 1, 3, 4], chunk_size = 3, preserve_order = True)
+
+        with self.subTest("""
+        GIVEN duplicate keys, a missing key and a chunk size of three
+        WHEN the select_by_keys() method is called preserving order
+        THEN unique keys are looked up in padded IN list chunks and the rows follow the order of the keys
+        """):
+            self.assertEqual(2, mock_partition.call_count)
+            self.assertEqual({"id IN (?,?,?)"}, {call.args[4] for call in mock_partition.call_args_list})
+            self.assertEqual("first_name,last_name,id", mock_partition.call_args[0][1])
+            self.assertEqual([5, 1, 2, 3], [row['id'] for row in actual_result])
+
+        with self.subTest("""
+        GIVEN a chunk size above the parameter limit
+        WHEN the select_by_keys() method is called
+        THEN a ValueError is raised
+        """):
+            with self.assertRaises(ValueError):
+                self.sql_controller_wo_where.select_by_keys('id', [1], chunk_size = 2101)
+
+        mock_partition.reset_mock()
+        self.sql_controller_wo_where.in_transaction = True
+
+        with patch.object(sql_controller.SqlController, 'select_by_key_table', return_value = {'columns': ['first_name', 'last_name', 'id'], 'rows': []}) as mock_key_table:
+            self.sql_controller_wo_where.select_by_keys('id', [1, 2], chunk_size = 3)
+
+        with self.subTest("""
+        GIVEN an open transaction and fewer keys than the table threshold
+        WHEN the select_by_keys() method is called
+        THEN the keys are read through a key table on the transaction's own connection
+        """):
+            self.assertFalse(mock_partition.called)
+            self.assertEqual(1, mock_key_table.call_count)
+
+    @patch.object(sql_service, 'get_results')
+    @patch.object(sql_service, 'get_columns')
+    @patch.object(sql_service, 'execute_formed_query')
+    @patch.object(sql_service, 'execute_many')
+    @patch.object(sql_service, 'execute_formed_statement')
+    def test_select_by_key_table(self, mock_statement_result, mock_many_result, mock_query_results, mock_columns, mock_results):
+        mock_statement_result.return_value = {'error': False, 'data': self.fake_cursor}
+        mock_many_result.return_value = {'error': False, 'data': self.fake_cursor}
+        mock_query_results.return_value = {'error': False, 'data': self.fake_cursor}
+        mock_columns.return_value = {'error': False, 'data': ['first_name', 'last_name', 'id']}
+        mock_results.return_value = {'error': False, 'data': [('c', 'd', 2), ('a', 'b', 1)]}
+
+        actual_result = self.sql_controller_w_where.select_by_keys('id', [1, 2, 3], preserve_order = True, table_threshold = 2, row_format = "tuples")
+
+        with self.subTest("""
+        GIVEN more keys than the table threshold
+        WHEN the select_by_keys() method is called
+        THEN the keys are staged in a temp table and joined by one query on the same connection
+        """):
+            key_table = mock_statement_result.call_args_list[0][0][1].split(" INTO ")[1].split()[0]
+            self.assertTrue(key_table.startswith("#keys_"))
+            self.assertEqual([(1,), (2,), (3,)], mock_many_result.call_args[0][2])
+            self.assertEqual(f"SELECT first_name,last_name,id FROM tbl_client WHERE (id = ?) AND id IN (SELECT id FROM {key_table})", mock_query_results.call_args[0][1])
+            self.assertEqual(f"DROP TABLE IF EXISTS {key_table}", mock_statement_result.call_args_list[-1][0][1])
+            self.assertEqual([('a', 'b', 1), ('c', 'd', 2)], actual_result['rows'])
+
+    @patch.object(sql_service, 'get_results_batch')
+    @patch.object(sql_service, 'get_columns')
+    @patch.object(sql_service, 'execute_formed_query')
+    @patch.object(sql_service, 'form_select_query')
+    def test_iter_select(self, mock_query, mock_query_results, mock_columns, mock_results_batch):
+        mock_query.return_value = {
+            'error': False,
+            'data': self.fake_select_query
+        }
+
+        mock_query_results.return_value = {
+            'error': False,
+            'data': self.fake_cursor
+        }
+
+        mock_columns.return_value = {
+            'error': False,
+            'data': self.fake_columns
+        }
+
+        mock_results_batch.side_effect = [
+            {'error': False, 'data': [('a1', 'a2'), ('b1', 'b2')]},
+            {'error': False, 'data': [('c1', 'c2')]},
+            {'error': False, 'data': []}
+        ]
+
+        actual_result = list(self.sql_controller_w_where.iter_select(batch_size = 2))
+
+        with self.subTest("""
+        GIVEN no exceptions are caught
+        WHEN the iter_select() method is consumed
+        THEN rows are fetched in batches and yielded one dictionary at a time and the column header is recorded
+        """):
+            self.assertEqual([{'attr1': 'a1', 'attr2': 'a2'}, {'attr1': 'b1', 'attr2': 'b2'}, {'attr1': 'c1', 'attr2': 'c2'}], actual_result)
+            self.assertEqual(mock_results_batch.call_count, 3)
+            self.assertEqual(mock_results_batch.call_args[0][1], 2)
+            self.assertEqual(self.fake_columns, self.sql_controller_w_where.last_columns)
+
+        mock_results_batch.side_effect = [
+            {'error': False, 'data': [('a1', 'a2'), ('b1', 'b2')]},
+            {'error': False, 'data': []}
+        ]
+
+        actual_result = list(self.sql_controller_w_where.iter_select(batch_size = 2, batches = True))
+
+        with self.subTest("""
+        GIVEN batches is set
+        WHEN the iter_select() method is consumed
+        THEN one list of dictionaries is yielded per fetched batch
+        """):
+            self.assertEqual([[{'attr1': 'a1', 'attr2': 'a2'}, {'attr1': 'b1', 'attr2': 'b2'}]], actual_result)
+
+        mock_results_batch.side_effect = None
+        mock_results_batch.return_value = {
+            'error': True,
+            'exception': Exception(self.generic_error)
+        }
+
+        with self.subTest("""
+        GIVEN an exception is caught
+        WHEN the get_results_batch() method is called
+        THEN a Exception exception is raised
+        """):
+            with self.assertRaises(Exception) as context:
+                list(self.sql_controller_w_where.iter_select())
+            self.assertTrue(self.generic_error in str(context.exception))
+
     @patch.object(sql_service, 'commit')
     @patch.object(sql_service, 'rollback')
     @patch.object(sql_service, 'execute_formed_statement')
     @patch.object(sql_service, 'form_update_statement')
-    @patch('sql_service.utils')
+    @patch('sql_service.sql_controller.utils')
     def test_update(self, mock_params, mock_statement, mock_result, mock_rollback, mock_commit):
-        
-        mock_params.unpack_dict_list.side_effect = RuntimeError(self.generic_error)
+        mock_params.parameterize.return_value = (self.fake_where, [])
+        mock_params.parameterize_dict_list.side_effect = RuntimeError(self.generic_error)
 
         with self.subTest("""
         GIVEN an exception is caught
-        WHEN the unpack_dict_list() method is called
+        WHEN the parameterize_dict_list() method is called
         THEN a RuntimeError exception is raised
         """):
             with self.assertRaises(Exception) as context:
                 self.sql_controller_w_where.update()
 
-        mock_params.unpack_dict_list.side_effect = None
-        mock_params.unpack_dict_list.return_value = self.fake_params
+        mock_params.parameterize_dict_list.side_effect = None
+        mock_params.parameterize_dict_list.return_value = ("attr1 = ?, attr2 = ?", self.fake_values)
 
         mock_statement.return_value = {
             'error': True,
@@ -559,7 +1045,8 @@ class TestSqlController(unittest.TestCase):
         expected_result = {
             'error': False,
             'msg': 'Successfully committed changes',
-            'data': f"3 row(s) affected"
+            'data': f"3 row(s) affected",
+            'timings': ANY
         }
 
         mock_commit.return_value = {
@@ -581,7 +1068,8 @@ class TestSqlController(unittest.TestCase):
         expected_result = {
             'error': False,
             'msg': 'Successfully committed changes',
-            'data': f"3 row(s) affected"
+            'data': f"3 row(s) affected",
+            'timings': ANY
         }
 
         actual_result = self.sql_controller_wo_where.update()
@@ -593,6 +1081,65 @@ class TestSqlController(unittest.TestCase):
         """):
             self.assertEqual(expected_result, actual_result)
       
+    @patch.object(sql_service, 'commit')
+    @patch.object(sql_service, 'rollback')
+    @patch.object(sql_service, 'execute_formed_statement')
+    @patch.object(sql_service, 'form_delete_statement')
+    def test_transaction(self, mock_statement, mock_result, mock_rollback, mock_commit):
+        mock_statement.return_value = {
+            'error': False,
+            'data': self.fake_delete_statement
+        }
+
+        mock_result.return_value = {
+            'error': False,
+            'data': self.fake_cursor
+        }
+
+        mock_commit.return_value = {
+            'error': False,
+            'data': f"{self.fake_rows_affected * 2} row(s) affected"
+        }
+
+        with self.sql_controller_w_where.transaction():
+            self.sql_controller_w_where.delete()
+            self.sql_controller_w_where.delete()
+
+        with self.subTest("""
+        GIVEN two DELETE statements inside a transaction
+        WHEN the transaction() block exits without an error
+        THEN a single commit is made for the rows affected by both statements
+        """):
+            self.assertEqual(mock_result.call_count, 2)
+            mock_commit.assert_called_once_with(self.sql_controller_w_where.cursor, self.fake_rows_affected * 2, self.fake_logger)
+            self.assertFalse(mock_rollback.called)
+            self.assertFalse(self.sql_controller_w_where.in_transaction)
+
+        mock_commit.reset_mock()
+
+        with self.subTest("""
+        GIVEN an exception is raised inside a transaction
+        WHEN the transaction() block exits
+        THEN the changes are rolled back, nothing is committed and the exception is re-raised
+        """):
+            with self.assertRaises(ValueError):
+                with self.sql_controller_w_where.transaction():
+                    self.sql_controller_w_where.delete()
+                    raise ValueError(self.generic_error)
+            self.assertFalse(mock_commit.called)
+            self.assertTrue(mock_rollback.called)
+            self.assertFalse(self.sql_controller_w_where.in_transaction)
+
+        with self.subTest("""
+        GIVEN a transaction is already open
+        WHEN the transaction() method is called again
+        THEN a RuntimeError exception is raised
+        """):
+            with self.assertRaises(RuntimeError):
+                with self.sql_controller_w_where.transaction():
+                    with self.sql_controller_w_where.transaction():
+                        pass
+
     @patch.object(sql_service, 'rollback')
     def test_rollback(self, mock_response):
         error_msg = 'An error occured when trying to rollback cursor changes'
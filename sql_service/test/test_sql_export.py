@@ -0,0 +1,102 @@
+import datetime
+import decimal
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from sql_service import sql_export
+
+class TestSqlExport(unittest.TestCase):
+
+    def setUp(self):
+        self.fake_logger = Mock()
+        self.fake_description = (('id', int, None, 10, 10, 0, False), ('amount', decimal.Decimal, None, 10, 10, 2, True), ('created', datetime.datetime, None, 23, 23, 3, True), ('payload', bytes, None, 8, 8, 0, True))
+        self.fake_batches = [
+            [(1, decimal.Decimal('1.50'), datetime.datetime(2024, 1, 2, 3, 4, 5), b'\x01\x02'), (2, None, None, None)],
+            [(3, decimal.Decimal('0.10'), datetime.datetime(2024, 1, 3), b'')],
+            []
+        ]
+
+    def fake_cursor(self):
+        return Mock(description = self.fake_description, fetchmany = Mock(side_effect = self.fake_batches))
+
+    def test_export_results(self):
+        destination = io.StringIO()
+        progress = Mock()
+
+        actual_result = sql_export.export_results(self.fake_cursor(), destination, "csv", 2, self.fake_logger, progress = progress)
+
+        with self.subTest("""
+        GIVEN a cursor returning two batches
+        WHEN the export_results() method is called with the csv format
+        THEN a header and one line per row are written, binary values as hex, and progress is reported per batch
+        """):
+            self.assertFalse(actual_result['error'])
+            self.assertEqual(3, actual_result['data']['rows'])
+            self.assertEqual("id,amount,created,payload\r\n1,1.50,2024-01-02 03:04:05,0x0102\r\n2,,,\r\n3,0.10,2024-01-03 00:00:00,0x\r\n", destination.getvalue())
+            self.assertEqual(len(destination.getvalue()), actual_result['data']['bytes'])
+            self.assertEqual([(2, 68), (3, 99)], [call.args for call in progress.call_args_list])
+
+        destination = io.BytesIO()
+
+        actual_result = sql_export.export_results(self.fake_cursor(), destination, "jsonl", 2, self.fake_logger, compress = True)
+
+        with self.subTest("""
+        GIVEN a binary file object and compression
+        WHEN the export_results() method is called with the jsonl format
+        THEN gzipped JSON objects are written one per line and the file object is left open
+        """):
+            lines = gzip.decompress(destination.getvalue()).decode().splitlines()
+            self.assertEqual({'id': 1, 'amount': '1.50', 'created': '2024-01-02T03:04:05', 'payload': 'AQI='}, json.loads(lines[0]))
+            self.assertEqual(3, len(lines))
+            self.assertEqual(len(destination.getvalue()), actual_result['data']['bytes'])
+            self.assertFalse(destination.closed)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.csv.gz")
+
+            actual_result = sql_export.export_results(self.fake_cursor(), path, "csv", 2, self.fake_logger, header = False)
+
+            with self.subTest("""
+            GIVEN a path ending in .gz
+            WHEN the export_results() method is called
+            THEN the file is written gzipped
+            """):
+                with gzip.open(path, 'rt', newline = '') as file:
+                    self.assertTrue(file.read().startswith("1,1.50,"))
+
+        actual_result = sql_export.export_results(self.fake_cursor(), io.StringIO(), "xml", 2, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an unknown export format
+        WHEN the export_results() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])
+            self.assertIsInstance(actual_result['exception'], ValueError)
+            self.assertIsNone(actual_result['data'])
+
+    def test_infer_format(self):
+        with self.subTest("""
+        GIVEN paths with export suffixes
+        WHEN the infer_format() method is called
+        THEN the format is taken from the last suffix before .gz
+        """):
+            self.assertEqual("jsonl", sql_export.infer_format("out.ndjson.gz"))
+            self.assertEqual("csv", sql_export.infer_format("out.csv"))
+            self.assertEqual("csv", sql_export.infer_format(io.BytesIO()))
+
+        with self.subTest("""
+        GIVEN a path with a .json suffix
+        WHEN the infer_format() method is called
+        THEN a ValueError exception is raised instead of writing JSON lines to a .json file
+        """):
+            with self.assertRaises(ValueError):
+                sql_export.infer_format("out.json.gz")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,9 @@
+import itertools
 import unittest
 from unittest.mock import Mock, patch
 
-import sql_handler
-import sql_controller
+from sql_service import sql_handler
+from sql_service import sql_controller
 
 class TestSqlHandler(unittest.TestCase):
     def setUp(self):
@@ -17,6 +18,11 @@ class TestSqlHandler(unittest.TestCase):
         self.generic_error = "Generic error occured"
 
         self.fake_logger = Mock()     
+        self.fake_credentials = ('DRIVERNAME', 'SERVERNAME', 'db_name', 'username', 'password')
+
+        connect = patch.object(sql_controller.SqlController, 'connect', return_value = Mock())
+        connect.start()
+        self.addCleanup(connect.stop)
 
         self.handler = sql_handler.SqlService(
             'delete', 
@@ -27,11 +33,10 @@ class TestSqlHandler(unittest.TestCase):
                 'values': None,
                 'params': None
             },
-            self.fake_transaction_id,
-            self.fake_logger
+            *self.fake_credentials
         )
 
-    @patch('sql_handler.SqlService')
+    @patch('sql_service.sql_handler.SqlService')
     def test__init__1(self, mock_handler):
         mock_handler.upper.return_value = 'DELETE'
 
@@ -44,8 +49,7 @@ class TestSqlHandler(unittest.TestCase):
                 'params': self.fake_params_params,
                 'where': self.fake_where
             },
-            self.fake_transaction_id,
-            self.fake_logger
+            *self.fake_credentials
         )
 
         with self.subTest("""
@@ -56,7 +60,7 @@ class TestSqlHandler(unittest.TestCase):
             self.assertEqual(mock_handler.call_count, 1)
 
     @patch.object(sql_handler.SqlService, 'is_valid')
-    @patch('sql_handler.utils')
+    @patch('sql_service.sql_handler.utils')
     def test__init__2(self, mock_utils, mock_valid_request):
         mock_utils.comma_split.side_effect = [self.fake_columns, self.fake_values]
         mock_utils.get_params.return_value = self.fake_params_params
@@ -84,13 +88,12 @@ class TestSqlHandler(unittest.TestCase):
                         'values': None,
                         'params': None
                     },
-                    self.fake_transaction_id,
-                    self.fake_logger
+                    *self.fake_credentials
                 )
 
-    @patch('sql_controller.SqlController')
+    @patch('sql_service.sql_controller.SqlController')
     @patch.object(sql_handler.SqlService, 'is_valid')
-    @patch('sql_handler.utils')
+    @patch('sql_service.sql_handler.utils')
     def test__init__3(self, mock_utils, mock_valid_request, mock_controller):
         mock_utils.comma_split.side_effect = [self.fake_columns, self.fake_values]
         mock_utils.get_params.return_value = self.fake_params_params
@@ -109,8 +112,7 @@ class TestSqlHandler(unittest.TestCase):
                 'values': self.fake_values,
                 'params': self.fake_params
             },
-            self.fake_transaction_id,
-            self.fake_logger
+            *self.fake_credentials
         )
 
         with self.subTest("""
@@ -118,7 +120,7 @@ class TestSqlHandler(unittest.TestCase):
             WHEN the SqlController() class is instantiated
             THEN a SqlController() object will be instantiated
             """):
-            self.assertEqual(self.fake_transaction_id, actual_result.transaction_id)
+            self.assertEqual(mock_utils.generate_uuid.return_value, actual_result.transaction_id)
             self.assertEqual(self.fake_columns, actual_result.params['columns'])
             self.assertEqual(self.fake_values, actual_result.params['values'])
             self.assertEqual(self.fake_params_params, actual_result.params['params'])
@@ -126,9 +128,9 @@ class TestSqlHandler(unittest.TestCase):
             self.assertTrue(actual_result.valid_request)
             self.assertEqual(mock_controller.call_count, 1)
 
-    @patch('sql_controller.SqlController')
+    @patch('sql_service.sql_controller.SqlController')
     @patch.object(sql_handler.SqlService, 'is_valid')
-    @patch('sql_handler.utils')
+    @patch('sql_service.sql_handler.utils')
     def test__init__4(self, mock_utils, mock_valid_request, mock_controller):
         mock_utils.comma_split.side_effect = [self.fake_columns, self.fake_values]
         mock_utils.get_params.return_value = self.fake_params_params
@@ -154,8 +156,7 @@ class TestSqlHandler(unittest.TestCase):
                         'values': None,
                         'params': None
                     },
-                    self.fake_transaction_id,
-                self.fake_logger
+                    *self.fake_credentials
                 )
             self.assertTrue(self.generic_error in str(context.exception))
 
@@ -256,8 +257,7 @@ class TestSqlHandler(unittest.TestCase):
                 'values': None,
                 'params': None
             },
-            self.fake_transaction_id,
-            self.fake_logger
+            *self.fake_credentials
         )
 
         handler.sql_handler()
@@ -282,8 +282,7 @@ class TestSqlHandler(unittest.TestCase):
                 'values': self.fake_values,
                 'params': None
             },
-            self.fake_transaction_id,
-            self.fake_logger
+            *self.fake_credentials
         )
 
         handler.sql_handler()
@@ -308,8 +307,7 @@ class TestSqlHandler(unittest.TestCase):
                 'values': None,
                 'params': None
             },
-            self.fake_transaction_id,
-            self.fake_logger
+            *self.fake_credentials
         )
 
         handler.sql_handler()
@@ -334,8 +332,7 @@ class TestSqlHandler(unittest.TestCase):
                 'values': None,
                 'params': self.fake_params
             },
-            self.fake_transaction_id,
-            self.fake_logger
+            *self.fake_credentials
         )
 
         handler.sql_handler()
@@ -363,5 +360,160 @@ class TestSqlHandler(unittest.TestCase):
             self.assertEqual(mock_close.call_count, 1)
 
 
+    @patch.object(sql_controller.SqlController, 'close')
+    @patch.object(sql_controller.SqlController, 'iter_select')
+    def test_stream(self, mock_iter_select, mock_close):
+        mock_iter_select.side_effect = lambda **kwargs: (row for row in [{'attr1': 1}, {'attr1': 2}])
+
+        handler = sql_handler.SqlService('select', {'table': self.fake_table_name, 'where': None, 'columns': self.fake_columns, 'values': None, 'params': None}, *self.fake_credentials)
+        handler.stream().close()
+
+        with self.subTest("""
+        GIVEN a stream that was never iterated
+        WHEN the close() method is called
+        THEN the controller is closed
+        """):
+            self.assertEqual(mock_close.call_count, 1)
+
+        mock_close.reset_mock()
+
+        stream = handler.stream()
+        actual_result = list(stream)
+        stream.close()
+
+        with self.subTest("""
+        GIVEN a stream iterated to the end
+        WHEN the stream is exhausted and closed again
+        THEN every row is returned and the controller is closed once
+        """):
+            self.assertEqual([{'attr1': 1}, {'attr1': 2}], actual_result)
+            self.assertEqual(mock_close.call_count, 1)
+
+    @patch.object(sql_controller.SqlController, 'close')
+    @patch.object(sql_controller.SqlController, 'iter_select')
+    def test_stream_columns(self, mock_iter_select, mock_close):
+        handler = sql_handler.SqlService('select', {'table': self.fake_table_name, 'where': None, 'columns': self.fake_columns, 'values': None, 'params': None}, *self.fake_credentials, row_format = "tuples")
+
+        def fake_rows(**kwargs):
+            handler.controller.last_columns = ['attr1', 'attr2']
+            yield from [(1, 'a'), (2, 'b')]
+
+        mock_iter_select.side_effect = fake_rows
+
+        with handler.stream() as stream:
+            actual_columns = stream.columns
+            actual_result = list(stream)
+
+        with self.subTest("""
+        GIVEN a tuple stream whose columns are read before any row
+        WHEN the columns property is read and the stream is consumed
+        THEN the column header is returned and no row is lost to the read-ahead
+        """):
+            self.assertEqual(['attr1', 'attr2'], actual_columns)
+            self.assertEqual([(1, 'a'), (2, 'b')], actual_result)
+
+    @patch.object(sql_controller.SqlController, 'close')
+    def test_invalid_request(self, mock_close):
+        handler = sql_handler.SqlService('select', {'table': self.fake_table_name, 'where': None, 'columns': self.fake_columns, 'values': None, 'params': None}, *self.fake_credentials)
+
+        with self.subTest("""
+        GIVEN an export to a .json path or a negative prefetch depth
+        WHEN the export() or stream() method is called
+        THEN a ValueError exception is raised and the controller is closed each time
+        """):
+            with self.assertRaises(ValueError):
+                handler.export("out.json")
+            with self.assertRaises(ValueError):
+                handler.stream(prefetch = -1)
+            with self.assertRaises(ValueError):
+                self.handler.select_page('id')
+            self.assertEqual(mock_close.call_count, 3)
+
+    @patch.object(sql_handler.utils, 'create_logger')
+    @patch.object(sql_handler.sql_controller, 'SqlController')
+    def test_batch(self, mock_controller, mock_logger):
+        fake_requests = [
+            {'statement_type': 'insert', 'args': {'table': self.fake_table_name, 'where': None, 'columns': self.fake_columns, 'values': self.fake_values, 'params': None}},
+            {'statement_type': 'select', 'args': {'table': self.fake_table_name, 'where': self.fake_where, 'columns': self.fake_columns, 'values': None, 'params': None}},
+            {'statement_type': 'delete', 'args': {'table': self.fake_table_name, 'where': self.fake_where, 'columns': None, 'values': None, 'params': None}}
+        ]
+
+        mock_controller.return_value.insert.return_value = {'error': False, 'data': "1 row(s) affected"}
+        mock_controller.return_value.select.return_value = [{'attr1': 'value1', 'attr2': 'value2'}]
+        mock_controller.return_value.delete.side_effect = Exception(self.generic_error)
+
+        actual_result = sql_handler.SqlService.batch(fake_requests, 'driver', 'server', 'db', 'user', 'pwd')
+
+        with self.subTest("""
+        GIVEN a batch of INSERT, SELECT and DELETE requests
+        WHEN the batch() method is called
+        THEN every request runs in order on one controller and a result is returned per request
+        """):
+            self.assertEqual(mock_controller.call_count, 1)
+            self.assertEqual(['INSERT', 'SELECT', 'DELETE'], [result['statement_type'] for result in actual_result])
+            self.assertEqual("1 row(s) affected", actual_result[0]['data']['data'])
+            self.assertEqual([{'attr1': 'value1', 'attr2': 'value2'}], actual_result[1]['data'])
+            self.assertTrue(actual_result[2]['error'])
+            self.assertTrue(self.generic_error in actual_result[2]['msg'])
+            self.assertEqual(mock_controller.return_value.close.call_count, 1)
+
+        mock_controller.reset_mock()
+
+        with self.subTest("""
+        GIVEN one request in the batch is invalid
+        WHEN the batch() method is called
+        THEN a ValueError exception is raised before any connection is made
+        """):
+            with self.assertRaises(ValueError) as context:
+                sql_handler.SqlService.batch(fake_requests + [{'statement_type': 'update', 'args': fake_requests[0]['args']}], 'driver', 'server', 'db', 'user', 'pwd')
+            self.assertTrue("batch request 3" in str(context.exception))
+            self.assertFalse(mock_controller.called)
+
+        with self.subTest("""
+        GIVEN atomic is True and a request in the batch fails
+        WHEN the batch() method is called
+        THEN the exception is raised out of the controller transaction
+        """):
+            with self.assertRaises(Exception) as context:
+                sql_handler.SqlService.batch(fake_requests, 'driver', 'server', 'db', 'user', 'pwd', atomic = True)
+            self.assertTrue(self.generic_error in str(context.exception))
+            self.assertTrue(mock_controller.return_value.transaction.called)
+            self.assertEqual(mock_controller.return_value.close.call_count, 1)
+
+    @patch.object(sql_controller.SqlController, 'close')
+    @patch.object(sql_controller.SqlController, 'select', autospec = True)
+    def test_batch_timings(self, mock_select, mock_close):
+        mock_select.side_effect = lambda controller, **kwargs: controller.timed("execute", list)
+        fake_request = {'statement_type': 'select', 'args': {'table': self.fake_table_name, 'where': None, 'columns': self.fake_columns, 'values': None, 'params': None}}
+
+        with patch.object(sql_controller.sql_stats, 'time') as mock_time:
+            mock_time.perf_counter.side_effect = itertools.count()
+            actual_result = sql_handler.SqlService.batch([fake_request] * 3, *self.fake_credentials)
+
+        with self.subTest("""
+        GIVEN a batch of three SELECT requests on one controller
+        WHEN the batch() method is called
+        THEN each result carries only the timings of its own request and the first also carries the connect
+        """):
+            self.assertEqual([{'connect': 1, 'execute': 1}, {'execute': 1}, {'execute': 1}], [result['timings'] for result in actual_result])
+
+    @patch.object(sql_controller.SqlController, 'release')
+    @patch.object(sql_controller.sql_service, 'close_cursor', return_value = {'error': False, 'data': None})
+    @patch.object(sql_controller.SqlController, 'select', autospec = True)
+    def test_sql_handler_timings(self, mock_select, mock_close_cursor, mock_release):
+        mock_select.side_effect = lambda controller, **kwargs: controller.timed("execute", list, [{'attr1': 1}])
+
+        with patch.object(sql_controller.sql_stats, 'time') as mock_time:
+            mock_time.perf_counter.side_effect = itertools.count()
+            actual_result = sql_handler.SqlService('select', {'table': self.fake_table_name, 'where': None, 'columns': self.fake_columns, 'values': None, 'params': None}, *self.fake_credentials).sql_handler()
+
+        with self.subTest("""
+        GIVEN a SELECT request on a new connection
+        WHEN the sql_handler() method is called
+        THEN the rows are returned with the connect, execute and close timings attached
+        """):
+            self.assertEqual([{'attr1': 1}], actual_result)
+            self.assertEqual({'connect': 1, 'execute': 1, 'close': 2}, actual_result.timings)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import datetime
+import unittest
+
+from sql_service import sql_partition
+
+class TestSqlPartition(unittest.TestCase):
+
+    def test_range_boundaries(self):
+        with self.subTest("""
+        GIVEN integer, date and datetime bounds
+        WHEN the range_boundaries() method is called
+        THEN partitions - 1 evenly spaced boundaries of the same type are returned
+        """):
+            self.assertEqual([25, 50, 75], sql_partition.range_boundaries(0, 100, 4))
+            self.assertEqual([datetime.date(2024, 1, 16)], sql_partition.range_boundaries(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31), 2))
+            self.assertEqual([datetime.datetime(2024, 1, 1, 12)], sql_partition.range_boundaries(datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2), 2))
+
+        with self.subTest("""
+        GIVEN a range narrower than the partition count, or no rows
+        WHEN the range_boundaries() method is called
+        THEN duplicate boundaries are dropped and empty bounds give none
+        """):
+            self.assertEqual([1], sql_partition.range_boundaries(0, 1, 4))
+            self.assertEqual([], sql_partition.range_boundaries(None, None, 4))
+
+    def test_conditions(self):
+        with self.subTest("""
+        GIVEN two boundaries
+        WHEN the range_conditions() method is called
+        THEN three open ended ranges are returned and NULL keys fall in the first
+        """):
+            self.assertEqual([("(id < ? OR id IS NULL)", [10]), ("(id >= ? AND id < ?)", [10, 20]), ("(id >= ?)", [20])], sql_partition.range_conditions("id", [10, 20]))
+            self.assertEqual([("", [])], sql_partition.range_conditions("id", []))
+
+        with self.subTest("""
+        GIVEN three partitions
+        WHEN the modulo_conditions() method is called
+        THEN one condition per remainder is returned
+        """):
+            self.assertEqual([("(ABS(id % ?) = ? OR id IS NULL)", [3, 0]), ("(ABS(id % ?) = ?)", [3, 1]), ("(ABS(id % ?) = ?)", [3, 2])], sql_partition.modulo_conditions("id", 3))
+
+    def test_merge(self):
+        with self.subTest("""
+        GIVEN partitions sorted ascending and descending
+        WHEN the merge() method is called
+        THEN the rows are merged in order with NULL keys sorting as SQL Server sorts them
+        """):
+            self.assertEqual([(None,), (1,), (2,), (3,)], sql_partition.merge([[(None,), (3,)], [(1,), (2,)]], [0]))
+            self.assertEqual([(3,), (2,), (1,), (None,)], sql_partition.merge([[(3,), (None,)], [(2,), (1,)]], [0], descending = True))
+
+    def test_key_chunks(self):
+        with self.subTest("""
+        GIVEN 11 keys and a chunk size of 8
+        WHEN the key_chunks() method is called
+        THEN full chunks are kept and the last chunk is padded with its last key to a fixed size
+        """):
+            self.assertEqual([list(range(8)), [8, 9, 10, 10, 10, 10, 10, 10]], list(sql_partition.key_chunks(list(range(11)), 8)))
+
+        with self.subTest("""
+        GIVEN chunk sizes above 8
+        WHEN the padded_size() method is called
+        THEN counts are rounded up to the next power of two, capped at the chunk size
+        """):
+            self.assertEqual([8, 16, 512, 1000], [sql_partition.padded_size(count, 1000) for count in (1, 9, 300, 999)])
+
+    def test_order_by_keys(self):
+        with self.subTest("""
+        GIVEN rows in any order and the requested keys
+        WHEN the order_by_keys() method is called
+        THEN rows follow the key order and rows for unrequested keys are kept at the end
+        """):
+            rows = [(1, 'a'), (3, 'c'), (2, 'b'), (9, 'z'), (3, 'd')]
+            self.assertEqual([(3, 'c'), (3, 'd'), (1, 'a'), (2, 'b'), (9, 'z')], sql_partition.order_by_keys(rows, 0, [3, 1, 2, 4]))
+
+if __name__ == "__main__":
+    unittest.main()
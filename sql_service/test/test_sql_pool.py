@@ -0,0 +1,197 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from sql_service import sql_pool
+from sql_service import sql_service
+
+class TestSqlPool(unittest.TestCase):
+
+    def setUp(self):
+        self.fake_logger = Mock()
+        self.fake_valid_conn_string = 'DRIVER={ODBC Driver 18 for SQL Server};SERVER=localhost;DATABASE=testdb;UID=user;PWD=123'
+        self.generic_error = "Generic error occured"
+
+        self.pool = sql_pool.ConnectionPool('ODBC Driver 18 for SQL Server', 'localhost', 'testdb', 'user', '123', self.fake_logger, max_size = 2, borrow_timeout = 0.05)
+
+    def tearDown(self):
+        sql_pool.close_all_pools()
+
+    @patch.object(sql_service, 'connect')
+    def test_borrow(self, mock_conn):
+        mock_conn.side_effect = lambda conn_string, logger: {'error': False, 'data': Mock()}
+
+        first = self.pool.borrow()
+        second = self.pool.borrow()
+
+        with self.subTest("""
+        GIVEN the pool is empty
+        WHEN the borrow() method is called up to max_size times
+        THEN a new connection is opened for each call
+        """):
+            self.assertEqual(mock_conn.call_count, 2)
+            self.assertIsNot(first.conn, second.conn)
+            self.assertEqual(self.pool.stats()['in_use'], 2)
+
+        with self.subTest("""
+        GIVEN every connection is borrowed
+        WHEN the borrow() method is called
+        THEN a PoolExhaustedError exception is raised once borrow_timeout elapses
+        """):
+            with self.assertRaises(sql_pool.PoolExhaustedError):
+                self.pool.borrow()
+
+        self.pool.release(first)
+        actual_result = self.pool.borrow()
+
+        with self.subTest("""
+        GIVEN a connection has been released
+        WHEN the borrow() method is called
+        THEN the released connection is reused without reconnecting
+        """):
+            self.assertIs(first, actual_result)
+            self.assertEqual(mock_conn.call_count, 2)
+            self.assertTrue(first.conn.rollback.called)
+
+        mock_conn.side_effect = None
+        mock_conn.return_value = {'error': True, 'exception': Exception(self.generic_error)}
+        self.pool.release(actual_result, discard = True)
+
+        with self.subTest("""
+        GIVEN a connection was discarded and connecting fails
+        WHEN the borrow() method is called
+        THEN a ConnectionError exception is raised and the slot is freed
+        """):
+            with self.assertRaises(ConnectionError) as context:
+                self.pool.borrow()
+            self.assertTrue(self.generic_error in str(context.exception))
+            self.assertEqual(self.pool.stats()['size'], 1)
+
+    @patch.object(sql_service, 'connect')
+    def test_borrow_validation(self, mock_conn):
+        stale_conn = Mock()
+        stale_conn.cursor.side_effect = Exception(self.generic_error)
+        fresh_conn = Mock()
+        mock_conn.side_effect = [{'error': False, 'data': stale_conn}, {'error': False, 'data': fresh_conn}]
+
+        self.pool.validation_interval = 0
+        self.pool.release(self.pool.borrow())
+
+        actual_result = self.pool.borrow()
+
+        with self.subTest("""
+        GIVEN an idle connection fails validation
+        WHEN the borrow() method is called
+        THEN the idle connection is closed and replaced
+        """):
+            self.assertIs(fresh_conn, actual_result.conn)
+            self.assertTrue(stale_conn.close.called)
+            self.assertEqual(self.pool.stats()['size'], 1)
+
+    @patch.object(sql_service, 'connect')
+    def test_expiry(self, mock_conn):
+        mock_conn.side_effect = lambda conn_string, logger: {'error': False, 'data': Mock()}
+
+        pooled = self.pool.borrow()
+        pooled.created_at -= sql_pool.DEFAULT_MAX_LIFETIME + 1
+
+        actual_result = self.pool.release(pooled)
+
+        with self.subTest("""
+        GIVEN a connection older than max_lifetime
+        WHEN the release() method is called
+        THEN the connection is closed rather than returned to the pool
+        """):
+            self.assertFalse(actual_result)
+            self.assertTrue(pooled.conn.close.called)
+            self.assertEqual(self.pool.stats()['size'], 0)
+
+        pooled = self.pool.borrow()
+        self.pool.release(pooled)
+        pooled.last_used -= sql_pool.DEFAULT_IDLE_TIMEOUT + 1
+
+        actual_result = self.pool.borrow()
+
+        with self.subTest("""
+        GIVEN an idle connection older than idle_timeout
+        WHEN the borrow() method is called
+        THEN the idle connection is pruned and a new one opened
+        """):
+            self.assertIsNot(pooled, actual_result)
+            self.assertTrue(pooled.conn.close.called)
+
+    def test_checkout_stale(self):
+        stale = sql_pool.PooledConnection(Mock(), self.pool)
+        pruned = [[stale]]
+        self.pool.size = self.pool.max_size
+
+        with patch.object(self.pool, '_prune_idle', side_effect = lambda now: pruned.pop() if pruned else []):
+            with self.subTest("""
+            GIVEN a connection pruned on the first pass of a borrow that then waits and times out
+            WHEN the borrow() method is called
+            THEN a PoolExhaustedError exception is raised and the pruned connection is still closed
+            """):
+                with self.assertRaises(sql_pool.PoolExhaustedError):
+                    self.pool.borrow(self.fake_logger)
+                self.assertTrue(stale.conn.close.called)
+
+    def test_statement_cache(self):
+        fake_conn = Mock()
+        fake_conn.cursor.side_effect = lambda: Mock()
+        cache = sql_pool.StatementCache(fake_conn, max_size = 2)
+
+        first = cache.cursor_for("SELECT a FROM t WHERE id = ?", self.fake_logger)
+        second = cache.cursor_for("SELECT a FROM t WHERE id = ?", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN a statement shape has been seen before
+        WHEN the cursor_for() method is called
+        THEN the cursor holding its prepared statement is reused
+        """):
+            self.assertIs(first, second)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache.cursor_for("SELECT b FROM t WHERE id = ?", self.fake_logger)
+        cache.cursor_for("SELECT c FROM t WHERE id = ?", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN more statement shapes than max_size
+        WHEN the cursor_for() method is called
+        THEN the least recently used cursor is closed and evicted
+        """):
+            self.assertTrue(first.close.called)
+            self.assertNotIn("SELECT a FROM t WHERE id = ?", cache.cursors)
+            self.assertEqual(len(cache.cursors), 2)
+
+        pooled = sql_pool.PooledConnection(fake_conn, self.pool)
+        pooled.statements = cache
+        cached = list(cache.cursors.values())
+        self.pool.size = 1
+        self.pool.release(pooled, self.fake_logger, discard = True)
+
+        with self.subTest("""
+        GIVEN a connection with cached statement cursors
+        WHEN the connection is discarded
+        THEN its cached cursors are closed before the connection
+        """):
+            self.assertTrue(all(cursor.close.called for cursor in cached))
+            self.assertEqual(len(cache.cursors), 0)
+            self.assertTrue(fake_conn.close.called)
+
+    def test_get_pool(self):
+        first = sql_pool.get_pool('driver', 'server', 'db', 'user', 'pwd', self.fake_logger)
+        second = sql_pool.get_pool('driver', 'server', 'db', 'user', 'other', self.fake_logger)
+        third = sql_pool.get_pool('driver', 'server', 'other_db', 'user', 'pwd', self.fake_logger)
+
+        with self.subTest("""
+        GIVEN pools are requested for several connection targets and passwords
+        WHEN the get_pool() method is called
+        THEN one pool is kept per driver, server, database and username, rebuilt when the password changes
+        """):
+            self.assertIsNot(first, second)
+            self.assertIsNot(first, third)
+            self.assertTrue(first.closed)
+            self.assertEqual('other', second.password)
+            self.assertIs(second, sql_pool.get_pool('driver', 'server', 'db', 'user', 'other', self.fake_logger))
+
+if __name__ == "__main__":
+    unittest.main()
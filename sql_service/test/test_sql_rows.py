@@ -0,0 +1,68 @@
+import unittest
+
+from sql_service import sql_rows
+
+class TestSqlRows(unittest.TestCase):
+
+    def setUp(self):
+        self.fake_columns = ['attr1', 'attr2', 'from']
+        self.fake_results = [('value1', 'value2', 1), ('value3', 'value4', 2)]
+
+    def test_format_rows(self):
+        with self.subTest("""
+        GIVEN the dict row format
+        WHEN the format_rows() method is called
+        THEN one dictionary is returned per row
+        """):
+            actual_result = sql_rows.format_rows(self.fake_results, self.fake_columns)
+            self.assertEqual({'attr1': 'value1', 'attr2': 'value2', 'from': 1}, actual_result[0])
+
+        with self.subTest("""
+        GIVEN the tuples row format
+        WHEN the format_rows() method is called
+        THEN plain tuples are returned
+        """):
+            actual_result = sql_rows.format_rows(self.fake_results, self.fake_columns, "tuples")
+            self.assertEqual(self.fake_results, actual_result)
+
+        with self.subTest("""
+        GIVEN the namedtuple row format
+        WHEN the format_rows() method is called
+        THEN rows share one generated namedtuple class, renaming invalid field names
+        """):
+            actual_result = sql_rows.format_rows(self.fake_results, self.fake_columns, "namedtuple")
+            self.assertEqual('value1', actual_result[0].attr1)
+            self.assertEqual(1, actual_result[0][2])
+            self.assertIs(type(actual_result[0]), type(actual_result[1]))
+
+        with self.subTest("""
+        GIVEN the slots row format
+        WHEN the format_rows() method is called
+        THEN rows are __slots__ objects addressable by attribute, column name and position
+        """):
+            actual_result = sql_rows.format_rows(self.fake_results, self.fake_columns, "slots")
+            self.assertEqual('value2', actual_result[0].attr2)
+            self.assertEqual(1, actual_result[0]['from'])
+            self.assertEqual('value1', actual_result[0][0])
+            self.assertFalse(hasattr(actual_result[0], '__dict__'))
+            self.assertEqual({'attr1': 'value1', 'attr2': 'value2', 'from': 1}, actual_result[0].as_dict())
+
+        with self.subTest("""
+        GIVEN the lazy row format
+        WHEN the format_rows() method is called
+        THEN rows are read-only mappings over the fetched tuple
+        """):
+            actual_result = sql_rows.format_rows(self.fake_results, self.fake_columns, "lazy")
+            self.assertEqual('value4', actual_result[1]['attr2'])
+            self.assertEqual({'attr1': 'value3', 'attr2': 'value4', 'from': 2}, dict(actual_result[1]))
+
+        with self.subTest("""
+        GIVEN an unknown row format
+        WHEN the format_rows() method is called
+        THEN a ValueError exception is raised
+        """):
+            with self.assertRaises(ValueError):
+                sql_rows.format_rows(self.fake_results, self.fake_columns, "xml")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import Mock, patch
 
-import sql_service
+from sql_service import sql_service
 
 class TestSqlService(unittest.TestCase):
 
@@ -44,7 +44,7 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['msg'], actual_result['msg'])
             self.assertEqual(expected_result['data'], actual_result['data'])  
 
-    @patch('sql_service.pyodbc')
+    @patch('sql_service.sql_service.pyodbc')
     def test_connect(self, mock_conn):
         expected_result = {
             'msg': 'Successfully connected to database using pyodbc',
@@ -83,7 +83,7 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data'])        
 
-    @patch('sql_service.pyodbc')
+    @patch('sql_service.sql_service.pyodbc')
     def test_create_cursor(self, mock_cursor):
         expected_result = {
             'msg': 'Successfully created pyodbc cursor object',
@@ -122,7 +122,7 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data']) 
 
-    @patch('sql_service.pyodbc')
+    @patch('sql_service.sql_service.pyodbc')
     def test_close_cursor(self, mock_cursor):
         expected_result = {
             'msg': 'Successfully closed cursor object',
@@ -161,20 +161,60 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data'])    
 
-    @patch('sql_service.open')
+    def test_close_connection(self):
+        fake_conn = Mock()
+
+        expected_result = {
+            'msg': 'Successfully closed connection object',
+            'data': None
+        }
+
+        fake_conn.close.return_value = expected_result['data']
+
+        actual_result = sql_service.close_connection(fake_conn, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN a valid connection object is passed
+        WHEN the close_connection() method is called
+        THEN the passed connection will be closed
+        """):
+            self.assertFalse(actual_result['error'])        
+            self.assertEqual(actual_result['msg'], expected_result['msg'])
+            self.assertTrue(fake_conn.close.called)
+    
+        expected_result = {
+            'msg': 'An error occured when trying to close connection object',
+            'exception': Exception(self.generic_error)
+        }
+
+        fake_conn.close.side_effect = expected_result['exception']
+
+        actual_result = sql_service.close_connection(fake_conn, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an exception is raised
+        WHEN the close_connection() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])        
+            self.assertTrue(expected_result['msg'] in actual_result['msg'])
+            self.assertEqual(expected_result['exception'], actual_result['exception'])        
+            self.assertIsNone(actual_result['data'])    
+
+    @patch('sql_service.sql_service.sql_templates')
     def test_form_select_query(self, mock_query):
         expected_result = {
-            'msg': f'Successfully formed SELECT query {self.fake_select_query}',
+            'msg': 'Successfully formed SELECT query',
             'data': self.fake_select_query
         }
 
-        mock_query.return_value.read.return_value = expected_result['data']
+        mock_query.registry.get.return_value.render.return_value = expected_result['data']
 
         actual_result = sql_service.form_select_query(self.fake_table_name, self.fake_logger)
 
         with self.subTest("""
         GIVEN a value for table parameter is passed
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN the values will be used to form a select statement and returned
         """):
             self.assertFalse(actual_result['error'])        
@@ -182,17 +222,17 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(actual_result['data'], expected_result['data']) 
 
         expected_result = {
-            'msg': f'Successfully formed SELECT query {self.fake_select_query}',
+            'msg': 'Successfully formed SELECT query',
             'data': self.fake_select_query
         }
 
-        mock_query.return_value.read.return_value = expected_result['data']
+        mock_query.registry.get.return_value.render.return_value = expected_result['data']
 
         actual_result = sql_service.form_select_query(self.fake_table_name, self.fake_logger, attributes =  'attr1, attr2')
 
         with self.subTest("""
         GIVEN values for table and attributes parameters are passed
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN the values will be used to form a select statement and returned
         """):
             self.assertFalse(actual_result['error'])        
@@ -200,17 +240,17 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(actual_result['data'], expected_result['data'])
 
         expected_result = {
-            'msg': f'Successfully formed SELECT query {self.fake_select_query}',
+            'msg': 'Successfully formed SELECT query',
             'data': self.fake_select_query
         }
 
-        mock_query.return_value.read.return_value = expected_result['data']
+        mock_query.registry.get.return_value.render.return_value = expected_result['data']
 
         actual_result = sql_service.form_select_query(self.fake_table_name, self.fake_logger, attributes =  'attr1, attr2', where = "WHERE id = '1'")
 
         with self.subTest("""
         GIVEN values for table, attributes and where parameters are passed
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN the values will be used to form a select statement and returned
         """):
             self.assertFalse(actual_result['error'])        
@@ -222,13 +262,13 @@ class TestSqlService(unittest.TestCase):
             'exception': Exception(self.generic_error)
         }
 
-        mock_query.side_effect = expected_result['exception']
+        mock_query.registry.get.side_effect = expected_result['exception']
 
         actual_result = sql_service.form_select_query(self.fake_table_name, self.fake_logger)
 
         with self.subTest("""
         GIVEN an exception is raised
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN an error dictionary will be returned
         """):
             self.assertTrue(actual_result['error'])        
@@ -236,10 +276,155 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data'])  
 
-    @patch('sql_service.pyodbc')
+    @patch('sql_service.sql_service.sql_templates')
+    def test_form_select_page_query(self, mock_query):
+        fake_page_query = f"SELECT attr1,attr2 FROM {self.fake_table_name} WHERE (id > ?) ORDER BY id ASC OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+
+        mock_query.registry.get.return_value.render.return_value = fake_page_query
+
+        actual_result = sql_service.form_select_page_query(self.fake_table_name, 'attr1,attr2', "WHERE (id > ?)", "id ASC", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN values for table, attributes, where and order by are passed
+        WHEN the registry.get().render() method is called
+        THEN the values will be used to form a paginated select statement and returned
+        """):
+            self.assertFalse(actual_result['error'])
+            self.assertEqual('Successfully formed paginated SELECT query', actual_result['msg'])
+            self.assertEqual(fake_page_query, actual_result['data'])
+            mock_query.registry.get.return_value.render.assert_called_once_with('attr1,attr2', self.fake_table_name, "WHERE (id > ?)", "id ASC")
+
+        mock_query.registry.get.side_effect = Exception(self.generic_error)
+
+        actual_result = sql_service.form_select_page_query(self.fake_table_name, 'attr1,attr2', "", "id ASC", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an exception is raised
+        WHEN the registry.get().render() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])
+            self.assertTrue('An error occured when trying to form paginated SELECT query' in actual_result['msg'])
+            self.assertIsNone(actual_result['data'])
+
+    @patch('sql_service.sql_service.sql_templates')
+    def test_form_select_ordered_query(self, mock_query):
+        fake_ordered_query = f"SELECT attr1,attr2 FROM {self.fake_table_name} WHERE (id >= ?) ORDER BY id ASC"
+
+        mock_query.registry.get.return_value.render.return_value = fake_ordered_query
+
+        actual_result = sql_service.form_select_ordered_query(self.fake_table_name, 'attr1,attr2', "WHERE (id >= ?)", "id ASC", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN values for table, attributes, where and order by are passed
+        WHEN the registry.get().render() method is called
+        THEN the values will be used to form an ordered select statement and returned
+        """):
+            self.assertFalse(actual_result['error'])
+            self.assertEqual('Successfully formed ordered SELECT query', actual_result['msg'])
+            self.assertEqual(fake_ordered_query, actual_result['data'])
+            mock_query.registry.get.return_value.render.assert_called_once_with('attr1,attr2', self.fake_table_name, "WHERE (id >= ?)", "id ASC")
+
+        mock_query.registry.get.side_effect = Exception(self.generic_error)
+
+        actual_result = sql_service.form_select_ordered_query(self.fake_table_name, 'attr1,attr2', "", "id ASC", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an exception is raised
+        WHEN the registry.get().render() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])
+            self.assertTrue('An error occured when trying to form ordered SELECT query' in actual_result['msg'])
+            self.assertIsNone(actual_result['data'])
+
+    def test_form_delete_top_statement(self):
+        actual_result = sql_service.form_delete_top_statement(self.fake_table_name, "id < ?", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN values for table and where are passed
+        WHEN the form_delete_top_statement() method is called
+        THEN a DELETE statement limited by a TOP parameter is returned
+        """):
+            self.assertFalse(actual_result['error'])
+            self.assertEqual(f"DELETE TOP (?) FROM {self.fake_table_name} WHERE id < ?", actual_result['data'])
+
+    def test_form_staging_table_statement(self):
+        actual_result = sql_service.form_staging_table_statement('#staging_1', self.fake_table_name, 'id,attr1', self.fake_logger)
+
+        with self.subTest("""
+        GIVEN a staging table, a target table and columns
+        WHEN the form_staging_table_statement() method is called
+        THEN an empty copy of the columns without their identity property is selected into the staging table
+        """):
+            self.assertFalse(actual_result['error'])
+            self.assertEqual(f"SELECT id,attr1 INTO #staging_1 FROM {self.fake_table_name} WHERE 1 = 0 UNION ALL SELECT id,attr1 FROM {self.fake_table_name} WHERE 1 = 0", actual_result['data'])
+
+    @patch('sql_service.sql_service.sql_templates')
+    def test_form_merge_statement(self, mock_query):
+        fake_merge_statement = f"MERGE {self.fake_table_name} WITH (HOLDLOCK) AS target USING #staging_1 AS source ON target.id = source.id WHEN NOT MATCHED BY TARGET THEN INSERT (id) VALUES (source.id) OUTPUT $action;"
+
+        mock_query.registry.get.return_value.render.return_value = fake_merge_statement
+
+        actual_result = sql_service.form_merge_statement(self.fake_table_name, '#staging_1', "target.id = source.id", "WHEN NOT MATCHED BY TARGET THEN INSERT (id) VALUES (source.id)", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN values for table, staging table, join and clauses are passed
+        WHEN the registry.get().render() method is called
+        THEN the values will be used to form a MERGE statement and returned
+        """):
+            self.assertFalse(actual_result['error'])
+            self.assertEqual('Successfully formed MERGE statement', actual_result['msg'])
+            self.assertEqual(fake_merge_statement, actual_result['data'])
+
+        mock_query.registry.get.side_effect = Exception(self.generic_error)
+
+        actual_result = sql_service.form_merge_statement(self.fake_table_name, '#staging_1', "", "", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an exception is raised
+        WHEN the registry.get().render() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])
+            self.assertTrue('An error occured when trying to form MERGE statement' in actual_result['msg'])
+            self.assertIsNone(actual_result['data'])
+
+    @patch('sql_service.sql_service.sql_templates')
+    def test_form_bulk_insert_statement(self, mock_query):
+        fake_bulk_statement = f"BULK INSERT {self.fake_table_name} FROM 'C:\\staging\\o''brien.csv' WITH (BATCHSIZE = 10)"
+
+        mock_query.registry.get.return_value.render.return_value = fake_bulk_statement
+
+        actual_result = sql_service.form_bulk_insert_statement(self.fake_table_name, "C:\\staging\\o'brien.csv", "BATCHSIZE = 10", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN values for table, path and options are passed
+        WHEN the registry.get().render() method is called
+        THEN the path will be quoted and used to form a BULK INSERT statement
+        """):
+            self.assertFalse(actual_result['error'])
+            self.assertEqual('Successfully formed BULK INSERT statement', actual_result['msg'])
+            self.assertEqual(fake_bulk_statement, actual_result['data'])
+            mock_query.registry.get.return_value.render.assert_called_once_with(self.fake_table_name, "C:\\staging\\o''brien.csv", "BATCHSIZE = 10")
+
+        mock_query.registry.get.side_effect = Exception(self.generic_error)
+
+        actual_result = sql_service.form_bulk_insert_statement(self.fake_table_name, "data.csv", "", self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an exception is raised
+        WHEN the registry.get().render() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])
+            self.assertTrue('An error occured when trying to form BULK INSERT statement' in actual_result['msg'])
+            self.assertIsNone(actual_result['data'])
+
+    @patch('sql_service.sql_service.pyodbc')
     def test_execute_formed_query(self, mock_cursor):
         expected_result = {
-            'msg': f'Successfully executed formed query {self.fake_select_query}',
+            'msg': 'Successfully executed formed query',
             'data': self.fake_cursor
         }
 
@@ -309,7 +494,7 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(type(expected_result['exception']), type(actual_result['exception']))        
             self.assertIsNone(actual_result['data']) 
 
-    @patch('sql_service.pyodbc')
+    @patch('sql_service.sql_service.pyodbc')
     def test_get_results(self, mock_cursor):
         expected_result = {
             'msg': 'Successfully got results from cursor',
@@ -348,7 +533,48 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data']) 
 
-    @patch('sql_service.zip')
+    def test_get_results_batch(self):
+        fake_cursor = Mock()
+
+        expected_result = {
+            'msg': 'Successfully got batch of results from cursor',
+            'data': self.fake_results
+        }
+
+        fake_cursor.fetchmany.return_value = expected_result['data']
+
+        actual_result = sql_service.get_results_batch(fake_cursor, 500, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN values for cursor and batch_size parameters are passed
+        WHEN the fetchmany() method is called
+        THEN at most batch_size results will be fetched from the passed cursor
+        """):
+            self.assertFalse(actual_result['error'])        
+            self.assertEqual(actual_result['msg'], expected_result['msg'])
+            self.assertEqual(actual_result['data'], expected_result['data']) 
+            fake_cursor.fetchmany.assert_called_once_with(500)
+
+        expected_result = {
+            'msg': f'An error occured when trying to get batch of results from cursor',
+            'exception': Exception(self.generic_error)
+        }
+
+        fake_cursor.fetchmany.side_effect = expected_result['exception']
+        
+        actual_result = sql_service.get_results_batch(fake_cursor, 500, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an exception is raised
+        WHEN the fetchmany() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])        
+            self.assertTrue(expected_result['msg'] in actual_result['msg'])
+            self.assertEqual(expected_result['exception'], actual_result['exception'])        
+            self.assertIsNone(actual_result['data']) 
+
+    @patch('sql_service.sql_service.zip')
     def test_zip_columns_results(self, mock_zip):
         expected_result = {
             'msg': 'Successfully zipped columns with results',
@@ -387,20 +613,20 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data']) 
 
-    @patch('sql_service.open')
+    @patch('sql_service.sql_service.sql_templates')
     def test_form_insert_statement(self, mock_statement):
         expected_result = {
-            'msg': f'Successfully formed INSERT statement {self.fake_insert_statement}',
+            'msg': 'Successfully formed INSERT statement',
             'data': self.fake_insert_statement
         }
 
-        mock_statement.return_value.read.return_value = expected_result['data']
+        mock_statement.registry.get.return_value.render.return_value = expected_result['data']
 
         actual_result = sql_service.form_insert_statement(self.fake_table_name, self.fake_columns, self.fake_values, self.fake_logger)
 
         with self.subTest("""
         GIVEN values for table, columns and values parameters are passed
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN the values will be used to form an insert statement and returned
         """):
             self.assertFalse(actual_result['error'])        
@@ -412,13 +638,13 @@ class TestSqlService(unittest.TestCase):
             'exception': Exception(self.generic_error)
         }
 
-        mock_statement.side_effect = expected_result['exception']
+        mock_statement.registry.get.side_effect = expected_result['exception']
 
         actual_result = sql_service.form_insert_statement(self.fake_table_name, self.fake_columns, self.fake_values, self.fake_logger)
 
         with self.subTest("""
         GIVEN an exception is raised
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN an error dictionary will be returned
         """):
             self.assertTrue(actual_result['error'])        
@@ -426,10 +652,10 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data'])  
 
-    @patch('sql_service.pyodbc')
+    @patch('sql_service.sql_service.pyodbc')
     def test_execute_formed_statement(self, mock_cursor):
         expected_result = {
-            'msg': f'Successfully executed formed statement {self.fake_insert_statement}',
+            'msg': 'Successfully executed formed statement',
             'data': self.fake_cursor
         }
 
@@ -465,7 +691,48 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data']) 
 
-    @patch('sql_service.pyodbc')
+    def test_execute_many(self):
+        fake_cursor = Mock()
+        fake_rows = [('value1', 'value2'), ('value3', 'value4')]
+
+        expected_result = {
+            'msg': 'Successfully executed formed statement for many rows',
+            'data': fake_cursor
+        }
+
+        actual_result = sql_service.execute_many(fake_cursor, self.fake_insert_statement, fake_rows, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN values for cursor, statement and rows parameters are passed
+        WHEN the executemany() method is called
+        THEN the rows are sent as a parameter array with fast_executemany enabled
+        """):
+            self.assertFalse(actual_result['error'])        
+            self.assertEqual(actual_result['msg'], expected_result['msg'])
+            self.assertEqual(actual_result['data'], expected_result['data'])
+            self.assertTrue(fake_cursor.fast_executemany)
+            fake_cursor.executemany.assert_called_once_with(self.fake_insert_statement, fake_rows)
+
+        expected_result = {
+            'msg': 'An error occured when trying to execute formed statement for many rows',
+            'exception': Exception(self.generic_error)
+        }
+
+        fake_cursor.executemany.side_effect = expected_result['exception']
+        
+        actual_result = sql_service.execute_many(fake_cursor, self.fake_insert_statement, fake_rows, self.fake_logger)
+
+        with self.subTest("""
+        GIVEN an exception is raised
+        WHEN the executemany() method is called
+        THEN an error dictionary will be returned
+        """):
+            self.assertTrue(actual_result['error'])        
+            self.assertTrue(expected_result['msg'] in actual_result['msg'])
+            self.assertEqual(expected_result['exception'], actual_result['exception'])        
+            self.assertIsNone(actual_result['data'])
+
+    @patch('sql_service.sql_service.pyodbc')
     def test_commit(self, mock_cursor):
         expected_result = {
             'msg': 'Successfully committed changes',
@@ -505,20 +772,20 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data'])
 
-    @patch('sql_service.open')
+    @patch('sql_service.sql_service.sql_templates')
     def test_form_update_statement(self, mock_statement):
         expected_result = {
-            'msg': f'Successfully formed UPDATE statement {self.fake_update_statement}',
+            'msg': 'Successfully formed UPDATE statement',
             'data': self.fake_update_statement
         }
 
-        mock_statement.return_value.read.return_value = expected_result['data']
+        mock_statement.registry.get.return_value.render.return_value = expected_result['data']
 
         actual_result = sql_service.form_update_statement(self.fake_table_name, self.fake_params, self.fake_where, self.fake_logger)
 
         with self.subTest("""
         GIVEN values for table, params and where parameters are passed
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN the values will be used to form an update statement and returned
         """):
             pass
@@ -531,13 +798,13 @@ class TestSqlService(unittest.TestCase):
             'exception': Exception(self.generic_error)
         }
 
-        mock_statement.side_effect = expected_result['exception']
+        mock_statement.registry.get.side_effect = expected_result['exception']
 
         actual_result = sql_service.form_update_statement(self.fake_table_name, self.fake_params, self.fake_where, self.fake_logger)
 
         with self.subTest("""
         GIVEN an exception is raised
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN an error dictionary will be returned
         """):
             self.assertTrue(actual_result['error'])        
@@ -545,20 +812,20 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data']) 
 
-    @patch('sql_service.open')
+    @patch('sql_service.sql_service.sql_templates')
     def test_form_delete_statement(self, mock_statement):
         expected_result = {
-            'msg': f'Successfully formed DELETE statement {self.fake_delete_statement}',
+            'msg': 'Successfully formed DELETE statement',
             'data': self.fake_delete_statement
         }
 
-        mock_statement.return_value.read.return_value = expected_result['data']
+        mock_statement.registry.get.return_value.render.return_value = expected_result['data']
 
         actual_result = sql_service.form_delete_statement(self.fake_table_name, self.fake_where, self.fake_logger)
 
         with self.subTest("""
         GIVEN values for table, params and where parameters are passed
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN the values will be used to form an delete statement and returned
         """):
             pass
@@ -571,13 +838,13 @@ class TestSqlService(unittest.TestCase):
             'exception': Exception(self.generic_error)
         }
 
-        mock_statement.side_effect = expected_result['exception']
+        mock_statement.registry.get.side_effect = expected_result['exception']
 
         actual_result = sql_service.form_delete_statement(self.fake_table_name, self.fake_where, self.fake_logger)
 
         with self.subTest("""
         GIVEN an exception is raised
-        WHEN the open().read().format() method is called
+        WHEN the registry.get().render() method is called
         THEN an error dictionary will be returned
         """):
             self.assertTrue(actual_result['error'])        
@@ -585,7 +852,7 @@ class TestSqlService(unittest.TestCase):
             self.assertEqual(expected_result['exception'], actual_result['exception'])        
             self.assertIsNone(actual_result['data']) 
 
-    @patch('sql_service.pyodbc')
+    @patch('sql_service.sql_service.pyodbc')
     def test_rollback(self, mock_cursor):
         expected_result = {
             'msg': 'Successfully rolled back cursor changes',
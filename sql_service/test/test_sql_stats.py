@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import Mock
+
+from sql_service import sql_stats
+
+class TestSqlStats(unittest.TestCase):
+
+    def setUp(self):
+        sql_stats.reset()
+
+    def test_stage_stats(self):
+        stats = sql_stats.StageStats()
+
+        for seconds in (0.002, 0.004, 3):
+            stats.record(seconds)
+
+        actual_result = stats.as_dict()
+
+        with self.subTest("""
+        GIVEN three recorded durations
+        WHEN the as_dict() method is called
+        THEN count, sum, min, max, mean and histogram buckets are returned
+        """):
+            self.assertEqual(3, actual_result['count'])
+            self.assertAlmostEqual(3.006, actual_result['sum'])
+            self.assertEqual(0.002, actual_result['min'])
+            self.assertEqual(3, actual_result['max'])
+            self.assertAlmostEqual(1.002, actual_result['mean'])
+            self.assertEqual(1, actual_result['buckets']['<=0.0025'])
+            self.assertEqual(1, actual_result['buckets']['<=0.005'])
+            self.assertEqual(1, actual_result['buckets']['<=5'])
+            self.assertEqual(0, actual_result['buckets']['+Inf'])
+
+    def test_timed(self):
+        timings = {}
+        func = Mock(return_value = 'result')
+
+        actual_result = sql_stats.timed(timings, 'execute', func, 'arg', kwarg = 'kwarg')
+        sql_stats.timed(timings, 'execute', func)
+
+        with self.subTest("""
+        GIVEN a function timed twice under one stage
+        WHEN the timed() method is called
+        THEN the result is returned, the durations are summed in timings and recorded in the registry
+        """):
+            self.assertEqual('result', actual_result)
+            func.assert_any_call('arg', kwarg = 'kwarg')
+            self.assertEqual(['execute'], list(timings))
+            self.assertEqual(2, sql_stats.stats('execute')['count'])
+            self.assertAlmostEqual(timings['execute'], sql_stats.stats()['execute']['sum'])
+
+        func.side_effect = ValueError("Generic error occured")
+
+        with self.subTest("""
+        GIVEN a timed function raises an exception
+        WHEN the timed() method is called
+        THEN the exception is raised and the duration is still recorded
+        """):
+            with self.assertRaises(ValueError):
+                sql_stats.timed(timings, 'execute', func)
+            self.assertEqual(3, sql_stats.stats('execute')['count'])
+
+if __name__ == "__main__":
+    unittest.main()
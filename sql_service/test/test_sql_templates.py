@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sql_service import sql_templates
+
+class TestSqlTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = sql_templates.TemplateRegistry()
+
+    def test_compiled_template(self):
+        template = sql_templates.CompiledTemplate("SELECT {} FROM {} {}")
+
+        with self.subTest("""
+        GIVEN a template with positional fields
+        WHEN the render() method is called
+        THEN the values are spliced in the same way as str.format()
+        """):
+            self.assertEqual(template.fields, 3)
+            self.assertEqual(template.render('a,b', 'tbl', "WHERE id = '1'"), "SELECT {} FROM {} {}".format('a,b', 'tbl', "WHERE id = '1'"))
+
+        with self.subTest("""
+        GIVEN too few values are passed
+        WHEN the render() method is called
+        THEN an IndexError exception is raised
+        """):
+            with self.assertRaises(IndexError):
+                template.render('a,b')
+
+        template = sql_templates.CompiledTemplate("SELECT {0} FROM {1} {{literal}}")
+
+        with self.subTest("""
+        GIVEN a template with indexed fields and escaped braces
+        WHEN the render() method is called
+        THEN rendering falls back to str.format()
+        """):
+            self.assertFalse(template.simple)
+            self.assertEqual(template.render('a', 'tbl'), "SELECT a FROM tbl {literal}")
+
+    def test_get(self):
+        with patch('sql_service.sql_templates.open', wraps = open) as mock_open:
+            first = self.registry.get("select_from_table.sql")
+            second = self.registry.get("sql_service\\queries\\select_from_table.sql")
+            third = self.registry.get("select_from_table.sql")
+
+        with self.subTest("""
+        GIVEN a template name or a legacy Windows-style path
+        WHEN the get() method is called repeatedly
+        THEN the file is read once per key and served from memory afterwards
+        """):
+            self.assertEqual(mock_open.call_count, 2)
+            self.assertIs(first, third)
+            self.assertEqual(first.text, second.text)
+
+        with self.subTest("""
+        GIVEN the queries directory
+        WHEN the preload() method is called
+        THEN every template is compiled
+        """):
+            self.assertTrue({'delete_statement.sql', 'insert_into_table.sql', 'select_from_table.sql', 'update_table.sql'} <= set(self.registry.preload()))
+
+    def test_auto_reload(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "custom.sql")
+
+            with open(path, "w") as f:
+                f.write("SELECT {} FROM {}")
+
+            registry = sql_templates.TemplateRegistry(directory, auto_reload = True)
+            first = registry.get("custom.sql")
+
+            with open(path, "w") as f:
+                f.write("SELECT TOP 1 {} FROM {}")
+            os.utime(path, ns = (0, os.stat(path).st_mtime_ns + 1))
+
+            second = registry.get("custom.sql")
+
+        with self.subTest("""
+        GIVEN auto_reload is enabled and the file changes on disk
+        WHEN the get() method is called
+        THEN the template is reloaded
+        """):
+            self.assertEqual(first.render('a', 'tbl'), "SELECT a FROM tbl")
+            self.assertEqual(second.render('a', 'tbl'), "SELECT TOP 1 a FROM tbl")
+
+if __name__ == "__main__":
+    unittest.main()
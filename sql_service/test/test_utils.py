@@ -0,0 +1,327 @@
+import logging
+import os
+import queue
+import tempfile
+import threading
+import unittest
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import Mock
+
+from sql_service import utils
+
+class TestUtils(unittest.TestCase):
+
+    def test_get_params(self):
+        with self.subTest("""
+        GIVEN params in the params[column]=value query string form
+        WHEN the get_params() method is called
+        THEN one dictionary is returned per column
+        """):
+            self.assertEqual([{'attr1': 'value1'}, {'attr2': 'value2'}], utils.get_params("params[attr1]=value1&params[attr2]=value2"))
+
+        with self.subTest("""
+        GIVEN percent-encoded keys and values containing commas, equals signs, quotes and spaces
+        WHEN the get_params() method is called
+        THEN keys and values are decoded and kept whole
+        """):
+            self.assertEqual([{'a': 'x,y=z'}, {'b': "it's here"}, {'c': '1'}], utils.get_params("params[a]=x%2Cy%3Dz&params%5Bb%5D=it%27s%20here&c=1&"))
+
+        with self.subTest("""
+        GIVEN values containing a literal '+', with and without percent escapes elsewhere in the string
+        WHEN the get_params() method is called
+        THEN the '+' is kept rather than being decoded as a space
+        """):
+            self.assertEqual([{'email': 'a+b@x.com'}, {'lang': 'C++'}], utils.get_params("params[email]=a+b@x.com&params[lang]=C++"))
+            self.assertEqual([{'email': 'a+b@x.com'}, {'name': 'x y'}], utils.get_params("params[email]=a+b@x.com&params[name]=x%20y"))
+
+        with self.subTest("""
+        GIVEN no params
+        WHEN the get_params() method is called
+        THEN None is returned
+        """):
+            self.assertIsNone(utils.get_params(None))
+
+        with self.subTest("""
+        GIVEN a pair without a value
+        WHEN the get_params() method is called
+        THEN a ValueError exception is raised
+        """):
+            with self.assertRaises(ValueError):
+                utils.get_params("params[a]=1&b")
+
+    def test_keyset_condition(self):
+        with self.subTest("""
+        GIVEN a single ascending key
+        WHEN the keyset_condition() method is called
+        THEN a greater than comparison on the key is returned
+        """):
+            self.assertEqual(("((id > ?))", [5]), utils.keyset_condition(['id'], [5]))
+
+        with self.subTest("""
+        GIVEN a composite descending key
+        WHEN the keyset_condition() method is called
+        THEN rows after the last key are selected column by column
+        """):
+            self.assertEqual(("((created < ?) OR (created = ? AND id < ?))", ['2024', '2024', 5]), utils.keyset_condition(['created', 'id'], ['2024', 5], descending = True))
+
+    def test_page_token(self):
+        fake_keys = ['id', 'amount', 'created', 'day', 'guid', 'name']
+        fake_values = [5, Decimal('1.50'), datetime(2024, 1, 2, 3, 4, 5), date(2024, 1, 2), uuid.UUID(int = 1), "O'Brien"]
+
+        token = utils.encode_page_token(fake_keys, fake_values)
+
+        with self.subTest("""
+        GIVEN key values of several SQL types
+        WHEN the token is encoded and decoded
+        THEN the original typed values are returned
+        """):
+            self.assertEqual(fake_values, utils.decode_page_token(token, fake_keys))
+
+        with self.subTest("""
+        GIVEN a token issued for other key columns
+        WHEN the decode_page_token() method is called
+        THEN a ValueError exception is raised
+        """):
+            with self.assertRaises(ValueError):
+                utils.decode_page_token(token, ['id'])
+
+        with self.subTest("""
+        GIVEN a tampered token
+        WHEN the decode_page_token() method is called
+        THEN a ValueError exception is raised
+        """):
+            with self.assertRaises(ValueError):
+                utils.decode_page_token("not-a-token", fake_keys)
+
+        with self.subTest("""
+        GIVEN a NULL key value
+        WHEN the encode_page_token() method is called
+        THEN a ValueError exception is raised
+        """):
+            with self.assertRaises(ValueError):
+                utils.encode_page_token(['id'], [None])
+
+    def test_prefetch(self):
+        with self.subTest("""
+        GIVEN an iterator of batches
+        WHEN it is consumed through prefetch()
+        THEN every item is yielded in order
+        """):
+            self.assertEqual([[1, 2], [3]], list(utils.prefetch(iter([[1, 2], [3]]), depth = 2)))
+
+        produced = []
+        full = threading.Event()
+
+        def batches():
+            for position in range(100):
+                produced.append(position)
+
+                if len(produced) == 3:
+                    full.set()
+
+                yield position
+
+        prefetched = utils.prefetch(batches(), depth = 1)
+
+        with self.subTest("""
+        GIVEN a consumer that stops reading after the first item
+        WHEN the worker fills the bounded queue
+        THEN the worker blocks instead of reading ahead
+        """):
+            self.assertEqual(0, next(prefetched))
+            full.wait(1)
+            self.assertLessEqual(len(produced), 3)
+
+        with self.subTest("""
+        GIVEN a prefetching generator
+        WHEN it is closed early
+        THEN the worker thread stops
+        """):
+            prefetched.close()
+            self.assertFalse(any(thread.name == "sql_service-prefetch" for thread in threading.enumerate()))
+
+        def failing():
+            yield 1
+            raise RuntimeError("Generic error occured")
+
+        with self.subTest("""
+        GIVEN the source iterator raises an exception
+        WHEN it is consumed through prefetch()
+        THEN the exception is raised in the consumer
+        """):
+            with self.assertRaises(RuntimeError):
+                list(utils.prefetch(failing()))
+
+    def test_parameterize(self):
+        actual_result = utils.parameterize("id = '1' AND name = N'O''Brien'")
+
+        with self.subTest("""
+        GIVEN a clause containing string literals
+        WHEN the parameterize() method is called
+        THEN each literal is replaced with a ? marker and returned as a parameter
+        """):
+            self.assertEqual(("id = ? AND name = ?", ['1', "O'Brien"]), actual_result)
+
+        actual_result = utils.parameterize("age >= 30 AND price<>-1.5 AND [col=1] = 2 ORDER BY id OFFSET 10 ROWS")
+
+        with self.subTest("""
+        GIVEN a clause containing numbers after comparison operators and bracketed identifiers
+        WHEN the parameterize() method is called
+        THEN compared numbers are parameterised while identifiers and other numbers are left untouched
+        """):
+            self.assertEqual(("age >= ? AND price<>? AND [col=1] = ? ORDER BY id OFFSET 10 ROWS", [30, Decimal('-1.5'), 2]), actual_result)
+
+        actual_result = utils.parameterize("code = 'abc' -- 'c' = 1\nAND id /* = 'x' */ = 5 AND note = '--'")
+
+        with self.subTest("""
+        GIVEN a clause containing line and block comments, and a literal that looks like a comment
+        WHEN the parameterize() method is called
+        THEN literals inside comments are left untouched and only real literals are parameterised
+        """):
+            self.assertEqual(("code = ? -- 'c' = 1\nAND id /* = 'x' */ = ? AND note = ?", ['abc', 5, '--']), actual_result)
+
+        with self.subTest("""
+        GIVEN no clause
+        WHEN the parameterize() method is called
+        THEN the clause is returned unchanged with no parameters
+        """):
+            self.assertEqual((None, []), utils.parameterize(None))
+
+    def test_parameterize_dict_list(self):
+        actual_result = utils.parameterize_dict_list([{'attr1': 'value1'}, {'attr2': "it's"}])
+
+        with self.subTest("""
+        GIVEN a list of single-key dictionaries
+        WHEN the parameterize_dict_list() method is called
+        THEN a SET list of ? markers and the matching parameters are returned
+        """):
+            self.assertEqual(("attr1 = ?,attr2 = ?", ['value1', "it's"]), actual_result)
+
+        with self.subTest("""
+        GIVEN an empty dictionary in the list
+        WHEN the parameterize_dict_list() method is called
+        THEN a RuntimeError exception is raised
+        """):
+            with self.assertRaises(RuntimeError):
+                utils.parameterize_dict_list([{}])
+
+    def test_loggable_sql(self):
+        fake_logger = utils.ServiceLogger(Mock(), sql_max_length = 10)
+        fake_statement = "INSERT INTO tbl (attr1) VALUES ('" + "x" * 100 + "')"
+
+        with self.subTest("""
+        GIVEN a statement longer than the logger's sql_max_length
+        WHEN the loggable_sql() value is formatted
+        THEN the statement is truncated with a count of the omitted characters
+        """):
+            self.assertEqual(f"INSERT INT... [{len(fake_statement) - 10} more characters]", str(utils.loggable_sql(fake_statement, fake_logger)))
+
+        fake_logger.sql_hash = True
+
+        with self.subTest("""
+        GIVEN sql_hash is enabled
+        WHEN the loggable_sql() value is formatted
+        THEN a digest of the statement is logged instead of its text
+        """):
+            self.assertTrue(str(utils.loggable_sql(fake_statement, fake_logger)).startswith("<sql sha1="))
+
+        with self.subTest("""
+        GIVEN a statement within sql_max_length
+        WHEN the loggable_sql() value is formatted
+        THEN the statement is logged unchanged
+        """):
+            self.assertEqual("SELECT 1", str(utils.loggable_sql("SELECT 1", fake_logger)))
+
+    def test_service_logger(self):
+        fake_logger = Mock()
+        fake_logger.isEnabledFor.return_value = True
+
+        service_logger = utils.ServiceLogger(fake_logger, level = logging.WARNING)
+        service_logger.info("SQL_SVC_TST: %s", "message")
+        service_logger.error("SQL_SVC_TST_ERR: %s", "message")
+
+        with self.subTest("""
+        GIVEN a service logger with its own verbosity level
+        WHEN messages below and above that level are logged
+        THEN only messages at or above the level reach the underlying logger, with arguments unformatted
+        """):
+            fake_logger.log.assert_called_once_with(logging.ERROR, "SQL_SVC_TST_ERR: %s", "message", extra = {})
+
+    def test_dropping_queue_handler(self):
+        handler = utils.DroppingQueueHandler(queue.Queue(1))
+        record = logging.LogRecord('sql_service', logging.INFO, __file__, 1, "SQL_SVC_TST: %s", ("message",), None)
+
+        handler.handle(record)
+        handler.handle(record)
+
+        with self.subTest("""
+        GIVEN the bounded log queue is full
+        WHEN another record is handled
+        THEN the record is dropped and counted instead of blocking the caller
+        """):
+            self.assertEqual((handler.enqueued, handler.dropped), (1, 1))
+            self.assertEqual(("message",), handler.queue.get_nowait().args)
+
+    def test_configure_logging(self):
+        utils.shutdown_logging()
+
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, "sql_service.log")
+
+            first = utils.configure_logging(log_file)
+
+            with self.assertWarns(RuntimeWarning):
+                second = utils.configure_logging(os.path.join(directory, "other.log"))
+
+            utils.create_logger().info("SQL_SVC_TST: %s", "written by the listener thread")
+            utils.shutdown_logging()
+
+            with open(log_file) as f:
+                contents = f.read()
+
+        with self.subTest("""
+        GIVEN logging has already been configured in this process
+        WHEN the configure_logging() method is called again
+        THEN the existing queue handler is reused and a warning names the ignored file
+        """):
+            self.assertIs(first, second)
+            self.assertFalse(os.path.exists(os.path.join(directory, "other.log")))
+
+        with self.subTest("""
+        GIVEN a record is logged through a service logger
+        WHEN logging is shut down
+        THEN the queue is drained to the log file
+        """):
+            self.assertTrue("INFO | SQL_SVC_TST: written by the listener thread" in contents)
+
+        utils.configure_logging()
+
+        with self.subTest("""
+        GIVEN no log file is passed or set in utils.log_path
+        WHEN the configure_logging() method is called
+        THEN no file is written and records propagate to the application's own logging setup
+        """):
+            self.assertIsInstance(utils.create_logger().logger.handlers[0], logging.NullHandler)
+            self.assertTrue(utils.create_logger().logger.propagate)
+            self.assertEqual({'enqueued': 0, 'dropped': 0, 'queued': 0}, utils.log_stats())
+
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, "later.log")
+
+            utils.create_logger(log_file = log_file).info("SQL_SVC_TST: %s", "written after the NullHandler")
+            utils.shutdown_logging()
+
+            with open(log_file) as f:
+                contents = f.read()
+
+        with self.subTest("""
+        GIVEN logging was configured without a destination
+        WHEN a logger is created with a log file
+        THEN the file replaces the NullHandler and receives the records
+        """):
+            self.assertTrue("SQL_SVC_TST: written after the NullHandler" in contents)
+
+if __name__ == "__main__":
+    unittest.main()
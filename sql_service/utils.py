@@ -1,29 +1,189 @@
-import ast
+import base64
+import hashlib
+import json
+import itertools
+import re
 import uuid
-from datetime import datetime
+from decimal import Decimal
+from datetime import date, datetime, time as clock
 import logging
-import logging.config
+import logging.handlers
+import os
+import queue
+import threading
+import warnings
+from urllib.parse import unquote
 
-import time
+import atexit
 
+literal_pattern = re.compile(r"""
+    (?P<identifier>\[[^\]]*\]|"[^"]*")
+    | (?P<comment>--[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+    | (?:(?<!\w)N)?'(?P<string>(?:[^']|'')*)'
+    | (?P<operator>(?:<=|>=|<>|!=|=|<|>)\s*)(?P<number>-?\d+(?:\.\d+)?)(?![\w.])
+""", re.VERBOSE)
 
-def create_logger():
-    logging.config.dictConfig({'version': 1, 'disable_existing_loggers': True,})
-    logger = logging
+param_pattern = re.compile(r"(?P<key>[^=&]+)=(?P<value>[^&]*)(?:&+|$)")
+param_key_pattern = re.compile(r"params\[(?P<key>.*)\]")
+where_pattern = re.compile(r"^\s*WHERE\s+", re.IGNORECASE)
 
-    log = logging.getLogger('werkzeug')
-    log.disabled = True
+sql_log_max_length = 500
+sql_log_hash = False
 
-    timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+log_path = None
+log_queue_size = 10000
+log_format = '%(asctime)s | %(levelname)s | %(message)s'
+log_datefmt = '%Y/%m/%d %H:%M:%S'
 
-    logger.basicConfig(filename = f'C:/Users/caola/Documents/Github/mssqlserver-python/sql_service/logs{timestamp}.log',
-        filemode='w',
-        level = logging.INFO,
-        format = '%(asctime)s | %(levelname)s | %(message)s',
-        datefmt = '%Y/%m/%d %H:%M:%S'
-    )
+_logging_lock = threading.Lock()
+_log_handler = None
+_log_listener = None
+_log_file = None
 
-    return logger
+
+class ServiceLogger(logging.LoggerAdapter):
+
+    def __init__(self, logger, level = logging.INFO, sql_max_length = None, sql_hash = None):
+        super().__init__(logger, {})
+        self.level = level
+        self.sql_max_length = sql_log_max_length if sql_max_length is None else sql_max_length
+        self.sql_hash = sql_log_hash if sql_hash is None else sql_hash
+
+    def isEnabledFor(self, level):
+        return level >= self.level and self.logger.isEnabledFor(level)
+
+    def setLevel(self, level):
+        self.level = level
+
+
+class LoggableSql():
+    __slots__ = ('sql', 'max_length', 'hashed')
+
+    def __init__(self, sql, max_length, hashed):
+        self.sql = sql
+        self.max_length = max_length
+        self.hashed = hashed
+
+    def __str__(self):
+        sql = str(self.sql)
+
+        if self.max_length is None or len(sql) <= self.max_length:
+            return sql
+
+        if self.hashed:
+            return f"<sql sha1={hashlib.sha1(sql.encode()).hexdigest()[:12]} length={len(sql)}>"
+
+        return f"{sql[:self.max_length]}... [{len(sql) - self.max_length} more characters]"
+
+
+def loggable_sql(sql, logger):
+    return LoggableSql(sql, getattr(logger, 'sql_max_length', sql_log_max_length), getattr(logger, 'sql_hash', sql_log_hash))
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Records are formatted by the listener thread; the queue never leaves the process
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(log_file = None, queue_size = None):
+    global _log_handler, _log_listener, _log_file
+
+    with _logging_lock:
+        if log_file is None:
+            log_file = log_path
+
+        logger = logging.getLogger('sql_service')
+
+        if _log_handler is not None:
+            if log_file is None or os.path.abspath(log_file) == _log_file:
+                return _log_handler
+
+            if _log_listener is not None:
+                warnings.warn(f"Logging already writes to {_log_file}, ignoring the log file {log_file}. Set utils.log_path or call configure_logging() once at startup", RuntimeWarning, stacklevel = 2)
+
+                return _log_handler
+
+            # Only a NullHandler is installed so far, switch to the requested file
+            logger.removeHandler(_log_handler)
+
+        logging.getLogger('werkzeug').disabled = True
+
+        if log_file is None:
+            # No destination configured: records propagate to the host application's logging setup
+            _log_handler = logging.NullHandler()
+            logger.addHandler(_log_handler)
+
+            return _log_handler
+
+        file_handler = logging.FileHandler(log_file, mode = 'w', delay = True)
+        file_handler.setFormatter(logging.Formatter(log_format, log_datefmt))
+
+        handler = DroppingQueueHandler(queue.Queue(log_queue_size if queue_size is None else queue_size))
+
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        logger.addHandler(handler)
+
+        _log_listener = logging.handlers.QueueListener(handler.queue, file_handler, respect_handler_level = True)
+        _log_listener.start()
+        _log_handler = handler
+        _log_file = os.path.abspath(log_file)
+
+        return handler
+
+def shutdown_logging():
+    global _log_handler, _log_listener, _log_file
+
+    with _logging_lock:
+        if _log_handler is None:
+            return
+
+        if _log_listener is not None:
+            _log_listener.stop()
+
+            for handler in _log_listener.handlers:
+                handler.close()
+
+        logger = logging.getLogger('sql_service')
+        logger.removeHandler(_log_handler)
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+        _log_handler = None
+        _log_file = None
+        _log_listener = None
+
+def log_stats():
+    handler = _log_handler
+
+    if not isinstance(handler, DroppingQueueHandler):
+        return {'enqueued': 0, 'dropped': 0, 'queued': 0}
+
+    return {
+        'enqueued': handler.enqueued,
+        'dropped': handler.dropped,
+        'queued': handler.queue.qsize()
+    }
+
+def create_logger(level = logging.INFO, sql_max_length = None, sql_hash = None, log_file = None):
+    configure_logging(log_file)
+
+    return ServiceLogger(logging.getLogger('sql_service'), level, sql_max_length, sql_hash)
+
+atexit.register(shutdown_logging)
 
 def generate_uuid():
     generated_uuid = uuid.uuid4()
@@ -107,21 +267,230 @@ def comma_split(string):
 
 def get_params(params):
     if params:
-        params = params.replace('params', '')
-        params = params.replace('[', '')
-        params = params.replace(']', '')
-        params = "{'" + params + "'}"
-        params = params.replace('=', "':'")
-        params = params.replace('&', "'},{'")
-        params = params.split(",")
-
+        pairs = params.lstrip('&')
+        decode = unquote if '%' in pairs else str
         params_list = []
+        position = 0
+
+        for match in param_pattern.finditer(pairs):
+            if match.start() != position:
+                break
+
+            key = decode(match.group('key'))
+            bracketed = param_key_pattern.fullmatch(key)
+
+            params_list.append({bracketed.group('key') if bracketed else key: decode(match.group('value'))})
+            position = match.end()
 
-        for param in params:
-            params_list.append(ast.literal_eval(param))
+        if position != len(pairs):
+            raise ValueError(f"Malformed params '{params}'. Use params[column]=value pairs separated by '&'")
 
         return params_list
 
 def is_key(args):
     if args:
-        return args
\ No newline at end of file
+        return args
+
+def split_columns(columns):
+    return [column.strip() for column in columns.split(',')]
+
+def placeholders(count):
+    return ",".join("?" * count)
+
+def chunked(iterable, size):
+    if size < 1:
+        raise ValueError(f"Chunk size must be at least 1, got {size}")
+
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+def prefetch(iterable, depth = 1):
+    if depth < 1:
+        raise ValueError(f"Prefetch depth must be at least 1, got {depth}")
+
+    iterator = iter(iterable)
+    buffer = queue.Queue(depth)
+    stop = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    return
+
+                buffer.put((item, None))
+
+            buffer.put((done, None))
+
+        except BaseException as e:
+            buffer.put((done, e))
+
+        finally:
+            if stop.is_set() and hasattr(iterator, 'close'):
+                iterator.close()
+
+    def consume():
+        worker = threading.Thread(target = produce, name = "sql_service-prefetch", daemon = True)
+        worker.start()
+
+        try:
+            while True:
+                item, error = buffer.get()
+
+                if item is done:
+                    if error is not None:
+                        raise error
+
+                    return
+
+                yield item
+
+        finally:
+            stop.set()
+
+            while worker.is_alive():
+                try:
+                    buffer.get(timeout = 0.05)
+                except queue.Empty:
+                    pass
+
+            worker.join()
+
+    return consume()
+
+def row_values(row, columns):
+    if isinstance(row, dict):
+        return tuple(row[column] for column in columns)
+
+    if len(row) != len(columns):
+        raise ValueError(f"Row has {len(row)} values but {len(columns)} columns were given")
+
+    return tuple(row)
+
+def split_values(values):
+    return values.split(',')
+
+def parameterize(sql):
+    params = []
+
+    if not sql:
+        return sql, params
+
+    def replace(match):
+        if match.group('identifier') is not None or match.group('comment') is not None:
+            return match.group(0)
+
+        if match.group('string') is not None:
+            params.append(match.group('string').replace("''", "'"))
+
+            return "?"
+
+        number = match.group('number')
+        params.append(Decimal(number) if '.' in number else int(number))
+
+        return match.group('operator') + "?"
+
+    return literal_pattern.sub(replace, sql), params
+
+def parameterize_dict_list(dict_list):
+    assignments = []
+    params = []
+
+    try:
+        for dict in dict_list:
+            key = list(dict.keys())[0]
+            assignments.append(f"{key} = ?")
+            params.append(dict[key])
+    except Exception as e:
+        raise RuntimeError(e)
+
+    return join_list(assignments), params
+
+def strip_where(clause):
+    if clause:
+        return where_pattern.sub("", clause, count = 1).strip() or None
+
+def column_name(column):
+    return column.split('.')[-1].strip().strip('[]"')
+
+def keyset_condition(keys, values, descending = False):
+    operator = "<" if descending else ">"
+    conditions = []
+    params = []
+
+    for position, key in enumerate(keys):
+        equals = [f"{previous} = ?" for previous in keys[:position]]
+        conditions.append("(" + " AND ".join(equals + [f"{key} {operator} ?"]) + ")")
+        params.extend(values[:position + 1])
+
+    return "(" + " OR ".join(conditions) + ")", params
+
+def encode_token_value(value):
+    if value is None:
+        raise ValueError("Keyset pagination needs non-NULL key values")
+
+    if isinstance(value, (bool, int, float, str)):
+        return value
+
+    if isinstance(value, Decimal):
+        return {'decimal': str(value)}
+
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+
+    if isinstance(value, date):
+        return {'date': value.isoformat()}
+
+    if isinstance(value, clock):
+        return {'time': value.isoformat()}
+
+    if isinstance(value, uuid.UUID):
+        return {'uuid': str(value)}
+
+    if isinstance(value, (bytes, bytearray)):
+        return {'bytes': base64.b64encode(value).decode()}
+
+    raise ValueError(f"Cannot use a {type(value).__name__} value as a keyset pagination key")
+
+token_decoders = {
+    'decimal': Decimal,
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+    'time': clock.fromisoformat,
+    'uuid': uuid.UUID,
+    'bytes': base64.b64decode
+}
+
+def decode_token_value(value):
+    if isinstance(value, dict):
+        (tag, encoded), = value.items()
+
+        return token_decoders[tag](encoded)
+
+    return value
+
+def encode_page_token(keys, values):
+    payload = json.dumps({'keys': list(keys), 'values': [encode_token_value(value) for value in values]}, separators = (',', ':'))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_page_token(token, keys):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        values = [decode_token_value(value) for value in payload['values']]
+
+    except Exception as e:
+        raise ValueError(f"Invalid continuation token, {e}")
+
+    if payload['keys'] != list(keys) or len(values) != len(keys):
+        raise ValueError(f"Continuation token was issued for keys {payload['keys']}, not {list(keys)}")
+
+    return values